@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Load Simulation for Multi-Agent Communication System
+Replays recorded or generated event traces for many virtual agents on a virtual clock
+"""
+
+import heapq
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utilities"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "monitoring"))
+
+from test_workflow import CommunicationSystemTest
+from agent_monitor import AgentMonitor
+from alert_system import AlertSystem
+from status_buffer import StatusWriteBuffer
+
+EVENT_TYPES = ('assign', 'question', 'complete', 'block')
+
+
+class VirtualClock:
+    def __init__(self, start=None):
+        self.start = start or datetime(2025, 1, 16, 9, 0, 0)
+        self.now = 0.0
+
+    def advance_to(self, seconds):
+        self.now = max(self.now, seconds)
+
+    def timestamp(self):
+        return (self.start + timedelta(seconds=self.now)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def generate_trace(agent_count=100, duration=3600, seed=42):
+    """Generate a deterministic trace: each agent gets tasks, some questions and blocks"""
+    rng = random.Random(seed)
+    events = []
+
+    for index in range(agent_count):
+        agent = f"sim_agent_{index:03d}"
+        t = rng.uniform(0, duration * 0.2)
+        task_number = 0
+
+        while t < duration:
+            task_id = f"{agent}_task_{task_number:03d}"
+            events.append({'time': t, 'type': 'assign', 'agent': agent, 'task_id': task_id})
+
+            if rng.random() < 0.3:
+                events.append({'time': t + rng.uniform(60, 600), 'type': 'question',
+                               'agent': agent, 'task_id': task_id})
+            if rng.random() < 0.1:
+                events.append({'time': t + rng.uniform(60, 900), 'type': 'block',
+                               'agent': agent, 'task_id': task_id})
+
+            t += rng.uniform(900, 2700)
+            events.append({'time': t, 'type': 'complete', 'agent': agent, 'task_id': task_id})
+            t += rng.uniform(30, 300)
+            task_number += 1
+
+    return sorted(events, key=lambda e: e['time'])
+
+
+def load_trace(trace_file):
+    """Load a recorded trace (one JSON event per line)"""
+    with open(trace_file, 'r') as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    return sorted((e for e in events if e['type'] in EVENT_TYPES), key=lambda e: e['time'])
+
+
+class LoadSimulation(CommunicationSystemTest):
+    def __init__(self, events, poll_interval=30, alert_interval=60, contention_window=1.0, hub_path=None):
+        self.temp_dir = None
+        if hub_path is None:
+            self.temp_dir = tempfile.mkdtemp(prefix="hub_sim_")
+            hub_path = self.temp_dir
+        super().__init__(hub_path)
+
+        self.events = events
+        self.poll_interval = poll_interval
+        self.alert_interval = alert_interval
+        self.contention_window = contention_window
+
+        self.clock = VirtualClock()
+        self.agents = sorted({e['agent'] for e in events})
+        self.revision = 0
+        self.file_writes = {}  # file name -> virtual times of writes
+        self.monitors = {}
+        self.seen_revision = {}
+
+        self.assigned_at = {}
+        self.pickup_latencies = []
+        self.blocked_at = {}
+        self.alert_latencies = []
+
+    def seed_hub(self):
+        """Create the hub files, reusing the scripted assignment as the base instructions"""
+        (self.hub_path / "agents").mkdir(parents=True, exist_ok=True)
+        self.simulate_technical_lead_assignment()
+
+        now = self.clock.timestamp()
+        status_data = {
+            'last_updated': now,
+            'agents': {agent: {
+                'status': 'waiting',
+                'current_task': None,
+                'last_activity': now,
+                'completed_tasks_today': 0,
+                'total_hours_logged': 0,
+                'availability': 'available'
+            } for agent in self.agents},
+            'system_status': {
+                'communication_hub_active': True,
+                'last_instruction_update': now,
+                'pending_tasks': 0,
+                'active_tasks': 0,
+                'completed_tasks': 0
+            }
+        }
+        with open(self.status_file, 'w') as f:
+            json.dump(status_data, f, indent=2)
+
+        # Status changes take the production path (buffer, events log, lock), timed by the virtual clock
+        self.status_buffer = StatusWriteBuffer.for_hub(str(self.hub_path), clock=lambda: self.clock.now, timer=False)
+        self.monitors = {agent: AgentMonitor(str(self.hub_path), agent) for agent in self.agents}
+        self.seen_revision = {agent: -1 for agent in self.agents}
+        self.alert_system = AlertSystem(str(self.hub_path), deliver=False)
+
+    def _record_write(self, file_name):
+        self.file_writes.setdefault(file_name, []).append(self.clock.now)
+
+    def _record_status_flush(self, flushed):
+        if flushed:
+            self._record_write(self.status_file.name)
+            self._record_write(self.status_buffer.events_file.name)
+
+    def _insert_before_end(self, section):
+        self.insert_before_communication_over(section + "\n\n")
+        self.revision += 1
+        self._record_write(self.instructions_file.name)
+
+    def _set_agent_status(self, agent, status, task_id=None):
+        self._record_status_flush(self.status_buffer.update(agent, status, task_id))
+
+    def apply_event(self, event):
+        """Write one trace event into the hub the same way the real agents would"""
+        agent, task_id = event['agent'], event['task_id']
+        stamp = self.clock.timestamp()
+
+        if event['type'] == 'assign':
+            task = {
+                'task_id': task_id,
+                'assigned_to': agent,
+                'priority': 'medium',
+                'estimated_hours': '1-2',
+                'dependencies': [],
+                'description': f"Simulated task for {agent}",
+                'deliverables': ['simulated deliverable'],
+                'coding_standards': 'general_standards',
+                'context': 'Load simulation'
+            }
+            self._insert_before_end(f"### Task: {task_id}\n\n```json\n{json.dumps(task, indent=2)}\n```\n\n(TASK_ASSIGNED)")
+            self.assigned_at[task_id] = self.clock.now
+
+        elif event['type'] == 'question':
+            self._insert_before_end(f"### {agent} Question - {stamp}\n**Question**: Clarification on {task_id}\n\n(QUESTION)")
+
+        elif event['type'] == 'complete':
+            self._insert_before_end(f"### {agent} Completion - {stamp}\n**Task ID**: {task_id}\n\n(TASK_COMPLETE)")
+            self._set_agent_status(agent, 'completed_task')
+
+        elif event['type'] == 'block':
+            self._set_agent_status(agent, 'blocked', task_id)
+            self.blocked_at.setdefault(agent, self.clock.now)
+
+    def poll_agent(self, agent):
+        """One monitor cycle for a virtual agent: re-parse only if the file changed"""
+        if self.seen_revision[agent] == self.revision:
+            return
+        self.seen_revision[agent] = self.revision
+
+        monitor = self.monitors[agent]
+        parsed = monitor.parse_instructions()
+        if not parsed:
+            return
+
+        for task in monitor.filter_new_tasks(monitor.check_for_my_tasks(parsed)):
+            if task['task_id'] in self.assigned_at:
+                self.pickup_latencies.append(self.clock.now - self.assigned_at[task['task_id']])
+            monitor.dispatched_tasks[task['task_id']] = monitor._task_fingerprint(task)
+            self._set_agent_status(agent, 'working', task['task_id'])
+
+    def check_alerts(self):
+        """One alert cycle: measure how long each block took to be detected"""
+        for alert in self.alert_system.check_agent_status():
+            if alert['type'] == 'agent_blocked' and alert['agent'] in self.blocked_at:
+                self.alert_latencies.append(self.clock.now - self.blocked_at.pop(alert['agent']))
+
+    def run(self):
+        """Replay the trace on the virtual clock and return the measurements"""
+        self.seed_hub()
+        duration = max((e['time'] for e in self.events), default=0)
+
+        queue = []
+        seq = 0
+        for event in self.events:
+            heapq.heappush(queue, (event['time'], seq, 'event', event))
+            seq += 1
+
+        rng = random.Random(0)
+        for agent in self.agents:
+            heapq.heappush(queue, (rng.uniform(0, self.poll_interval), seq, 'poll', agent))
+            seq += 1
+        heapq.heappush(queue, (self.alert_interval, seq, 'alerts', None))
+        seq += 1
+
+        wall_start = time.perf_counter()
+        while queue:
+            at, _, kind, payload = heapq.heappop(queue)
+            if at > duration + self.poll_interval:
+                break
+            self.clock.advance_to(at)
+
+            if kind == 'event':
+                self.apply_event(payload)
+            elif kind == 'poll':
+                self.poll_agent(payload)
+                heapq.heappush(queue, (at + self.poll_interval, seq, 'poll', payload))
+            elif kind == 'alerts':
+                self.check_alerts()
+                heapq.heappush(queue, (at + self.alert_interval, seq, 'alerts', None))
+            self._record_status_flush(self.status_buffer.flush_due())
+            seq += 1
+
+        self._record_status_flush(self.status_buffer.flush())
+        wall_time = time.perf_counter() - wall_start
+        return self.build_report(duration, wall_time)
+
+    def _contention(self):
+        """Writes that land within the contention window of the previous write to the same file"""
+        contention = {}
+        for file_name, times in self.file_writes.items():
+            collisions = sum(1 for prev, cur in zip(times, times[1:]) if cur - prev < self.contention_window)
+            contention[file_name] = {'writes': len(times), 'collisions': collisions}
+        return contention
+
+    def build_report(self, duration, wall_time):
+        def summarize(values):
+            if not values:
+                return {'count': 0}
+            ordered = sorted(values)
+            return {
+                'count': len(ordered),
+                'mean': sum(ordered) / len(ordered),
+                'p50': ordered[len(ordered) // 2],
+                'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                'max': ordered[-1]
+            }
+
+        return {
+            'agents': len(self.agents),
+            'events': len(self.events),
+            'virtual_seconds': duration,
+            'wall_seconds': wall_time,
+            'speedup': duration / wall_time if wall_time else None,
+            'pickup_latency': summarize(self.pickup_latencies),
+            'alert_latency': summarize(self.alert_latencies),
+            'file_contention': self._contention(),
+            'instructions_bytes': self.instructions_file.stat().st_size
+        }
+
+    def cleanup(self):
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulate hub load with virtual agents")
+    parser.add_argument('--agents', type=int, default=100)
+    parser.add_argument('--duration', type=int, default=3600, help="Virtual seconds to generate")
+    parser.add_argument('--poll-interval', type=int, default=30)
+    parser.add_argument('--alert-interval', type=int, default=60)
+    parser.add_argument('--trace', help="Replay a recorded JSONL trace instead of generating one")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    events = load_trace(args.trace) if args.trace else generate_trace(args.agents, args.duration, args.seed)
+    simulation = LoadSimulation(events, args.poll_interval, args.alert_interval)
+
+    try:
+        report = simulation.run()
+        print(json.dumps(report, indent=2))
+    finally:
+        simulation.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,19 @@ Simulates a complete task assignment and completion cycle
 """
 
 import json
+import sys
 import time
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utilities"))
+from hub_lock import HubLock
+from instructions_parser import insert_before_communication_over
+from agent_mailbox import Mailbox, conversation_view
+from status_buffer import StatusWriteBuffer
+from completion_log import CompletionLog, make_record
+from agent_monitor import AgentMonitor
+
 class CommunicationSystemTest:
     def __init__(self, hub_path="./agent_communication_hub"):
         self.hub_path = Path(hub_path)
@@ -16,6 +25,23 @@ class CommunicationSystemTest:
         self.status_file = self.hub_path / "agent_status.json"
         self.tasks_file = self.hub_path / "task_assignments.json"
         
+    def insert_before_communication_over(self, section):
+        """Insert a section before the final (COMMUNICATION_OVER), holding the hub lock"""
+        with HubLock(self.hub_path):
+            insert_before_communication_over(self.instructions_file, section)
+        
+    def update_system_status(self, **counts):
+        """Set system-wide task counters in agent_status.json"""
+        with HubLock(self.hub_path, name="status"):
+            with open(self.status_file, 'r') as f:
+                status_data = json.load(f)
+            
+            status_data['system_status'].update(counts)
+            status_data['last_updated'] = datetime.now().isoformat()
+            
+            with open(self.status_file, 'w') as f:
+                json.dump(status_data, f, indent=2)
+        
     def simulate_technical_lead_assignment(self):
         """Simulate technical lead assigning a task"""
         print("🎯 Step 1: Technical Lead assigns task...")
@@ -112,8 +138,9 @@ Testing the multi-agent communication system with a sample task.
 
 (COMMUNICATION_OVER)"""
 
-        with open(self.instructions_file, 'w') as f:
-            f.write(task_assignment)
+        with HubLock(self.hub_path):
+            with open(self.instructions_file, 'w') as f:
+                f.write(task_assignment)
         
         print("✅ Task assigned to warp_agent")
         return True
@@ -122,18 +149,11 @@ Testing the multi-agent communication system with a sample task.
         """Simulate warp agent responding to task"""
         print("🤖 Step 2: Warp Agent processes task...")
         
-        # Update agent status
-        with open(self.status_file, 'r') as f:
-            status_data = json.load(f)
-        
-        status_data['agents']['warp_agent']['status'] = 'working'
-        status_data['agents']['warp_agent']['current_task'] = 'test_component_001'
-        status_data['agents']['warp_agent']['last_activity'] = datetime.now().isoformat()
-        status_data['last_updated'] = datetime.now().isoformat()
-        status_data['system_status']['active_tasks'] = 1
-        
-        with open(self.status_file, 'w') as f:
-            json.dump(status_data, f, indent=2)
+        # Update agent status (recorded as a transition event)
+        status_buffer = StatusWriteBuffer.for_hub(self.hub_path)
+        status_buffer.update('warp_agent', 'working', 'test_component_001')
+        status_buffer.flush()
+        self.update_system_status(active_tasks=1)
         
         # Update current focus
         focus_content = f"""# Warp Agent - Current Focus
@@ -183,110 +203,72 @@ This is a test task to validate the multi-agent communication system. Follow Typ
         """Simulate agent asking a question"""
         print("❓ Step 3: Warp Agent asks question...")
         
-        # Read current instructions
-        with open(self.instructions_file, 'r') as f:
-            content = f.read()
-        
-        # Add question to communication section
-        question_section = """
-### Warp Agent Question - 2025-01-16 15:30:00
-**Question**: Should the sample component use Material-UI styling or custom CSS?  
-**Context**: Creating the React component, need clarification on styling approach  
-**Priority**: Medium - can proceed with custom CSS for now  
-
-(QUESTION)"""
-        
-        # Insert question before the final (COMMUNICATION_OVER)
-        updated_content = content.replace(
-            "(COMMUNICATION_OVER)",
-            question_section + "\n\n(COMMUNICATION_OVER)"
+        # Questions go to the technical lead's inbox, not the shared instructions.md
+        Mailbox(self.hub_path, "warp_agent").ask(
+            "technical_lead",
+            "Should the sample component use Material-UI styling or custom CSS?",
+            context="Creating the React component, need clarification on styling approach",
+            priority="medium"
         )
         
-        with open(self.instructions_file, 'w') as f:
-            f.write(updated_content)
-        
-        print("✅ Question posted to instructions.md")
+        print("✅ Question sent to technical_lead inbox")
         return True
     
     def simulate_technical_lead_response(self):
         """Simulate technical lead responding to question"""
         print("💬 Step 4: Technical Lead responds...")
         
-        # Read current instructions
-        with open(self.instructions_file, 'r') as f:
-            content = f.read()
-        
-        # Add response
-        response_section = """
-### Technical Lead Response - 2025-01-16 15:45:00
-**Re**: Component styling approach  
-**Answer**: Use custom CSS for this test component. We'll standardize on a design system later.  
-**Action**: Proceed with custom CSS, keep styles simple and clean  
-"""
-        
-        # Insert response before final (COMMUNICATION_OVER)
-        updated_content = content.replace(
-            "(COMMUNICATION_OVER)",
-            response_section + "\n(COMMUNICATION_OVER)"
-        )
-        
-        with open(self.instructions_file, 'w') as f:
-            f.write(updated_content)
-        
-        print("✅ Response provided to agent")
+        lead = Mailbox(self.hub_path, "technical_lead", reader="test_workflow")
+        for message in lead.receive():
+            if message['kind'] == 'question':
+                lead.reply(message,
+                           "Use custom CSS for this test component. We'll standardize on a design system later.",
+                           action="Proceed with custom CSS, keep styles simple and clean")
+        lead.commit()
+        
+        # Peek only: the response is for warp_agent's monitor to receive
+        answers = [message for message in Mailbox(self.hub_path, "warp_agent").peek()
+                   if message['kind'] == 'response']
+        print(f"✅ Response provided to agent ({len(answers)} new message(s) in warp_agent inbox)")
+        print(conversation_view(self.hub_path))
         return True
     
     def simulate_task_completion(self):
         """Simulate agent completing the task"""
         print("✅ Step 5: Warp Agent completes task...")
         
-        # Update agent status
-        with open(self.status_file, 'r') as f:
-            status_data = json.load(f)
-        
-        status_data['agents']['warp_agent']['status'] = 'completed_task'
-        status_data['agents']['warp_agent']['current_task'] = None
-        status_data['agents']['warp_agent']['completed_tasks_today'] += 1
-        status_data['agents']['warp_agent']['total_hours_logged'] += 2.5
-        status_data['agents']['warp_agent']['last_activity'] = datetime.now().isoformat()
-        status_data['last_updated'] = datetime.now().isoformat()
-        status_data['system_status']['active_tasks'] = 0
-        status_data['system_status']['completed_tasks'] = 1
-        
-        with open(self.status_file, 'w') as f:
-            json.dump(status_data, f, indent=2)
-        
-        # Update completed tasks file
-        completion_entry = f"""
-#### Task: Sample React Component Creation
-- **Duration**: 2.5 hours
-- **Completed**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-- **Deliverables**: 
-  - React Button component with TypeScript
-  - Jest unit tests with 90% coverage
-  - Component documentation with usage examples
-- **Quality Gates**: ✅ All tests passing, ESLint clean, TypeScript compiled
-- **Notes**: Used custom CSS as requested, component is reusable and accessible
-
-"""
-        
-        completed_file = self.hub_path / "agents/warp_agent/completed_tasks.md"
-        with open(completed_file, 'r') as f:
-            content = f.read()
-        
-        # Insert new completion after the header
-        updated_content = content.replace(
-            "## ✅ Completed Tasks",
-            f"## ✅ Completed Tasks{completion_entry}"
-        )
-        
-        with open(completed_file, 'w') as f:
-            f.write(updated_content)
+        # The duration is the working interval that this completion closes
+        status_buffer = StatusWriteBuffer.for_hub(self.hub_path)
+        status_buffer.aggregator.refresh()
+        working = status_buffer.aggregator.current.get('warp_agent', {})
+        started = working.get('since') if working.get('task') == 'test_component_001' else None
+        
+        # Same completion path as the monitors: quality gates first, then the status change
+        # (hours and the daily count are derived from the working interval it closes).
+        # The simulated project has no source files to gate, so the task's stack is dropped.
+        monitor = AgentMonitor(self.hub_path, "warp_agent", project_root=self.hub_path.parent)
+        task = next(task for task in monitor.parse_instructions()['tasks'] if task['task_id'] == 'test_component_001')
+        report = monitor.complete_task(dict(task, coding_standards=None))
+        if report and not report['passed']:
+            raise RuntimeError("quality gates failed for test_component_001")
+        status_buffer.flush()
+        self.update_system_status(active_tasks=0, completed_tasks=1)
+        
+        # Append the completion record and refresh the newest page of completed_tasks.md
+        completions = CompletionLog(self.hub_path, 'warp_agent')
+        completions.record(make_record(
+            'warp_agent', 'test_component_001', "Sample React Component Creation", started=started,
+            deliverables=[
+                "React Button component with TypeScript",
+                "Jest unit tests with 90% coverage",
+                "Component documentation with usage examples"
+            ],
+            quality_gates="✅ All tests passing, ESLint clean, TypeScript compiled",
+            notes="Used custom CSS as requested, component is reusable and accessible"
+        ))
+        completions.publish()
         
         # Add completion message to instructions
-        with open(self.instructions_file, 'r') as f:
-            content = f.read()
-        
         completion_message = """
 ### Warp Agent Completion - 2025-01-16 18:00:00
 **Status**: ✅ COMPLETE  
@@ -302,13 +284,7 @@ This is a test task to validate the multi-agent communication system. Follow Typ
 
 (TASK_COMPLETE)"""
         
-        updated_content = content.replace(
-            "(COMMUNICATION_OVER)",
-            completion_message + "\n\n(COMMUNICATION_OVER)"
-        )
-        
-        with open(self.instructions_file, 'w') as f:
-            f.write(updated_content)
+        self.insert_before_communication_over(completion_message + "\n\n")
         
         print("✅ Task marked as complete")
         print("✅ Agent status updated")
@@ -353,6 +329,7 @@ This is a test task to validate the multi-agent communication system. Follow Typ
             print(f"- {self.instructions_file}")
             print(f"- {self.status_file}")
             print(f"- {self.hub_path}/agents/warp_agent/current_focus.md")
+            print(f"- {self.hub_path}/agents/*/inbox.jsonl, outbox.jsonl")
             print(f"- {self.hub_path}/agents/warp_agent/completed_tasks.md")
             
             return True
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Alert Aggregation
+Collapses alert storms into one rate-limited summary per type and root cause
+"""
+
+import time
+from datetime import datetime
+
+from alert_sinks import TokenBucket
+
+SEVERITY_RANK = {'info': 0, 'warning': 1, 'high': 2, 'critical': 3}
+
+# While the hub itself is down, per-agent alerts are symptoms of that outage
+OUTAGE_SYMPTOMS = ('agent_blocked', 'agent_idle')
+
+
+def root_cause(alert, outage):
+    """Cause an alert is grouped under: the hub outage if one is active, else its own severity"""
+    if alert.get('cause'):
+        return alert['cause']
+    if outage and alert['type'] in OUTAGE_SYMPTOMS:
+        return 'system_down'
+    return alert['severity']
+
+
+class AlertAggregator:
+    """
+    Groups the alerts raised in one cycle by (type, root cause). A group of
+    `min_group_size` or more becomes one summary alert listing the affected
+    agents. Each group has its own token bucket; while it is empty the group's
+    alerts are held (latest per agent) and folded into its next summary.
+    Critical groups and lone alerts (fewer than `min_group_size`, nothing held)
+    are never held back by the bucket.
+    """
+
+    def __init__(self, min_group_size=2, rate_per_minute=1, burst=2, max_listed_agents=10,
+                 enabled=True, clock=time.monotonic):
+        self.clock = clock
+        self.buckets = {}  # group -> TokenBucket
+        self.held = {}  # group -> {agent or alert key: latest alert}, bounded by the number of agents
+        self.held_counts = {}  # group -> alerts held back, including repeats
+        self.stats = {'received': 0, 'delivered': 0, 'held': 0}
+        self.configure(min_group_size, rate_per_minute, burst, max_listed_agents, enabled)
+
+    def configure(self, min_group_size=2, rate_per_minute=1, burst=2, max_listed_agents=10, enabled=True):
+        """Apply new settings in place; held alerts and bucket levels carry over"""
+        self.min_group_size = min_group_size
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.max_listed_agents = max_listed_agents
+        self.enabled = enabled
+        for bucket in self.buckets.values():
+            bucket.rate = self.rate
+            bucket.capacity = burst
+            bucket.tokens = min(bucket.tokens, burst)
+
+    def group(self, alerts, raw=None):
+        """Group by (type, root cause); the outage is judged on `raw`, the cycle's alerts before dedup"""
+        outage = any(alert['type'] == 'system_down' for alert in (alerts if raw is None else raw))
+        groups = {}
+        for alert in alerts:
+            groups.setdefault((alert['type'], root_cause(alert, outage)), []).append(alert)
+        return groups
+
+    def summarize(self, group, alerts, count):
+        alert_type, cause = group
+        agents = sorted({alert['agent'] for alert in alerts if alert.get('agent')})
+        listed = ', '.join(agents[:self.max_listed_agents])
+        if len(agents) > self.max_listed_agents:
+            listed += f" (+{len(agents) - self.max_listed_agents} more)"
+
+        severity = max((alert['severity'] for alert in alerts), key=lambda s: SEVERITY_RANK.get(s, 0))
+        message = f"{count} {alert_type} alert(s)"
+        if cause != severity:
+            message += f" caused by {cause}"
+        if agents:
+            message += f" affecting {listed}"
+
+        return {
+            'type': alert_type,
+            'severity': severity,
+            'message': message,
+            'timestamp': datetime.now().isoformat(),
+            'cause': cause,
+            'agents': agents,
+            'count': count
+        }
+
+    def _bucket(self, group):
+        if group not in self.buckets:
+            self.buckets[group] = TokenBucket(self.rate, self.burst, self.clock)
+        return self.buckets[group]
+
+    def _hold(self, group, alerts):
+        held = self.held.setdefault(group, {})
+        for alert in alerts:
+            held[alert.get('agent') or alert.get('key') or alert['message']] = alert
+        self.held_counts[group] = self.held_counts.get(group, 0) + len(alerts)
+        self.stats['held'] += len(alerts)
+
+    def aggregate(self, alerts, raw=None):
+        """
+        Turn one cycle's (already deduplicated) alerts into the alerts to deliver.
+        `raw` is the cycle's alerts before dedup: a system_down suppressed as a
+        repeat still means the hub is down.
+        """
+        self.stats['received'] += len(alerts)
+        if not self.enabled:
+            self.stats['delivered'] += len(alerts)
+            return list(alerts)
+
+        groups = self.group(alerts, raw)
+        for group in self.held:
+            groups.setdefault(group, [])
+
+        output = []
+        for group, members in groups.items():
+            lone = len(members) < self.min_group_size and group not in self.held
+            critical = any(alert['severity'] == 'critical' for alert in members)
+            if not (lone or critical) and not self._bucket(group).take():
+                self._hold(group, members)
+                continue
+
+            batch = list(self.held.pop(group, {}).values()) + members
+            count = self.held_counts.pop(group, 0) + len(members)
+            if count >= self.min_group_size:
+                output.append(self.summarize(group, batch, count))
+            else:
+                output.extend(batch)
+
+        self.stats['delivered'] += len(output)
+        return output
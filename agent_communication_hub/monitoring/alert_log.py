@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Alert Log Writer
+Buffered alerts.log writer with rotation, compressed segments and a binary sidecar index
+"""
+
+import gzip
+import json
+import os
+import shutil
+import struct
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utilities"))
+from hub_lock import HubLock
+
+# timestamp, type id, agent id, segment id, byte offset, line length
+INDEX_RECORD = struct.Struct('<dIIIQI')
+# Records per index block; the metadata keeps each block's time range, types and agents
+INDEX_BLOCK = 512
+
+
+class AlertLogWriter:
+    """
+    Writers share alerts.log and its index across processes: every flush holds
+    the `alert_log` hub lock and re-reads the symbol tables first, so two
+    writers never hand out the same id. Queries only read the index blocks
+    whose time range, types and agents can match.
+    """
+
+    def __init__(self, hub_path="./agent_communication_hub", filename="alerts.log",
+                 max_bytes=10 * 1024 * 1024, max_age_hours=24, compress=True,
+                 buffer_size=50, flush_interval=5):
+        self.hub_path = Path(hub_path)
+        self.log_file = self.hub_path / filename
+        self.index_file = self.hub_path / f"{filename}.idx"
+        self.meta_file = self.hub_path / f"{filename}.idx.json"
+
+        self.max_bytes = max_bytes
+        self.max_age = timedelta(hours=max_age_hours)
+        self.compress = compress
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+
+        self.buffer = []
+        self.last_flush = time.monotonic()
+        self.meta = self._load_meta()
+
+    def _load_meta(self):
+        """Load the symbol tables that map index ids to types, agents and segments, and the block summaries"""
+        meta = None
+        try:
+            if self.meta_file.exists():
+                with open(self.meta_file, 'r') as f:
+                    meta = json.load(f)
+        except Exception as e:
+            print(f"Error loading alert index metadata: {e}")
+
+        if meta is None:
+            meta = {
+                'types': [],
+                'agents': [],
+                'segments': [self.log_file.name],
+                'live_segment': 0,
+                'live_started': datetime.now().isoformat()
+            }
+        # [min timestamp, max timestamp, type ids, agent ids] per INDEX_BLOCK records
+        meta.setdefault('blocks', [])
+        meta.setdefault('indexed', 0)
+        self._catch_up(meta)
+        return meta
+
+    def _summarize(self, meta, entries):
+        """Fold (timestamp, type id, agent id) of newly appended index records into the block summaries"""
+        blocks = meta['blocks']
+        count = meta['indexed']
+        for ts, type_id, agent_id in entries:
+            if count // INDEX_BLOCK == len(blocks):
+                blocks.append([ts, ts, [], []])
+            block = blocks[count // INDEX_BLOCK]
+            block[0] = min(block[0], ts)
+            block[1] = max(block[1], ts)
+            if type_id not in block[2]:
+                block[2].append(type_id)
+            if agent_id not in block[3]:
+                block[3].append(agent_id)
+            count += 1
+        meta['indexed'] = count
+
+    def _catch_up(self, meta):
+        """Summarize index records the metadata does not cover yet (older index files, interrupted flushes)"""
+        try:
+            records = self.index_file.stat().st_size // INDEX_RECORD.size
+        except FileNotFoundError:
+            records = 0
+        if records < meta['indexed']:
+            meta['blocks'], meta['indexed'] = [], 0
+        if records == meta['indexed']:
+            return
+
+        with open(self.index_file, 'rb') as f:
+            f.seek(meta['indexed'] * INDEX_RECORD.size)
+            data = f.read((records - meta['indexed']) * INDEX_RECORD.size)
+        self._summarize(meta, ((ts, t_id, a_id) for ts, t_id, a_id, _, _, _ in INDEX_RECORD.iter_unpack(data)))
+
+    def _save_meta(self):
+        temp_file = self.meta_file.with_suffix('.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(temp_file, self.meta_file)
+
+    def _symbol_id(self, table, value):
+        symbols = self.meta[table]
+        if value not in symbols:
+            symbols.append(value)
+        return symbols.index(value)
+
+    def write(self, alert):
+        """Buffer one alert; critical alerts and full buffers are flushed straight away"""
+        line = f"{alert['timestamp']} [{alert['severity'].upper()}] {alert['type']}: {alert['message']}\n"
+        self.buffer.append((alert, line.encode('utf-8')))
+
+        if (alert['severity'] == 'critical' or
+                len(self.buffer) >= self.buffer_size or
+                time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Append buffered lines to the live segment and their records to the index"""
+        if not self.buffer:
+            return True
+
+        try:
+            with HubLock(self.hub_path, name="alert_log"):
+                # Another writer may have added symbols, records or a segment since our last flush
+                self.meta = self._load_meta()
+
+                records = []
+                entries = []
+                with open(self.log_file, 'ab') as log:
+                    offset = log.tell()
+                    for alert, line in self.buffer:
+                        log.write(line)
+                        entry = (datetime.fromisoformat(alert['timestamp'].replace('Z', '+00:00')).timestamp(),
+                                 self._symbol_id('types', alert['type']),
+                                 self._symbol_id('agents', alert.get('agent', 'system')))
+                        records.append(INDEX_RECORD.pack(*entry, self.meta['live_segment'], offset, len(line)))
+                        entries.append(entry)
+                        offset += len(line)
+
+                with open(self.index_file, 'ab') as index:
+                    index.write(b''.join(records))
+                self._summarize(self.meta, entries)
+                self._save_meta()
+
+                self.buffer = []
+                self.last_flush = time.monotonic()
+                self.rotate_if_needed()
+            return True
+        except Exception as e:
+            print(f"Error flushing alert log: {e}")
+            return False
+
+    def rotate_if_needed(self):
+        """Roll the live segment over once it is too large or too old (called with the alert_log lock held)"""
+        try:
+            size = self.log_file.stat().st_size
+        except FileNotFoundError:
+            return False
+
+        age = datetime.now() - datetime.fromisoformat(self.meta['live_started'])
+        if size < self.max_bytes and age < self.max_age:
+            return False
+
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        rotated = self.log_file.with_name(
+            f"{self.log_file.stem}-{stamp}-{self.meta['live_segment']}{self.log_file.suffix}")
+        os.replace(self.log_file, rotated)
+
+        if self.compress:
+            with open(rotated, 'rb') as src, gzip.open(f"{rotated}.gz", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            rotated.unlink()
+            rotated = Path(f"{rotated}.gz")
+
+        self.meta['segments'][self.meta['live_segment']] = rotated.name
+        self.meta['segments'].append(self.log_file.name)
+        self.meta['live_segment'] = len(self.meta['segments']) - 1
+        self.meta['live_started'] = datetime.now().isoformat()
+        self._save_meta()
+        return True
+
+    def query(self, agent=None, alert_type=None, since=None, until=None):
+        """Find alerts through the index, reading only the blocks and lines that can match"""
+        self.flush()
+        self.meta = self._load_meta()
+
+        agent_id = self.meta['agents'].index(agent) if agent in self.meta['agents'] else None
+        type_id = self.meta['types'].index(alert_type) if alert_type in self.meta['types'] else None
+        if (agent and agent_id is None) or (alert_type and type_id is None):
+            return []
+
+        since_ts = since.timestamp() if since else float('-inf')
+        until_ts = until.timestamp() if until else float('inf')
+
+        matches = {}
+        block_bytes = INDEX_BLOCK * INDEX_RECORD.size
+        try:
+            with open(self.index_file, 'rb') as f:
+                for number, (low, high, type_ids, agent_ids) in enumerate(self.meta['blocks']):
+                    if high < since_ts or low > until_ts:
+                        continue
+                    if (agent_id is not None and agent_id not in agent_ids) or \
+                            (type_id is not None and type_id not in type_ids):
+                        continue
+                    f.seek(number * block_bytes)
+                    data = f.read(block_bytes)
+                    data = data[:len(data) - len(data) % INDEX_RECORD.size]
+                    for ts, t_id, a_id, segment_id, offset, length in INDEX_RECORD.iter_unpack(data):
+                        if not since_ts <= ts <= until_ts:
+                            continue
+                        if agent_id is not None and a_id != agent_id:
+                            continue
+                        if type_id is not None and t_id != type_id:
+                            continue
+                        matches.setdefault(segment_id, []).append((offset, length, a_id))
+        except FileNotFoundError:
+            return []
+
+        results = []
+        for segment_id, entries in matches.items():
+            segment_file = self.hub_path / self.meta['segments'][segment_id]
+            opener = gzip.open if segment_file.suffix == '.gz' else open
+            with opener(segment_file, 'rb') as f:
+                for offset, length, a_id in entries:
+                    f.seek(offset)
+                    results.append(self._parse_line(f.read(length).decode('utf-8'),
+                                                     self.meta['agents'][a_id]))
+
+        return sorted(results, key=lambda r: r['timestamp'])
+
+    def _parse_line(self, line, agent):
+        timestamp, rest = line.rstrip('\n').split(' ', 1)
+        severity, rest = rest[1:].split('] ', 1)
+        alert_type, message = rest.split(': ', 1)
+        return {
+            'timestamp': timestamp,
+            'severity': severity.lower(),
+            'type': alert_type,
+            'agent': agent,
+            'message': message
+        }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the indexed alert log")
+    parser.add_argument('--hub', default="./agent_communication_hub")
+    parser.add_argument('--agent')
+    parser.add_argument('--type', dest='alert_type')
+    parser.add_argument('--since-hours', type=float, default=24)
+    args = parser.parse_args()
+
+    writer = AlertLogWriter(args.hub)
+    since = datetime.now() - timedelta(hours=args.since_hours)
+    for alert in writer.query(agent=args.agent, alert_type=args.alert_type, since=since):
+        print(f"{alert['timestamp']} [{alert['severity'].upper()}] {alert['type']} ({alert['agent']}): {alert['message']}")
+
+if __name__ == "__main__":
+    main()
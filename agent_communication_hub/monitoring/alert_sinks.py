@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Alert Sinks
+Pluggable alert outputs, each fed through its own bounded queue, rate limit and circuit breaker
+"""
+
+import json
+import queue
+import smtplib
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+# Queue markers handled by the worker thread, so only that thread ever touches its sink
+FLUSH = object()
+STOP = None
+
+SEVERITY_EMOJI = {
+    'critical': '🚨',
+    'high': '⚠️',
+    'warning': '⚠️',
+    'info': 'ℹ️'
+}
+
+
+class TokenBucket:
+    """Allows `rate` events per second on average, with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def take(self, tokens=1):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds, then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        return self.state != 'open'
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = self.clock()
+
+
+class AlertSink(ABC):
+    """Base sink: `send` delivers one alert and raises on failure"""
+    name = "sink"
+
+    def __init__(self, severities=None):
+        self.severities = severities  # None means every severity
+
+    def accepts(self, alert):
+        return self.severities is None or alert['severity'] in self.severities
+
+    @abstractmethod
+    def send(self, alert):
+        """Deliver one alert; raise on failure"""
+
+    def flush(self):
+        pass
+
+
+class StdoutSink(AlertSink):
+    name = "stdout"
+
+    def send(self, alert):
+        print(f"{SEVERITY_EMOJI.get(alert['severity'], '📢')} {alert['message']}")
+
+
+class FileSink(AlertSink):
+    """Writes to the buffered, indexed alerts.log"""
+    name = "file"
+
+    def __init__(self, alert_log, severities=None):
+        super().__init__(severities)
+        self.alert_log = alert_log
+
+    def send(self, alert):
+        self.alert_log.write(alert)
+
+    def flush(self):
+        self.alert_log.flush()
+
+
+class EmailSink(AlertSink):
+    name = "email"
+
+    def __init__(self, email_config, severities=('critical', 'high')):
+        super().__init__(severities)
+        self.config = email_config
+
+    @property
+    def enabled(self):
+        return bool(self.config.get('enabled') and self.config.get('recipients'))
+
+    def send(self, alert):
+        msg = MIMEMultipart()
+        msg['From'] = self.config['username']
+        msg['To'] = ', '.join(self.config['recipients'])
+        msg['Subject'] = f"[{alert['severity'].upper()}] Multi-Agent System Alert"
+
+        body = f"""
+Alert Details:
+- Type: {alert['type']}
+- Severity: {alert['severity']}
+- Message: {alert['message']}
+- Timestamp: {alert['timestamp']}
+- Agent: {alert.get('agent', 'System')}
+
+Please check the agent communication hub for more details.
+            """
+
+        msg.attach(MIMEText(body, 'plain'))
+
+        server = smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port'], timeout=30)
+        try:
+            server.starttls()
+            server.login(self.config['username'], self.config['password'])
+            server.sendmail(self.config['username'], self.config['recipients'], msg.as_string())
+        finally:
+            server.quit()
+
+
+class WebhookSink(AlertSink):
+    """POSTs each alert as JSON, e.g. to a chat integration or a localhost receiver"""
+    name = "webhook"
+
+    def __init__(self, url, timeout=5, headers=None, severities=None):
+        super().__init__(severities)
+        self.url = url
+        self.timeout = timeout
+        self.headers = dict(headers or {}, **{'Content-Type': 'application/json'})
+
+    def send(self, alert):
+        request = urllib.request.Request(self.url, data=json.dumps(alert).encode('utf-8'),
+                                         headers=self.headers, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status >= 300:
+                raise RuntimeError(f"webhook returned HTTP {response.status}")
+
+
+class SinkWorker:
+    """
+    Delivers alerts to one sink from a background thread. Submitting never blocks:
+    when the queue is full the oldest alert is dropped, when the rate limit is
+    exhausted or the breaker is open the alert is dropped and counted. The thread
+    is started by the first alert, so processes that only detect alerts never
+    run one.
+    """
+
+    def __init__(self, sink, queue_size=100, rate_per_minute=None, burst=None,
+                 failure_threshold=5, reset_timeout=60):
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.bucket = TokenBucket(rate_per_minute / 60, burst or rate_per_minute) if rate_per_minute else None
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.stats = {'sent': 0, 'failed': 0, 'dropped': 0, 'rate_limited': 0, 'circuit_open': 0}
+        self.thread = None
+        self.start_lock = threading.Lock()
+
+    def start(self):
+        with self.start_lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name=f"alert-sink-{self.sink.name}", daemon=True)
+                self.thread.start()
+
+    def submit(self, alert):
+        if self.thread is None:
+            self.start()
+        while True:
+            try:
+                self.queue.put_nowait(alert)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.stats['dropped'] += 1
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        while True:
+            alert = self.queue.get()
+            try:
+                if alert is STOP:
+                    return
+                if alert is FLUSH:
+                    self.sink.flush()
+                else:
+                    self._deliver(alert)
+            except Exception as e:
+                print(f"Error in {self.sink.name} sink: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _deliver(self, alert):
+        if self.bucket and not self.bucket.take():
+            self.stats['rate_limited'] += 1
+            return
+        if not self.breaker.allow():
+            self.stats['circuit_open'] += 1
+            return
+
+        try:
+            self.sink.send(alert)
+            self.breaker.record_success()
+            self.stats['sent'] += 1
+        except Exception as e:
+            self.breaker.record_failure()
+            self.stats['failed'] += 1
+            print(f"Error sending alert to {self.sink.name} sink: {e}")
+
+    def flush(self):
+        """Ask the worker to flush its sink once the alerts queued so far are handled"""
+        if self.thread is not None:
+            self.submit(FLUSH)
+
+    def drain(self, timeout=5):
+        """Flush and wait (bounded) until everything queued has been handled"""
+        if self.thread is None:
+            return True
+        self.flush()
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self.queue.unfinished_tasks
+
+    def stop(self, timeout=5):
+        if self.thread is None:
+            return
+        self.drain(timeout)
+        self.submit(STOP)
+        self.thread.join(timeout)
+
+
+class AlertDispatcher:
+    """Fans each alert out to every sink that accepts it"""
+
+    def __init__(self, workers=None):
+        self.workers = list(workers or [])
+
+    def add(self, sink, **options):
+        worker = SinkWorker(sink, **options)
+        self.workers.append(worker)
+        return worker
+
+    def dispatch(self, alert):
+        for worker in self.workers:
+            if worker.sink.accepts(alert):
+                worker.submit(alert)
+
+    def flush(self):
+        for worker in self.workers:
+            worker.flush()
+
+    def drain(self, timeout=5):
+        return all([worker.drain(timeout) for worker in self.workers])
+
+    def stop(self, timeout=5):
+        for worker in self.workers:
+            worker.stop(timeout)
+
+    def stats(self):
+        return {worker.sink.name: dict(worker.stats, breaker=worker.breaker.state) for worker in self.workers}
+
+
+def build_dispatcher(config, alert_log):
+    """Create the sinks enabled in alert_config.json"""
+    sinks_config = config.get('sinks', {})
+    dispatcher = AlertDispatcher()
+
+    def options(name):
+        section = sinks_config.get(name, {})
+        return {key: section[key] for key in ('queue_size', 'rate_per_minute', 'burst',
+                                              'failure_threshold', 'reset_timeout') if key in section}
+
+    def severities(name, default=None):
+        return sinks_config.get(name, {}).get('severities', default)
+
+    if sinks_config.get('stdout', {}).get('enabled', True):
+        dispatcher.add(StdoutSink(severities('stdout')), **options('stdout'))
+    if sinks_config.get('file', {}).get('enabled', True):
+        dispatcher.add(FileSink(alert_log, severities('file')), **options('file'))
+
+    email = EmailSink(config['email'], severities('email', ('critical', 'high')))
+    if email.enabled:
+        dispatcher.add(email, **options('email'))
+
+    webhook = sinks_config.get('webhook', {})
+    if webhook.get('enabled') and webhook.get('url'):
+        dispatcher.add(WebhookSink(webhook['url'], webhook.get('timeout', 5), webhook.get('headers'),
+                                   severities('webhook')), **options('webhook'))
+
+    return dispatcher
+
+
+def main():
+    """Localhost webhook receiver for trying out the webhook sink"""
+    import argparse
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    parser = argparse.ArgumentParser(description="Print alerts POSTed by the webhook sink")
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+
+    class Receiver(BaseHTTPRequestHandler):
+        def do_POST(self):
+            alert = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            print(f"{alert['timestamp']} [{alert['severity']}] {alert['message']}")
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    print(f"Receiving alerts on http://127.0.0.1:{args.port}/")
+    HTTPServer(('127.0.0.1', args.port), Receiver).serve_forever()
+
+if __name__ == "__main__":
+    main()
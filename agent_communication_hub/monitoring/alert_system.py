@@ -5,15 +5,56 @@ Monitors for critical events and sends notifications
 """
 
 import json
+import sys
 import time
-import smtplib
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utilities"))
+from state_snapshot import StateSnapshot
+from alert_log import AlertLogWriter
+from alert_sinks import EmailSink, build_dispatcher
+from alert_aggregator import AlertAggregator
+from poll_scheduler import AdaptiveScheduler
+from instructions_parser import InstructionsArtifact
+from records import AlertRecord
+from memory_profiler import MemoryProfiler
+from cycle_profiler import CycleProfiler
+from hub_config import NUMBER, ConfigWatcher, MonitorConfig
+
+SINK_SCHEMA = {
+    'enabled': bool,
+    'severities': list,
+    'queue_size': int,
+    'rate_per_minute': NUMBER,
+    'burst': NUMBER,
+    'failure_threshold': int,
+    'reset_timeout': NUMBER
+}
+
+ALERT_SCHEMA = {
+    'email': {'enabled': bool, 'smtp_server': str, 'smtp_port': int, 'username': str,
+              'password': str, 'recipients': list},
+    'thresholds': {'agent_idle_minutes': NUMBER, 'task_overdue_hours': NUMBER, 'system_down_minutes': NUMBER,
+                   'productivity_threshold': NUMBER, 'dedup_minutes': NUMBER},
+    'alert_types': {'agent_blocked': bool, 'agent_idle': bool, 'task_overdue': bool,
+                    'system_down': bool, 'urgent_message': bool, 'low_productivity': bool},
+    'alert_log': {'filename': str, 'max_bytes': int, 'max_age_hours': NUMBER, 'compress': bool,
+                  'buffer_size': int, 'flush_interval': NUMBER},
+    'aggregation': {'enabled': bool, 'min_group_size': int, 'rate_per_minute': NUMBER,
+                    'burst': NUMBER, 'max_listed_agents': int},
+    'sinks': {
+        'stdout': SINK_SCHEMA,
+        'file': SINK_SCHEMA,
+        'email': SINK_SCHEMA,
+        'webhook': dict(SINK_SCHEMA, url=str, timeout=NUMBER, headers=dict)
+    }
+}
 
 class AlertSystem:
-    def __init__(self, hub_path="./agent_communication_hub", config_file="alert_config.json"):
+    def __init__(self, hub_path="./agent_communication_hub", config_file="alert_config.json", deliver=True):
+        """deliver=False runs only the checks and dedup window (no log, sinks or aggregation)"""
         self.hub_path = Path(hub_path)
         self.config_file = self.hub_path / config_file
         self.status_file = self.hub_path / "agent_status.json"
@@ -21,10 +62,43 @@ class AlertSystem:
         
         self.config = self.load_config()
         self.last_check = datetime.now()
-        self.alert_history = []
+        self.alert_history = deque(maxlen=100)  # AlertRecord dedup window
+        self.last_cycle_alerts = []
+        self.instructions = InstructionsArtifact(hub_path)
+        self.deliver = deliver
+        self.alert_log = self.dispatcher = self.aggregator = None
+        if deliver:
+            self.alert_log = AlertLogWriter(hub_path, **self.config['alert_log'])
+            self.dispatcher = build_dispatcher(self.config, self.alert_log)
+            self.aggregator = AlertAggregator(**self.config['aggregation'])
+        
+        self.snapshot = StateSnapshot(hub_path, "alert_system")
+        self.load_state()
+        
+    def load_state(self):
+        """Restore the dedup window so recent alerts are not re-sent after a restart"""
+        state = self.snapshot.load()
+        if not state:
+            return False
+        
+        for record in state.get('alert_history', []):
+            try:
+                self.alert_history.append(AlertRecord.from_dict(record))
+            except (KeyError, TypeError):
+                continue
+        if state.get('last_check'):
+            self.last_check = datetime.fromisoformat(state['last_check'])
+        return True
+    
+    def save_state(self):
+        """Checkpoint the dedup window"""
+        return self.snapshot.save({
+            'alert_history': [record.to_dict() for record in self.alert_history],
+            'last_check': self.last_check.isoformat()
+        })
         
     def load_config(self):
-        """Load alert configuration"""
+        """Load alert configuration; later edits are picked up by reload_config"""
         default_config = {
             "email": {
                 "enabled": False,
@@ -38,7 +112,8 @@ class AlertSystem:
                 "agent_idle_minutes": 60,
                 "task_overdue_hours": 4,
                 "system_down_minutes": 5,
-                "productivity_threshold": 30
+                "productivity_threshold": 30,
+                "dedup_minutes": 5
             },
             "alert_types": {
                 "agent_blocked": True,
@@ -47,26 +122,72 @@ class AlertSystem:
                 "system_down": True,
                 "urgent_message": True,
                 "low_productivity": False
+            },
+            "alert_log": {
+                "max_bytes": 10485760,
+                "max_age_hours": 24,
+                "compress": True
+            },
+            "aggregation": {
+                "enabled": True,
+                "min_group_size": 2,
+                "rate_per_minute": 1,
+                "burst": 2,
+                "max_listed_agents": 10
+            },
+            "sinks": {
+                "stdout": {"enabled": True},
+                "file": {"enabled": True, "queue_size": 1000},
+                "email": {"severities": ["critical", "high"], "rate_per_minute": 6, "burst": 3},
+                "webhook": {
+                    "enabled": False,
+                    "url": "http://127.0.0.1:8080/alerts",
+                    "timeout": 5,
+                    "rate_per_minute": 60,
+                    "failure_threshold": 5,
+                    "reset_timeout": 60
+                }
             }
         }
         
+        # Validated and deep-merged with the defaults; creates the file on first run
+        self.config_watcher = ConfigWatcher(self.config_file, default_config, ALERT_SCHEMA, create=True)
+        return self.config_watcher.config
+    
+    def reload_config(self):
+        """Swap in an edited alert_config.json without losing dedup state or queued alerts"""
+        if not self.config_watcher.poll():
+            return False
+        
+        old_config, config = self.config, self.config_watcher.config
+        if self.dispatcher is None:
+            # Detection only: thresholds and alert types are all that is used
+            self.config = config
+            return True
+        
+        # Build everything the new config needs before touching the running system,
+        # so a config a consumer rejects is never half-applied
         try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                # Merge with defaults
-                for key, value in default_config.items():
-                    if key not in config:
-                        config[key] = value
-                return config
-            else:
-                # Create default config file
-                with open(self.config_file, 'w') as f:
-                    json.dump(default_config, f, indent=2)
-                return default_config
+            dispatcher = None
+            if (old_config['sinks'], old_config['email']) != (config['sinks'], config['email']):
+                dispatcher = build_dispatcher(config, self.alert_log)
+            AlertAggregator(**config['aggregation'])
         except Exception as e:
-            print(f"Error loading config: {e}")
-            return default_config
+            print(f"Error applying {self.config_file.name}, keeping the previous version: {e}")
+            return False
+        
+        self.config = config
+        self.aggregator.configure(**config['aggregation'])
+        if dispatcher is not None:
+            # New workers take over; the old ones finish what is already queued
+            old_dispatcher, self.dispatcher = self.dispatcher, dispatcher
+            old_dispatcher.stop()
+        
+        if old_config['alert_log'] != self.config['alert_log']:
+            print("alert_log settings take effect on restart")
+        
+        print(f"Reloaded {self.config_file.name} (version {self.config_watcher.version})")
+        return True
     
     def check_agent_status(self):
         """Check for agent-related alerts"""
@@ -165,10 +286,10 @@ class AlertSystem:
             if not self.instructions_file.exists():
                 return alerts
             
-            with open(self.instructions_file, 'r') as f:
-                content = f.read()
+            # Shared parse artifact: the file is only read when it changed
+            signals = {d['type'] for d in self.instructions.load()['delimiters']}
             
-            if '(URGENT)' in content and self.config['alert_types']['urgent_message']:
+            if 'URGENT' in signals and self.config['alert_types']['urgent_message']:
                 alerts.append({
                     'type': 'urgent_message',
                     'severity': 'high',
@@ -176,7 +297,7 @@ class AlertSystem:
                     'timestamp': datetime.now().isoformat()
                 })
             
-            if '(BLOCKED)' in content:
+            if 'BLOCKED' in signals:
                 alerts.append({
                     'type': 'agent_blocked',
                     'severity': 'critical',
@@ -190,90 +311,75 @@ class AlertSystem:
         return alerts
     
     def send_email_alert(self, alert):
-        """Send email notification for alert"""
-        if not self.config['email']['enabled'] or not self.config['email']['recipients']:
+        """Send email notification for alert (synchronously, outside the sink queues)"""
+        sink = EmailSink(self.config['email'])
+        if not sink.enabled:
             return False
         
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.config['email']['username']
-            msg['To'] = ', '.join(self.config['email']['recipients'])
-            msg['Subject'] = f"[{alert['severity'].upper()}] Multi-Agent System Alert"
-            
-            body = f"""
-Alert Details:
-- Type: {alert['type']}
-- Severity: {alert['severity']}
-- Message: {alert['message']}
-- Timestamp: {alert['timestamp']}
-- Agent: {alert.get('agent', 'System')}
-
-Please check the agent communication hub for more details.
-            """
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            server = smtplib.SMTP(self.config['email']['smtp_server'], self.config['email']['smtp_port'])
-            server.starttls()
-            server.login(self.config['email']['username'], self.config['email']['password'])
-            
-            text = msg.as_string()
-            server.sendmail(self.config['email']['username'], self.config['email']['recipients'], text)
-            server.quit()
-            
+            sink.send(alert)
             return True
         except Exception as e:
             print(f"Error sending email alert: {e}")
             return False
     
     def log_alert(self, alert):
-        """Log alert to file"""
+        """Log alert to the buffered, indexed alerts.log"""
         try:
-            alert_log_file = self.hub_path / "alerts.log"
-            
-            with open(alert_log_file, 'a') as f:
-                f.write(f"{alert['timestamp']} [{alert['severity'].upper()}] {alert['type']}: {alert['message']}\n")
-            
+            self.alert_log.write(alert)
             return True
         except Exception as e:
             print(f"Error logging alert: {e}")
             return False
     
-    def process_alert(self, alert):
-        """Process a single alert"""
-        # Avoid duplicate alerts
+    def register_alert(self, alert):
+        """Record an alert in the dedup window; returns False if it is a recent duplicate"""
         alert_key = f"{alert['type']}_{alert.get('agent', 'system')}"
-        recent_alerts = [a for a in self.alert_history if 
-                        (datetime.now() - datetime.fromisoformat(a['timestamp'])).total_seconds() < 300]  # 5 minutes
+        now = time.time()
         
-        if any(a.get('key') == alert_key for a in recent_alerts):
-            return  # Skip duplicate
+        window = self.config['thresholds']['dedup_minutes'] * 60
+        if any(r.key == alert_key and now - r.timestamp < window for r in self.alert_history):
+            return False  # Skip duplicate
         
         alert['key'] = alert_key
-        self.alert_history.append(alert)
-        
-        # Keep only recent alerts in memory
-        self.alert_history = self.alert_history[-100:]
-        
-        # Log alert
-        self.log_alert(alert)
-        
-        # Print to console
-        severity_emoji = {
-            'critical': '🚨',
-            'high': '⚠️',
-            'warning': '⚠️',
-            'info': 'ℹ️'
-        }
-        
-        print(f"{severity_emoji.get(alert['severity'], '📢')} {alert['message']}")
-        
-        # Send email for critical and high severity alerts
-        if alert['severity'] in ['critical', 'high']:
-            self.send_email_alert(alert)
+        # Bounded deque keeps only the most recent alerts in memory
+        self.alert_history.append(AlertRecord.from_alert(alert, alert_key, now))
+        return True
     
-    def run_monitoring_cycle(self):
-        """Run one monitoring cycle"""
+    def require_delivery(self):
+        """Delivery entry points need the sinks; detection-only instances only collect and register alerts"""
+        if not self.deliver:
+            raise RuntimeError(
+                f"AlertSystem for {self.hub_path} was created with deliver=False and cannot deliver alerts; "
+                "use collect_alerts() and register_alert()"
+            )
+    
+    def deliver_alert(self, alert):
+        """Fan an alert that passed deduplication out to the sinks (stdout, file, email, webhook)"""
+        self.require_delivery()
+        # Non-blocking: each sink has its own queue, rate limit and circuit breaker
+        self.dispatcher.dispatch(alert)
+    
+    def process_alert(self, alert):
+        """Process a single alert; returns True if it was delivered"""
+        self.require_delivery()
+        if self.register_alert(alert):
+            self.deliver_alert(alert)
+            return True
+        return False
+    
+    def process_alerts(self, alerts):
+        """Deduplicate one cycle's alerts, collapse storms into summaries and deliver the rest"""
+        self.require_delivery()
+        new_alerts = [alert for alert in alerts if self.register_alert(alert)]
+        delivered = self.aggregator.aggregate(new_alerts, raw=alerts)
+        for alert in delivered:
+            self.deliver_alert(alert)
+        return delivered
+    
+    def collect_alerts(self):
+        """Run all checks and return the raw alerts"""
+        self.reload_config()
         all_alerts = []
         
         # Check different alert types
@@ -281,34 +387,59 @@ Please check the agent communication hub for more details.
         all_alerts.extend(self.check_system_status())
         all_alerts.extend(self.check_urgent_messages())
         
-        # Process each alert
-        for alert in all_alerts:
-            self.process_alert(alert)
+        return all_alerts
+    
+    def run_monitoring_cycle(self):
+        """Run one monitoring cycle"""
+        self.require_delivery()
+        all_alerts = self.collect_alerts()
+        
+        self.last_cycle_alerts = self.process_alerts(all_alerts)
+        
+        self.dispatcher.flush()
+        self.last_check = datetime.now()
+        self.save_state()
         
         return len(all_alerts)
     
-    def run_monitoring_loop(self, interval=60):  # 1 minute
+    def run_monitoring_loop(self, interval=60, min_interval=10):  # 1 minute
         """Run continuous monitoring loop"""
+        self.require_delivery()
         print("Starting alert monitoring...")
-        print(f"Monitoring interval: {interval} seconds")
+        print(f"Monitoring interval: {min_interval}-{interval} seconds")
+        
+        scheduler = AdaptiveScheduler(min_interval, interval)
+        intervals = MonitorConfig(self.hub_path, "alert_system", min_interval=min_interval, max_interval=interval)
+        profiler = MemoryProfiler("alert_system", self.hub_path)
+        cycle_profiler = CycleProfiler("alert_system", self.hub_path)
         
         while True:
             try:
-                alert_count = self.run_monitoring_cycle()
+                with cycle_profiler.cycle():
+                    alert_count = self.run_monitoring_cycle()
+                new_alerts = self.last_cycle_alerts
+                profiler.maybe_report()
                 
                 if alert_count == 0:
                     print(f"✅ All systems normal - {datetime.now().strftime('%H:%M:%S')}")
                 else:
                     print(f"⚠️ {alert_count} alert(s) processed - {datetime.now().strftime('%H:%M:%S')}")
                 
-                time.sleep(interval)
+                intervals.apply(scheduler)
+                scheduler.record(
+                    changed=bool(new_alerts),
+                    urgent=any(a['type'] in ('urgent_message', 'agent_blocked') for a in new_alerts)
+                )
+                scheduler.wait()
                 
             except KeyboardInterrupt:
                 print("\nStopping alert monitoring...")
+                self.dispatcher.stop()
                 break
             except Exception as e:
                 print(f"Error in monitoring loop: {e}")
-                time.sleep(interval)
+                scheduler.record()
+                scheduler.wait()
 
 def main():
     alert_system = AlertSystem()
@@ -316,6 +447,7 @@ def main():
     # Run one cycle for testing
     print("Running alert check...")
     alert_count = alert_system.run_monitoring_cycle()
+    alert_system.dispatcher.drain()
     print(f"Found {alert_count} alerts")
     
     # Uncomment to run continuous monitoring
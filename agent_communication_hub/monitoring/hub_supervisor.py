@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Multi-Hub Supervisor
+Monitors many project hubs from one deployment by sharding them across worker processes
+"""
+
+import json
+import queue
+import time
+import multiprocessing
+from datetime import datetime
+from pathlib import Path
+
+from alert_system import AlertSystem
+from alert_aggregator import AlertAggregator
+
+
+def estimate_hub_load(hub_path):
+    """Rough per-cycle cost of a hub: agents to check plus instructions.md size"""
+    hub_path = Path(hub_path)
+    load = 1.0
+
+    try:
+        with open(hub_path / "agent_status.json", 'r') as f:
+            load += len(json.load(f).get('agents', {}))
+    except Exception:
+        pass
+
+    try:
+        load += (hub_path / "instructions.md").stat().st_size / 10240  # one unit per 10KB
+    except OSError:
+        pass
+
+    return load
+
+
+def assign_shards(hub_paths, shard_count):
+    """Spread hubs over shards by load (largest hub first onto the lightest shard)"""
+    shard_count = max(1, min(shard_count, len(hub_paths)))
+    shards = [[] for _ in range(shard_count)]
+    shard_loads = [0.0] * shard_count
+
+    for hub_path, load in sorted(((h, estimate_hub_load(h)) for h in hub_paths),
+                                 key=lambda item: item[1], reverse=True):
+        lightest = shard_loads.index(min(shard_loads))
+        shards[lightest].append(str(hub_path))
+        shard_loads[lightest] += load
+
+    return shards
+
+
+def run_shard(hub_paths, alert_queue, interval=60, report_interval=300):
+    """Worker loop: one wake-up per cycle covers every hub in the shard; delivery happens in the parent"""
+    alert_systems = {hub: AlertSystem(hub, deliver=False) for hub in hub_paths}
+    trackers = {}
+    last_report = 0
+
+    while True:
+        try:
+            cycle_start = time.monotonic()
+
+            for hub, alert_system in alert_systems.items():
+                alerts = alert_system.collect_alerts()
+                new_alerts = [alert for alert in alerts if alert_system.register_alert(alert)]
+                alert_system.last_check = datetime.now()
+                alert_system.save_state()
+
+                if new_alerts:
+                    # The raw alerts let the aggregator see an outage that dedup suppressed
+                    alert_queue.put((hub, new_alerts, alerts))
+
+            if cycle_start - last_report >= report_interval:
+                last_report = cycle_start
+                write_hub_reports(hub_paths, trackers)
+
+            time.sleep(max(0, interval - (time.monotonic() - cycle_start)))
+
+        except KeyboardInterrupt:
+            break
+        except Exception as e:
+            print(f"Error in shard loop: {e}")
+            time.sleep(interval)
+
+
+def write_hub_reports(hub_paths, trackers):
+    """Produce the usual progress report for each hub in the shard"""
+    try:
+        from progress_tracker import ProgressTracker
+    except ImportError as e:
+        print(f"Progress reports disabled: {e}")
+        return
+
+    for hub in hub_paths:
+        tracker = trackers.setdefault(hub, ProgressTracker(hub))
+        report = tracker.generate_progress_report()
+        if report and tracker.last_delta:
+            tracker.update_progress_log(report)
+            tracker.write_report_file(report)
+        tracker.rebalance_work()
+        tracker.compact_instructions()
+
+
+class HubSupervisor:
+    """
+    Shard workers only detect and deduplicate; the parent owns the single
+    delivery pipeline (sinks and alerts.log from `delivery_hub`, by default the
+    first hub) and tags every alert with the hub it came from. Storms are
+    aggregated per hub.
+    """
+
+    def __init__(self, hub_paths, processes=None, interval=60, report_interval=300, delivery_hub=None):
+        self.hub_paths = [str(Path(h)) for h in hub_paths]
+        self.processes = processes or multiprocessing.cpu_count()
+        self.interval = interval
+        self.report_interval = report_interval
+        self.delivery_hub = str(Path(delivery_hub or self.hub_paths[0]))
+
+        self.shards = assign_shards(self.hub_paths, self.processes)
+        self.alert_queue = multiprocessing.Queue()
+        self.workers = []
+        self.delivery = None
+        self.aggregators = {}  # hub -> AlertAggregator
+
+    def start(self):
+        """Start one worker process per shard"""
+        for shard in self.shards:
+            worker = multiprocessing.Process(
+                target=run_shard,
+                args=(shard, self.alert_queue, self.interval, self.report_interval),
+                daemon=True
+            )
+            worker.start()
+            self.workers.append(worker)
+
+        print(f"Supervising {len(self.hub_paths)} hub(s) across {len(self.workers)} shard(s)")
+
+    def deliver(self, hub, alerts, raw=None):
+        """Shared delivery pipeline: one dispatcher and log for the alerts of every hub"""
+        if self.delivery is None:
+            self.delivery = AlertSystem(self.delivery_hub)
+
+        if self.delivery.reload_config():
+            for aggregator in self.aggregators.values():
+                aggregator.configure(**self.delivery.config['aggregation'])
+        if hub not in self.aggregators:
+            self.aggregators[hub] = AlertAggregator(**self.delivery.config['aggregation'])
+
+        # Shards already deduplicated; storms from one hub collapse into per-group summaries here
+        for alert in self.aggregators[hub].aggregate(alerts, raw):
+            # The field is for webhooks; the message prefix tells log and stdout readers apart
+            alert['hub'] = hub
+            alert['message'] = f"[{Path(hub).name}] {alert['message']}"
+            self.delivery.deliver_alert(alert)
+        self.delivery.dispatcher.flush()
+
+    def release_held(self):
+        """Send the summaries the rate limit held back, for every hub that has some"""
+        for hub, aggregator in list(self.aggregators.items()):
+            if aggregator.held:
+                self.deliver(hub, [])
+
+    def run(self):
+        """Start the shards and deliver their alerts until interrupted"""
+        self.start()
+        next_release = time.monotonic() + self.interval
+
+        try:
+            while True:
+                try:
+                    hub, alerts, raw = self.alert_queue.get(timeout=max(0, next_release - time.monotonic()))
+                    self.deliver(hub, alerts, raw)
+                except queue.Empty:
+                    pass
+
+                # On a deadline, not on a quiet queue: a busy shard must not starve other hubs' summaries
+                if time.monotonic() >= next_release:
+                    self.release_held()
+                    next_release = time.monotonic() + self.interval
+        except KeyboardInterrupt:
+            print("\nStopping hub supervisor...")
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Terminate all shard workers and drain the alert sinks"""
+        for worker in self.workers:
+            worker.terminate()
+            worker.join()
+        self.workers = []
+        if self.delivery is not None:
+            self.delivery.dispatcher.stop()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Monitor several agent communication hubs")
+    parser.add_argument('hubs', nargs='+', help="Hub root directories")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--interval', type=int, default=60)
+    parser.add_argument('--report-interval', type=int, default=300)
+    parser.add_argument('--delivery-hub', default=None,
+                        help="hub whose alert_config.json sinks and alerts.log receive every hub's alerts "
+                             "(default: the first hub)")
+    args = parser.parse_args()
+
+    supervisor = HubSupervisor(args.hubs, args.processes, args.interval, args.report_interval, args.delivery_hub)
+    supervisor.run()
+
+if __name__ == "__main__":
+    main()
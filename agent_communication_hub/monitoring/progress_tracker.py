@@ -5,18 +5,102 @@ Monitors agent progress and generates reports
 """
 
 import json
+import os
+import sys
 import time
+from dataclasses import replace
 from datetime import datetime, timedelta
 from pathlib import Path
 import matplotlib.pyplot as plt
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utilities"))
+from poll_scheduler import AdaptiveScheduler
+from hub_config import MonitorConfig
+from records import AgentMetrics
+from memory_profiler import MemoryProfiler
+from cycle_profiler import CycleProfiler
+from status_events import StatusAggregator
+from history_index import HistoryIndex
+from task_graph import TaskGraph
+from work_stealer import WorkStealer
+from compact_instructions import InstructionsCompactor
+
+IDLE_MINUTES = 60
+# Changes every tick by definition; not treated as a change in report deltas
+VOLATILE_METRICS = ('time_since_last_activity',)
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+def stable_metrics(metrics):
+    if metrics is None:
+        return None
+    return {key: value for key, value in metrics.to_dict().items() if key not in VOLATILE_METRICS}
+
+
+def to_json(value):
+    """json.dump default: AgentMetrics records stay records until a report is serialized"""
+    return value.to_dict()
+
+
+def diff_reports(previous, report):
+    """What changed between two reports; an empty dict means nothing did"""
+    delta = {}
+    previous_agents = previous['agent_metrics'] if previous else {}
+
+    changed = {name: metrics for name, metrics in report['agent_metrics'].items()
+               if stable_metrics(previous_agents.get(name)) != stable_metrics(metrics)}
+    removed = [name for name in previous_agents if name not in report['agent_metrics']]
+    if changed:
+        delta['agent_metrics'] = changed
+    if removed:
+        delta['removed_agents'] = removed
+
+    for key in ('system_status', 'task_summary', 'daily_activity', 'critical_path'):
+        if previous is None or previous[key] != report[key]:
+            delta[key] = report[key]
+
+    previous_recs = previous['recommendations'] if previous else []
+    added = [rec for rec in report['recommendations'] if rec not in previous_recs]
+    resolved = [rec for rec in previous_recs if rec not in report['recommendations']]
+    if added or resolved:
+        delta['recommendations'] = {'added': added, 'resolved': resolved}
+
+    return delta
+
+
 class ProgressTracker:
     def __init__(self, hub_path="./agent_communication_hub"):
         self.hub_path = Path(hub_path)
         self.status_file = self.hub_path / "agent_status.json"
         self.tasks_file = self.hub_path / "task_assignments.json"
         self.progress_file = self.hub_path / "progress_log.md"
+        self.updates_file = self.hub_path / "progress_updates.jsonl"
+        self.report_file = self.hub_path / "progress_report.json"
+        self.events_file = self.hub_path / "status_events.jsonl"
+        self.aggregator = StatusAggregator(hub_path)
+        self.history = HistoryIndex(hub_path)
+        self.task_graph = TaskGraph()
+        self.critical_path = None
+        self.work_stealer = WorkStealer(hub_path)
+        self.compactor = InstructionsCompactor(hub_path)
+        
+        # Incremental state: inputs are only re-read, and agents only recomputed, when they change
+        self.signatures = (None, None, None, None)
+        self.status_data = None
+        self.task_data = None
+        self.agent_cache = {}  # agent -> (entry fingerprint, last activity, AgentMetrics)
+        self.idle_deadline = None  # when the next waiting agent crosses the idle threshold
+        self.last_report = None
+        self.last_delta = None
+        self.revision = 0
         
     def get_current_status(self):
         """Get current agent status"""
@@ -37,24 +121,51 @@ class ProgressTracker:
             return None
     
     def calculate_productivity_metrics(self, status_data):
-        """Calculate productivity metrics for each agent"""
+        """Calculate productivity metrics for each agent (reusing agents whose entry is unchanged)"""
         metrics = {}
+        now = datetime.now()
+        
+        self.aggregator.refresh()
         
         for agent_name, agent_data in status_data['agents'].items():
-            last_activity = datetime.fromisoformat(agent_data['last_activity'].replace('Z', '+00:00'))
-            time_since_activity = datetime.now() - last_activity.replace(tzinfo=None)
+            # Hours, daily completions and utilization come from the status event rollups
+            if self.aggregator.knows(agent_name):
+                agent_data = dict(agent_data, **self.aggregator.derived(agent_name, now.timestamp()))
+            fingerprint = json.dumps(agent_data, sort_keys=True)
+            cached = self.agent_cache.get(agent_name)
             
-            metrics[agent_name] = {
-                'tasks_completed_today': agent_data['completed_tasks_today'],
-                'total_hours_logged': agent_data['total_hours_logged'],
-                'current_status': agent_data['status'],
-                'availability': agent_data['availability'],
-                'time_since_last_activity': time_since_activity.total_seconds() / 60,  # minutes
-                'productivity_score': self._calculate_productivity_score(agent_data)
-            }
+            if cached and cached[0] == fingerprint:
+                _, last_activity, agent_metrics = cached
+            else:
+                last_activity = datetime.fromisoformat(agent_data['last_activity'].replace('Z', '+00:00'))
+                last_activity = last_activity.replace(tzinfo=None)
+                agent_metrics = AgentMetrics(
+                    tasks_completed_today=agent_data['completed_tasks_today'],
+                    total_hours_logged=agent_data['total_hours_logged'],
+                    current_status=agent_data['status'],
+                    availability=agent_data['availability'],
+                    time_since_last_activity=0,
+                    productivity_score=self._calculate_productivity_score(agent_data),
+                    utilization=agent_data.get('utilization', 0.0)
+                )
+                self.agent_cache[agent_name] = (fingerprint, last_activity, agent_metrics)
+            
+            # A fresh record per report: the previous report keeps its own values for diffing
+            metrics[agent_name] = replace(agent_metrics,
+                                          time_since_last_activity=(now - last_activity).total_seconds() / 60)
+        
+        for agent_name in set(self.agent_cache) - set(status_data['agents']):
+            del self.agent_cache[agent_name]
         
         return metrics
     
+    def _next_idle_deadline(self, metrics):
+        """Earliest time a waiting agent becomes idle, which changes the recommendations"""
+        deadlines = [self.agent_cache[name][1] + timedelta(minutes=IDLE_MINUTES)
+                     for name, data in metrics.items()
+                     if data.current_status == 'waiting' and data.time_since_last_activity <= IDLE_MINUTES]
+        return min(deadlines) if deadlines else None
+    
     def _calculate_productivity_score(self, agent_data):
         """Calculate a productivity score (0-100)"""
         score = 0
@@ -80,14 +191,38 @@ class ProgressTracker:
         return max(0, min(100, score))
     
     def generate_progress_report(self):
-        """Generate comprehensive progress report"""
-        status_data = self.get_current_status()
-        task_data = self.get_task_assignments()
+        """
+        Generate comprehensive progress report. Returns the previous report object
+        unchanged when nothing in it would differ; self.last_delta holds what changed.
+        """
+        # The date is part of the signature so daily counts roll over at midnight
+        signatures = (file_signature(self.status_file), file_signature(self.tasks_file),
+                      file_signature(self.events_file), datetime.now().date())
+        idle_due = self.idle_deadline is not None and datetime.now() >= self.idle_deadline
+        # Completion records (segments, completed_tasks.md) calibrate the estimates; the
+        # progress log (written by this tracker) and status events are not history here
+        self.history.refresh()
+        history_changed = self.history.completion_changes
+        
+        if self.last_report and signatures == self.signatures and not idle_due and not history_changed:
+            self.last_delta = {}
+            return self.last_report
+        
+        status_data = self.get_current_status() if signatures[0] != self.signatures[0] else self.status_data
+        task_data = self.get_task_assignments() if signatures[1] != self.signatures[1] else self.task_data
         
         if not status_data or not task_data:
             return None
         
+        if signatures[1] != self.signatures[1] or history_changed or self.critical_path is None:
+            self.critical_path = self.analyze_dependencies(task_data)
+        
+        self.signatures = signatures
+        self.status_data = status_data
+        self.task_data = task_data
+        
         metrics = self.calculate_productivity_metrics(status_data)
+        self.idle_deadline = self._next_idle_deadline(metrics)
         
         report = {
             'timestamp': datetime.now().isoformat(),
@@ -98,18 +233,71 @@ class ProgressTracker:
                 'completed_tasks': len(task_data['completed_tasks']),
                 'total_assignments': len(task_data['assignment_history'])
             },
+            'daily_activity': self.aggregator.daily(7),
+            'critical_path': self.critical_path,
             'recommendations': self._generate_recommendations(metrics, task_data)
         }
         
+        self.last_delta = diff_reports(self.last_report, report)
+        if not self.last_delta:
+            return self.last_report
+        
+        self.revision += 1
+        report['revision'] = self.revision
+        self.last_report = report
         return report
     
+    def analyze_dependencies(self, task_data, days=7):
+        """
+        Critical path and slack over the task DAG, with estimates calibrated by
+        recorded durations (from self.history as of its last refresh)
+        """
+        completions = self.history.completions()
+        actuals = {doc['task_id']: doc['duration_hours'] for doc in reversed(completions)
+                   if doc.get('task_id') and doc['duration_hours'] is not None}
+        
+        self.task_graph.update(task_data, actuals)
+        summary = self.task_graph.summary()
+        since = time.time() - days * 86400
+        recent = sum(1 for doc in completions if (doc['timestamp'] or 0) >= since)
+        summary['throughput_per_day'] = round(recent / days, 2)
+        return summary
+    
+    def rebalance_work(self):
+        """Let idle agents steal queued tasks; the moved tasks show up in the next report"""
+        try:
+            return self.work_stealer.rebalance(self.task_graph)
+        except Exception as e:
+            print(f"Error rebalancing work: {e}")
+            return []
+    
+    def compact_instructions(self):
+        """Keep instructions.md bounded: archive resolved blocks once it passes the configured limits"""
+        try:
+            return self.compactor.maybe_compact()
+        except Exception as e:
+            print(f"Error compacting instructions: {e}")
+            return 0
+    
+    def write_report_file(self, report):
+        """Publish the latest report and its delta for the dashboard"""
+        try:
+            temp_file = self.report_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump(dict(report, delta=self.last_delta), f, indent=2, default=to_json)
+            os.replace(temp_file, self.report_file)
+            return True
+        except Exception as e:
+            print(f"Error writing progress report: {e}")
+            return False
+    
     def _generate_recommendations(self, metrics, task_data):
         """Generate recommendations based on current status"""
         recommendations = []
         
         # Check for blocked agents
         blocked_agents = [name for name, data in metrics.items() 
-                         if data['current_status'] == 'blocked']
+                         if data.current_status == 'blocked']
         if blocked_agents:
             recommendations.append({
                 'type': 'urgent',
@@ -118,7 +306,7 @@ class ProgressTracker:
         
         # Check for idle agents
         idle_agents = [name for name, data in metrics.items() 
-                      if data['current_status'] == 'waiting' and data['time_since_last_activity'] > 60]
+                      if data.current_status == 'waiting' and data.time_since_last_activity > IDLE_MINUTES]
         if idle_agents:
             recommendations.append({
                 'type': 'attention',
@@ -127,7 +315,7 @@ class ProgressTracker:
         
         # Check productivity scores
         low_productivity = [name for name, data in metrics.items() 
-                           if data['productivity_score'] < 30]
+                           if data.productivity_score < 30]
         if low_productivity:
             recommendations.append({
                 'type': 'improvement',
@@ -137,7 +325,7 @@ class ProgressTracker:
         # Check task distribution
         active_tasks = len(task_data['active_tasks'])
         working_agents = len([name for name, data in metrics.items() 
-                             if data['current_status'] == 'working'])
+                             if data.current_status == 'working'])
         
         if active_tasks > working_agents * 2:
             recommendations.append({
@@ -167,6 +355,7 @@ class ProgressTracker:
 - Communication Hub: {'✅ Active' if report['system_status']['communication_hub_active'] else '❌ Inactive'}
 - Active Tasks: {report['task_summary']['active_tasks']}
 - Completed Tasks: {report['task_summary']['completed_tasks']}
+- Critical Path: {report['critical_path']['critical_path_length']} task(s), {report['critical_path']['remaining_hours']}h remaining
 
 ### Agent Status
 """
@@ -177,9 +366,9 @@ class ProgressTracker:
                     'active': '✅',
                     'waiting': '⏳',
                     'blocked': '🚨'
-                }.get(metrics['current_status'], '❓')
+                }.get(metrics.current_status, '❓')
                 
-                new_entry += f"- **{agent_name.replace('_', ' ').title()}**: {status_emoji} {metrics['current_status']} (Score: {metrics['productivity_score']}/100)\n"
+                new_entry += f"- **{agent_name.replace('_', ' ').title()}**: {status_emoji} {metrics.current_status} (Score: {metrics.productivity_score}/100)\n"
             
             # Add recommendations
             if report['recommendations']:
@@ -191,13 +380,18 @@ class ProgressTracker:
             new_entry += "\n---\n"
             
             # Insert at the beginning of the log section
-            if "## Progress Updates" in content:
-                content = content.replace("## Progress Updates", f"## Progress Updates{new_entry}")
+            head, marker, tail = content.partition("## Progress Updates")
+            if marker:
+                content = f"{head}## Progress Updates{new_entry}{tail}"
             else:
                 content += f"\n## Progress Updates{new_entry}"
             
             with open(self.progress_file, 'w') as f:
                 f.write(content)
+            
+            # Append-only copy for HistoryIndex, which then never re-reads the log itself
+            with open(self.updates_file, 'a') as f:
+                f.write(json.dumps({'ts': time.time(), 'text': new_entry}) + "\n")
                 
             return True
         except Exception as e:
@@ -218,7 +412,7 @@ class ProgressTracker:
             
             # Productivity scores chart
             agents = list(metrics.keys())
-            scores = [metrics[agent]['productivity_score'] for agent in agents]
+            scores = [metrics[agent].productivity_score for agent in agents]
             
             plt.figure(figsize=(10, 6))
             bars = plt.bar(agents, scores, color=['#28a745' if s >= 70 else '#ffc107' if s >= 40 else '#dc3545' for s in scores])
@@ -236,7 +430,7 @@ class ProgressTracker:
             plt.close()
             
             # Task completion chart
-            completed_tasks = [metrics[agent]['tasks_completed_today'] for agent in agents]
+            completed_tasks = [metrics[agent].tasks_completed_today for agent in agents]
             
             plt.figure(figsize=(10, 6))
             plt.bar(agents, completed_tasks, color='#007bff')
@@ -254,17 +448,34 @@ class ProgressTracker:
         except Exception as e:
             print(f"Error generating charts: {e}")
             return False
+        finally:
+            # Never leave figures registered with pyplot in a long-running process
+            plt.close('all')
     
-    def run_monitoring_loop(self, interval=300):  # 5 minutes
+    def run_monitoring_loop(self, interval=300, min_interval=60):  # 5 minutes
         """Run continuous monitoring loop"""
         print("Starting progress monitoring...")
         
+        scheduler = AdaptiveScheduler(min_interval, interval)
+        intervals = MonitorConfig(self.hub_path, "progress_tracker", min_interval=min_interval, max_interval=interval)
+        profiler = MemoryProfiler("progress_tracker", self.hub_path)
+        cycle_profiler = CycleProfiler("progress_tracker", self.hub_path)
+        
         while True:
             try:
-                report = self.generate_progress_report()
-                if report:
-                    self.update_progress_log(report)
-                    
+                profiler.maybe_report()
+                urgent_recs = []
+                moves = []
+                with cycle_profiler.cycle():
+                    report = self.generate_progress_report()
+                    if report and self.last_delta:
+                        # Only log and publish when something in the report actually changed
+                        self.update_progress_log(report)
+                        self.write_report_file(report)
+                    moves = self.rebalance_work()
+                    self.compact_instructions()
+                
+                if report and self.last_delta:
                     # Generate charts every hour
                     if datetime.now().minute == 0:
                         self.generate_charts()
@@ -274,14 +485,17 @@ class ProgressTracker:
                     for rec in urgent_recs:
                         print(f"🚨 URGENT: {rec['message']}")
                 
-                time.sleep(interval)
+                intervals.apply(scheduler)
+                scheduler.record(changed=bool(moves), urgent=bool(urgent_recs))
+                scheduler.wait()
                 
             except KeyboardInterrupt:
                 print("\nStopping progress monitoring...")
                 break
             except Exception as e:
                 print(f"Error in monitoring loop: {e}")
-                time.sleep(interval)
+                scheduler.record()
+                scheduler.wait()
 
 def main():
     tracker = ProgressTracker()
@@ -290,9 +504,10 @@ def main():
     report = tracker.generate_progress_report()
     if report:
         print("Progress Report Generated:")
-        print(json.dumps(report, indent=2))
+        print(json.dumps(report, indent=2, default=to_json))
         
         tracker.update_progress_log(report)
+        tracker.write_report_file(report)
         tracker.generate_charts()
     
     # Start monitoring loop
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Work Stealing
+Moves queued, not-yet-started tasks from busy agents to idle agents that can do them
+"""
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utilities"))
+from agent_mailbox import Mailbox
+from hub_config import MonitorConfig
+from task_index import TaskIndex
+from task_store import TaskStore
+
+PRIORITY_RANK = {'urgent': 0, 'high': 1, 'medium': 2, 'low': 3}
+DEFAULTS = {
+    'enabled': True,
+    'min_idle_minutes': 5,  # how long an agent must have been waiting before it steals
+    'min_victim_queue': 1,  # queued tasks a busy agent must have before it is stolen from
+    'max_steals_per_cycle': 5,
+    'availability': ['available'],  # availability values that allow an idle agent to steal
+    'skills': {},  # agent -> extra template / coding_standards names it may take on
+    # Agents never stolen from or given stolen work, e.g. agents driven by task_parser.js,
+    # which cannot take the hub lock to mark the tasks it starts
+    'exclude': []
+}
+
+
+def minutes_since(timestamp, now):
+    try:
+        moment = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).replace(tzinfo=None)
+    except (AttributeError, ValueError):
+        return 0
+    return (now - moment).total_seconds() / 60
+
+
+class WorkStealer:
+    """
+    An idle agent (status 'waiting' with a stealing availability, for at least
+    min_idle_minutes, and no queued work of its own) takes one ready task from
+    the busy agent with the longest queue. Only tasks whose dependencies are
+    complete are taken, and only if the thief has worked on the task's template
+    or coding standards before (or has them listed under `skills`). A task is
+    queued until its owner's monitor marks it started in task_assignments.json
+    (TaskStore.start, before handing it to the agent). Each claim is a
+    compare-and-swap on the task's version, which every start bumps, so a task
+    that was started, reassigned or stolen in the meantime is left alone. Both
+    agents are notified through their mailboxes.
+    """
+
+    def __init__(self, hub_path="./agent_communication_hub"):
+        self.hub_path = Path(hub_path)
+        self.status_file = self.hub_path / "agent_status.json"
+        self.store = TaskStore(hub_path)
+        self.index = TaskIndex(hub_path)
+        self.config = MonitorConfig(hub_path, "work_stealing", **DEFAULTS)
+        self.mailbox = Mailbox(hub_path, "work_stealer")
+        self.conflicts = 0
+
+    def load_status(self):
+        try:
+            with open(self.status_file, 'r') as f:
+                return json.load(f).get('agents', {})
+        except Exception as e:
+            print(f"Error reading status: {e}")
+            return None
+
+    def is_queued(self, task):
+        """Assigned, not marked started by its owner's monitor, and not pinned to it"""
+        return task.get('stealable', True) and not TaskStore.is_started(task)
+
+    def is_ready(self, task):
+        """Every dependency is a completed task"""
+        for dep in task.get('dependencies') or ():
+            record = self.index.by_id.get(dep)
+            if record is None or record.state != 'completed_tasks':
+                return False
+        return True
+
+    def skills(self, agent_name):
+        """Templates and coding standards of everything the agent has been assigned, plus configured skills"""
+        skills = set(self.config.get('skills').get(agent_name, ()))
+        for task_id in self.index.by_agent.get(agent_name, ()):
+            task = self.index.by_id[task_id].task
+            skills.update(value for value in (task.get('template'), task.get('coding_standards')) if value)
+        return skills
+
+    def plan(self, agents, now=None):
+        """(thieves longest-idle first, queued tasks per busy agent)"""
+        now = now or datetime.now()
+        agents = {name: data for name, data in agents.items() if name not in self.config.get('exclude')}
+        queues = {}
+        for record in self.index.by_id.values():
+            if record.state == 'active_tasks' and record.assigned_to in agents and self.is_queued(record.task):
+                queues.setdefault(record.assigned_to, []).append(record.task)
+
+        min_idle = self.config.get('min_idle_minutes')
+        availability = self.config.get('availability')
+        idle = {name: minutes_since(data.get('last_activity'), now) for name, data in agents.items()
+                if data.get('status') == 'waiting' and data.get('availability') in availability
+                and name not in queues}
+        thieves = sorted((name for name, minutes in idle.items() if minutes >= min_idle),
+                         key=lambda name: idle[name], reverse=True)
+
+        min_queue = self.config.get('min_victim_queue')
+        victims = {name: tasks for name, tasks in queues.items()
+                   if agents[name].get('status') != 'waiting' and len(tasks) >= min_queue}
+        return thieves, victims
+
+    def _urgency(self, task_graph):
+        def key(task):
+            slack = task_graph.slack(task['task_id']) if task_graph and task['task_id'] in task_graph.index \
+                else float('inf')
+            return (slack, PRIORITY_RANK.get(task.get('priority'), 2), task.get('assigned_at') or '', task['task_id'])
+        return key
+
+    def _guard(self, thief):
+        """Evaluated under the tasks lock: the task is still unstarted and the thief still idle"""
+        def guard(task):
+            agents = self.load_status() or {}
+            return not TaskStore.is_started(task) and agents.get(thief, {}).get('status') == 'waiting'
+        return guard
+
+    def rebalance(self, task_graph=None):
+        """One stealing round; returns the moves made as (task_id, victim, thief)"""
+        self.config.poll()
+        if not self.config.get('enabled'):
+            return []
+
+        agents = self.load_status()
+        self.index.refresh()
+        if not agents or not self.index.by_id:
+            return []
+
+        thieves, victims = self.plan(agents)
+        urgency = self._urgency(task_graph)
+        moves = []
+
+        for thief in thieves:
+            if len(moves) >= self.config.get('max_steals_per_cycle') or not victims:
+                break
+            skills = self.skills(thief)
+            # Steal from the longest queue that has something this agent can do right now
+            for victim in sorted(victims, key=lambda name: len(victims[name]), reverse=True):
+                candidates = sorted((task for task in victims[victim]
+                                     if (task.get('template') in skills or task.get('coding_standards') in skills)
+                                     and self.is_ready(task)), key=urgency)
+                claimed = self.claim(candidates, victim, thief)
+                if claimed:
+                    moves.append((claimed['task_id'], victim, thief))
+                    victims[victim] = [task for task in victims[victim] if task['task_id'] != claimed['task_id']]
+                    if len(victims[victim]) < self.config.get('min_victim_queue'):
+                        del victims[victim]
+                    break
+
+        return moves
+
+    def claim(self, candidates, victim, thief):
+        """CAS the first candidate that is still as we read it over to the thief"""
+        for task in candidates:
+            # The index copy is template-expanded; only id, owner and version are compared
+            expected = TaskStore.snapshot(task)
+            claimed = self.store.compare_and_swap(
+                task['task_id'], expected,
+                {'assigned_to': thief, 'stolen_from': victim, 'reassigned_at': datetime.now().isoformat()},
+                guard=self._guard(thief),
+                history={'action': 'stolen', 'from': victim, 'to': thief}
+            )
+            if claimed is None:
+                self.conflicts += 1
+                continue
+
+            print(f"Work stealing: {task['task_id']} moved from {victim} to {thief}")
+            self.notify(self.index.expand(claimed), victim, thief)
+            return claimed
+        return None
+
+    def notify(self, task, victim, thief):
+        try:
+            self.mailbox.send(thief, 'task_assigned', f"Task {task['task_id']} taken over from {victim}; "
+                              "start it now.", subject=task.get('description'), priority="high", task=task)
+            self.mailbox.send(victim, 'task_reassigned', f"Task {task['task_id']} was reassigned to {thief} "
+                              "while it was still queued; drop it from your queue.", task_id=task['task_id'])
+        except Exception as e:
+            print(f"Error notifying agents about {task['task_id']}: {e}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run one work-stealing round for a hub")
+    parser.add_argument('--hub', default="./agent_communication_hub")
+    parser.add_argument('--dry-run', action='store_true', help="show idle agents and stealable queues only")
+    args = parser.parse_args()
+
+    stealer = WorkStealer(args.hub)
+    if args.dry_run:
+        agents = stealer.load_status() or {}
+        stealer.index.refresh()
+        thieves, victims = stealer.plan(agents)
+        print(f"Idle agents: {', '.join(thieves) or 'none'}")
+        for victim, tasks in victims.items():
+            print(f"{victim}: {', '.join(task['task_id'] for task in tasks)}")
+        return
+
+    moves = stealer.rebalance()
+    print(f"{len(moves)} task(s) moved, {stealer.conflicts} claim(s) lost to concurrent updates")
+
+if __name__ == "__main__":
+    main()
@@ -4,27 +4,52 @@ Simple Agent Monitor - Polls instructions.md for tasks
 Much simpler version for same-computer agents
 """
 
-import time
-import json
-import re
+import sys
 from pathlib import Path
 from datetime import datetime
 
-def simple_agent_monitor(agent_name="warp_agent", working_interval=60, waiting_interval=10):
+sys.path.insert(0, str(Path(__file__).resolve().parent / "utilities"))
+from instructions_parser import InstructionsArtifact
+from poll_scheduler import AdaptiveScheduler
+from memory_profiler import MemoryProfiler
+from cycle_profiler import CycleProfiler
+from status_buffer import StatusWriteBuffer
+from change_detector import FileChangeDetector
+from hub_config import MonitorConfig
+from task_index import TaskIndex
+from task_store import TaskStore
+from agent_mailbox import Mailbox
+from quality_gate_runner import QualityGateRunner, print_report
+
+def simple_agent_monitor(agent_name="warp_agent", working_interval=60, waiting_interval=10, min_interval=2,
+                         execute_task=None, project_root="."):
     """
     Simple file polling monitor for agents
     
     Args:
         agent_name: Name of this agent
-        working_interval: Polling interval when working on a task (seconds) - less frequent
-        waiting_interval: Polling interval when waiting for tasks (seconds) - more frequent
+        working_interval: Longest polling interval when working on a task (seconds) - less frequent
+        waiting_interval: Longest polling interval when waiting for tasks (seconds) - more frequent
+        min_interval: Polling interval right after a change or URGENT/BLOCKED signal (seconds)
+        execute_task: Optional callable(task); returning True completes the task once its quality gates pass
+        project_root: Directory the quality gates run in
     """
     
     instructions_file = Path("agent_communication_hub/instructions.md")
     status_file = Path("agent_communication_hub/agent_status.json")
+    instructions = InstructionsArtifact("agent_communication_hub")
+    task_index = TaskIndex("agent_communication_hub")
+    task_store = TaskStore("agent_communication_hub")
+    mailbox = Mailbox("agent_communication_hub", agent_name)
     
     current_task = None
-    last_modified = 0
+    detector = FileChangeDetector(instructions_file)
+    scheduler = AdaptiveScheduler(min_interval, waiting_interval)
+    # monitor_config.json overrides the arguments and is re-read when edited
+    intervals = MonitorConfig("agent_communication_hub", "simple_monitor", min_interval=min_interval,
+                              working_interval=working_interval, waiting_interval=waiting_interval)
+    profiler = MemoryProfiler(f"simple_monitor_{agent_name}", "agent_communication_hub")
+    cycle_profiler = CycleProfiler(f"simple_monitor_{agent_name}", "agent_communication_hub")
     
     print(f"🤖 {agent_name} starting simple monitor...")
     print(f"📁 Watching: {instructions_file}")
@@ -32,99 +57,123 @@ def simple_agent_monitor(agent_name="warp_agent", working_interval=60, waiting_i
     
     while True:
         try:
-            # Check if instructions file was modified
-            if instructions_file.exists():
-                modified = instructions_file.stat().st_mtime
+            profiler.maybe_report()
+            with cycle_profiler.cycle():
+                changed = False
+                urgent = False
                 
-                if modified > last_modified:
-                    last_modified = modified
+                # Check if instructions file was modified (stat first, content hash when ambiguous)
+                if detector.changed():
+                    changed = True
                     print(f"📝 Instructions updated at {datetime.now().strftime('%H:%M:%S')}")
                     
-                    # Read and parse instructions
-                    with open(instructions_file, 'r') as f:
-                        content = f.read()
+                    # Shared parse artifact - only re-parsed when the content changed
+                    parsed = instructions.load()
                     
                     # Look for tasks assigned to this agent
-                    my_tasks = find_my_tasks(content, agent_name)
+                    my_tasks = find_my_tasks(parsed, agent_name, task_index)
                     
                     if my_tasks:
                         for task in my_tasks:
-                            if task['task_id'] != current_task:
-                                print(f"🎯 New task assigned: {task['task_id']}")
-                                print(f"📋 Description: {task['description']}")
-                                
+                            if task['task_id'] != current_task and start_task(task_store, task, agent_name):
                                 current_task = task['task_id']
                                 update_my_status(status_file, agent_name, 'working', current_task)
-                                
-                                # Here you would call your task execution logic
-                                # execute_task(task)
+                                if run_task(execute_task, task, status_file, agent_name, project_root):
+                                    current_task = None
                     
                     # Check for completion signals, questions, etc.
-                    check_communication_signals(content)
+                    urgent = check_communication_signals(parsed)
+                
+                # Tasks handed over by work stealing (monitoring/work_stealer.py)
+                for message in mailbox.receive():
+                    if message['kind'] == 'task_assigned' and start_task(task_store, message['task'], agent_name):
+                        changed = urgent = True
+                        current_task = message['task']['task_id']
+                        update_my_status(status_file, agent_name, 'working', current_task)
+                        if run_task(execute_task, message['task'], status_file, agent_name, project_root):
+                            current_task = None
+                    elif message['kind'] == 'task_reassigned' and message['task_id'] == current_task:
+                        current_task = None
+                mailbox.commit()
             
-            # Use different polling intervals based on current state
-            interval = working_interval if current_task else waiting_interval
-            time.sleep(interval)
+            # Back off up to a longer interval while working, a shorter one while waiting
+            StatusWriteBuffer.for_hub(status_file.parent).flush_due()
+            intervals.apply(scheduler, 'working_interval' if current_task else 'waiting_interval')
+            scheduler.record(changed=changed, urgent=urgent)
+            scheduler.wait()
             
         except KeyboardInterrupt:
+            StatusWriteBuffer.for_hub(status_file.parent).flush()
             print(f"\n👋 {agent_name} monitor stopped")
             break
         except Exception as e:
             print(f"❌ Error: {e}")
-            time.sleep(waiting_interval)
+            scheduler.record()
+            scheduler.wait()
 
-def find_my_tasks(content, agent_name):
-    """Extract tasks assigned to this agent from instructions content"""
-    tasks = []
-    
-    # Find JSON blocks
-    json_pattern = r'```json\s*(\{[\s\S]*?\})\s*```'
+def find_my_tasks(parsed, agent_name, task_index=None):
+    """Select tasks assigned to this agent; task_assignments.json wins, as work stealing reassigns there"""
+    if task_index is None:
+        return [task for task in parsed['tasks'] if task.get('assigned_to') == agent_name]
+    task_index.refresh()
+    return [task for task in parsed['tasks'] if task_index.owner(task) == agent_name]
+
+def start_task(task_store, task, agent_name):
+    """Mark the task started in task_assignments.json (so it can no longer be stolen) and start it"""
+    if not task_store.start(task['task_id'], agent_name):
+        print(f"↪️  Task {task['task_id']} was reassigned to another agent")
+        return False
     
-    for match in re.finditer(json_pattern, content):
-        try:
-            task_data = json.loads(match.group(1))
-            if (task_data.get('assigned_to') == agent_name and 
-                'task_id' in task_data):
-                tasks.append(task_data)
-        except json.JSONDecodeError:
-            continue
+    print(f"🎯 New task assigned: {task['task_id']}")
+    print(f"📋 Description: {task.get('description')}")
+    return True
+
+def run_task(execute_task, task, status_file, agent_name, project_root="."):
+    """Run the agent's task logic; returns True if the task finished and passed its quality gates"""
+    if execute_task is None or execute_task(task) is not True:
+        return False
+    return complete_my_task(status_file, agent_name, task, project_root)
+
+def complete_my_task(status_file, agent_name, task, project_root="."):
+    """Run the task's quality gates and mark it complete only if they pass"""
+    report = QualityGateRunner(Path(status_file).parent, project_root).run_for_task(task)
+    if report:
+        print_report(report)
+        if not report['passed']:
+            reason = "nothing to check (wrong project_root?)" if report.get('skipped') else "quality gates failed"
+            print(f"❌ Task {task['task_id']} not completed: {reason}")
+            return False
     
-    return tasks
+    update_my_status(status_file, agent_name, 'completed_task')
+    return True
 
 def update_my_status(status_file, agent_name, status, current_task=None):
-    """Update this agent's status in the status file"""
+    """Queue this agent's status change; written with other updates in one compact flush"""
     try:
-        with open(status_file, 'r') as f:
-            data = json.load(f)
-        
-        if agent_name in data['agents']:
-            data['agents'][agent_name]['status'] = status
-            data['agents'][agent_name]['current_task'] = current_task
-            data['agents'][agent_name]['last_activity'] = datetime.now().isoformat()
-        
-        data['last_updated'] = datetime.now().isoformat()
-        
-        with open(status_file, 'w') as f:
-            json.dump(data, f, indent=2)
-            
+        StatusWriteBuffer.for_hub(Path(status_file).parent).update(agent_name, status, current_task)
         print(f"✅ Status updated: {status}")
         
     except Exception as e:
         print(f"❌ Error updating status: {e}")
 
-def check_communication_signals(content):
-    """Check for communication signals in instructions"""
-    if '(URGENT)' in content:
+def check_communication_signals(parsed):
+    """Check for communication signals in instructions; returns True for URGENT/BLOCKED"""
+    signals = {d['type'] for d in parsed['delimiters']}
+    
+    if 'URGENT' in signals:
         print("🚨 URGENT message detected!")
-    elif '(QUESTION)' in content:
+    elif 'QUESTION' in signals:
         print("❓ Question needs response")
-    elif '(BLOCKED)' in content:
+    elif 'BLOCKED' in signals:
         print("🚫 Someone is blocked")
+    
+    return bool(signals & {'URGENT', 'BLOCKED'})
 
 if __name__ == "__main__":
     # Example usage
     simple_agent_monitor(
         agent_name="warp_agent",
-        working_interval=60,    # Check every 60 seconds when working (less frequent)
-        waiting_interval=10     # Check every 10 seconds when waiting (more frequent)
+        working_interval=60,    # Back off to 60 seconds when working (less frequent)
+        waiting_interval=10,    # Back off to 10 seconds when waiting (more frequent)
+        min_interval=2          # Poll every 2 seconds right after activity
     )
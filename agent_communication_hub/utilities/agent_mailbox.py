@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Agent Mailboxes
+Per-agent inbox/outbox queues under agents/<name>/ for questions and responses
+"""
+
+import json
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from hub_lock import HubLock
+from state_snapshot import StateSnapshot
+
+
+class Mailbox:
+    """
+    Messages are JSON lines appended to the recipient's agents/<name>/inbox.jsonl
+    and the sender's outbox.jsonl. Each reader keeps a byte cursor into the
+    inbox, so polling costs one stat and only new messages are ever parsed.
+    The agent's monitor uses the default cursor; any other consumer passes its
+    own `reader` name, and tools that only look use `peek`.
+
+    `receive` returns the messages after the cursor without moving it; `commit`
+    advances it once they are handled, so a crash in between delivers them again.
+    """
+
+    def __init__(self, hub_path="./agent_communication_hub", agent_name="warp_agent", reader=None):
+        self.hub_path = Path(hub_path)
+        self.agent_name = agent_name
+        self.agent_dir = self.hub_path / "agents" / agent_name
+        self.inbox_file = self.agent_dir / "inbox.jsonl"
+        self.outbox_file = self.agent_dir / "outbox.jsonl"
+
+        self.cursor = StateSnapshot(hub_path, f"mailbox_{agent_name}" + (f"_{reader}" if reader else ""))
+        state = self.cursor.load() or {}
+        self.offset = state.get('offset', 0)
+        self.inode = state.get('inode')
+        self.pending = None  # (offset, inode) after the last batch returned by receive
+
+    def send(self, to, kind, body, subject=None, in_reply_to=None, priority="medium", **fields):
+        """Append a message to the recipient's inbox and our outbox; returns the message"""
+        message = dict(fields,
+                       id=uuid.uuid4().hex[:12],
+                       sender=self.agent_name,
+                       to=to,
+                       kind=kind,
+                       subject=subject,
+                       body=body,
+                       priority=priority,
+                       in_reply_to=in_reply_to,
+                       timestamp=datetime.now().isoformat())
+        line = json.dumps(message) + "\n"
+
+        recipient_dir = self.hub_path / "agents" / to
+        recipient_dir.mkdir(parents=True, exist_ok=True)
+        self.agent_dir.mkdir(parents=True, exist_ok=True)
+
+        with HubLock(self.hub_path, name="mailbox"):
+            with open(recipient_dir / "inbox.jsonl", 'a') as f:
+                f.write(line)
+            with open(self.outbox_file, 'a') as f:
+                f.write(line)
+        return message
+
+    def ask(self, to, question, context=None, priority="medium"):
+        return self.send(to, 'question', question, subject=question, priority=priority, context=context)
+
+    def reply(self, message, answer, action=None):
+        return self.send(message['sender'], 'response', answer, subject=message.get('subject'),
+                         in_reply_to=message['id'], priority=message.get('priority', 'medium'), action=action)
+
+    def _read(self):
+        """(messages after the cursor, offset past the last complete line, inode)"""
+        try:
+            stat = self.inbox_file.stat()
+        except FileNotFoundError:
+            return [], self.offset, self.inode
+
+        offset = self.offset
+        if stat.st_ino != self.inode or stat.st_size < offset:
+            # Replaced or truncated inbox: start again from the top
+            offset = 0
+        if stat.st_size == offset:
+            return [], offset, stat.st_ino
+
+        with open(self.inbox_file, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+
+        end = data.rfind(b"\n") + 1
+        messages = []
+        for line in data[:end].splitlines():
+            try:
+                messages.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"Skipping malformed message in {self.inbox_file}")
+        return messages, offset + end, stat.st_ino
+
+    def receive(self):
+        """New messages since the cursor; call commit() once they are handled"""
+        messages, offset, inode = self._read()
+        self.pending = (offset, inode)
+        return messages
+
+    def peek(self):
+        """New messages since the cursor, leaving it where it is"""
+        return self._read()[0]
+
+    def commit(self, position=None):
+        """Advance the cursor past the messages returned by the last receive() (or to a given position)"""
+        position = tuple(position) if position is not None else self.pending
+        if position is None:
+            return
+        if position != (self.offset, self.inode):
+            self.offset, self.inode = position
+            self.cursor.save({'offset': self.offset, 'inode': self.inode})
+        self.pending = None
+
+
+def read_messages(path):
+    try:
+        with open(path, 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def conversation_view(hub_path="./agent_communication_hub"):
+    """Technical lead's view: every agent's outbox merged into threads, open questions first"""
+    agents_dir = Path(hub_path) / "agents"
+    messages = []
+    for outbox in sorted(agents_dir.glob("*/outbox.jsonl")):
+        messages.extend(read_messages(outbox))
+    messages.sort(key=lambda message: message['timestamp'])
+
+    replies = {}
+    for message in messages:
+        if message.get('in_reply_to'):
+            replies.setdefault(message['in_reply_to'], []).append(message)
+
+    questions = [message for message in messages if message['kind'] == 'question']
+    open_questions = [question for question in questions if question['id'] not in replies]
+
+    lines = ["# Agent Communication", f"**Generated**: {datetime.now().isoformat()}", ""]
+    lines.append(f"## ❓ Open Questions ({len(open_questions)})")
+    for question in open_questions:
+        lines.append(f"- **{question['sender']}** → {question['to']} ({question['priority']}, "
+                     f"{question['timestamp'][:16]}): {question['body']}")
+    if not open_questions:
+        lines.append("*No open questions*")
+
+    lines += ["", "## 💬 Threads"]
+    for question in questions:
+        lines += ["", f"### {question['sender']} Question - {question['timestamp'][:19]}",
+                  f"**Question**: {question['body']}  "]
+        if question.get('context'):
+            lines.append(f"**Context**: {question['context']}  ")
+        for response in replies.get(question['id'], []):
+            lines.append(f"**{response['sender']}** ({response['timestamp'][:19]}): {response['body']}  ")
+            if response.get('action'):
+                lines.append(f"**Action**: {response['action']}  ")
+
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Agent inbox/outbox messaging")
+    parser.add_argument('command', choices=['view', 'inbox', 'ask'])
+    parser.add_argument('--hub', default="./agent_communication_hub")
+    parser.add_argument('--agent', default="technical_lead")
+    parser.add_argument('--to', default="technical_lead")
+    parser.add_argument('--text')
+    args = parser.parse_args()
+
+    if args.command == 'view':
+        print(conversation_view(args.hub))
+    elif args.command == 'inbox':
+        # Only looks: the agent's monitor still gets these messages
+        for message in Mailbox(args.hub, args.agent).peek():
+            print(f"[{message['timestamp'][:19]}] {message['sender']} ({message['kind']}): {message['body']}")
+    else:
+        Mailbox(args.hub, args.agent).ask(args.to, args.text)
+
+if __name__ == "__main__":
+    main()
@@ -5,213 +5,376 @@ Monitors instructions.md for changes and task assignments
 """
 
 import json
-import time
 import os
-import re
+import hashlib
 from datetime import datetime
 from pathlib import Path
 
+from state_snapshot import StateSnapshot
+from instructions_parser import InstructionsArtifact
+from quality_gate_runner import QualityGateRunner, print_report
+from task_index import TaskIndex
+from task_store import TaskStore
+from poll_scheduler import AdaptiveScheduler
+from hub_config import MonitorConfig
+from memory_profiler import MemoryProfiler
+from cycle_profiler import CycleProfiler
+from status_buffer import StatusWriteBuffer
+from agent_mailbox import Mailbox
+from change_detector import FileChangeDetector
+
+FOCUS_TEMPLATE = """# {agent_title} - Current Focus
+**Agent**: {agent_title}  
+**Last Updated**: {today}  
+**Status**: {status}  
+**Active Tasks**: {task_count}  
+
+{task_sections}"""
+
+TASK_SECTION_TEMPLATE = """## 🎯 Current Task
+**Task ID**: {task_id}  
+**Priority**: {priority}  
+**Started**: {started}  
+**Estimated Completion**: {estimated_hours}  
+
+### Description
+{description}
+
+### Deliverables
+{deliverables}
+
+### Progress
+- 🔄 Task started
+- ⏳ In progress
+
+### Coding Standards Reference
+{coding_standards}
+
+### 📋 Dependencies
+{dependencies}
+
+### 🤝 Context
+{context}
+"""
+
 class AgentMonitor:
-    def __init__(self, hub_path="./agent_communication_hub", agent_name="warp_agent"):
+    def __init__(self, hub_path="./agent_communication_hub", agent_name="warp_agent", client=None, project_root="."):
         self.hub_path = Path(hub_path)
         self.agent_name = agent_name
+        self.client = client  # optional HubClient for hosts without the hub directory
+        self.project_root = project_root  # where the quality gates run
         self.instructions_file = self.hub_path / "instructions.md"
         self.status_file = self.hub_path / "agent_status.json"
         self.tasks_file = self.hub_path / "task_assignments.json"
         self.agent_dir = self.hub_path / "agents" / agent_name
         
-        self.last_modified = 0
+        self.detector = FileChangeDetector(self.instructions_file)
+        self.last_revision = None  # revision (instructions and task owners) reported by the hub server
         self.current_task = None
+        self.dispatched_tasks = {}  # task_id -> fingerprint of the dispatched task
+        self.instructions = InstructionsArtifact(hub_path)
+        self.task_index = TaskIndex(hub_path)
+        self.task_store = TaskStore(hub_path)
+        self.expanded_cache = (None, None, None)  # (content_hash, index signature, parsed)
+        self.focus_hash = None
+        self.status_buffer = StatusWriteBuffer.for_hub(hub_path)
+        self.mailbox = client.mailbox(agent_name) if client else Mailbox(hub_path, agent_name)
+        
+        self.snapshot = StateSnapshot(hub_path, f"agent_monitor_{agent_name}")
+        self.load_state()
         
+    def load_state(self):
+        """Restore watcher offset and dispatched tasks from the last snapshot"""
+        state = self.snapshot.load()
+        if not state:
+            return False
+        
+        self.detector = FileChangeDetector(self.instructions_file, state=state.get('detector'))
+        self.current_task = state.get('current_task')
+        self.dispatched_tasks = state.get('dispatched_tasks', {})
+        self.focus_hash = state.get('focus_hash')
+        print(f"Restored state for {self.agent_name} ({len(self.dispatched_tasks)} dispatched task(s))")
+        return True
+    
+    def save_state(self):
+        """Checkpoint monitor state so a restart does not re-dispatch tasks"""
+        return self.snapshot.save({
+            'detector': self.detector.state(),
+            'current_task': self.current_task,
+            'dispatched_tasks': self.dispatched_tasks,
+            'focus_hash': self.focus_hash
+        })
+    
     def parse_instructions(self):
-        """Parse instructions.md for tasks and delimiters"""
+        """Parse instructions.md for tasks and delimiters (shared artifact, parsed once per revision)"""
         try:
-            with open(self.instructions_file, 'r') as f:
-                content = f.read()
-                
-            return {
-                'tasks': self._extract_tasks(content),
-                'delimiters': self._extract_delimiters(content),
-                'last_update': self._get_last_update(content),
-                'status': self._get_communication_status(content)
-            }
+            if self.client:
+                return self.client.request('parse')
+            
+            artifact = self.instructions.load()
+            self.task_index.refresh()
+            
+            content_hash, signature, parsed = self.expanded_cache
+            if content_hash != artifact['content_hash'] or signature != self.task_index.signature:
+                # Expand template references once per revision of either file
+                parsed = dict(artifact, tasks=self.task_index.expand_all(artifact['tasks']))
+                self.expanded_cache = (artifact['content_hash'], self.task_index.signature, parsed)
+            
+            return parsed
         except Exception as e:
             print(f"Error parsing instructions: {e}")
             return None
     
-    def _extract_tasks(self, content):
-        """Extract JSON task objects from markdown"""
-        tasks = []
-        json_pattern = r'```json\s*(\{[\s\S]*?\})\s*```'
-        
-        for match in re.finditer(json_pattern, content):
-            try:
-                task_data = json.loads(match.group(1))
-                if 'task_id' in task_data and 'assigned_to' in task_data:
-                    tasks.append(task_data)
-            except json.JSONDecodeError as e:
-                print(f"Invalid JSON in task assignment: {e}")
-                
-        return tasks
-    
-    def _extract_delimiters(self, content):
-        """Extract communication delimiters"""
-        delimiters = []
-        delimiter_pattern = r'\((TASK_ASSIGNED|COMMUNICATION_OVER|URGENT|QUESTION|BLOCKED)\)'
-        
-        for match in re.finditer(delimiter_pattern, content):
-            delimiters.append({
-                'type': match.group(1),
-                'position': match.start(),
-                'timestamp': datetime.now().isoformat()
-            })
-            
-        return delimiters
-    
-    def _get_last_update(self, content):
-        """Get last update timestamp"""
-        update_match = re.search(r'\*\*Last Updated\*\*:\s*([^\n]+)', content)
-        return update_match.group(1).strip() if update_match else None
-    
-    def _get_communication_status(self, content):
-        """Determine communication status"""
-        if '(COMMUNICATION_OVER)' in content:
-            return 'complete'
-        elif '(TASK_ASSIGNED)' in content:
-            return 'task_assigned'
-        elif '(URGENT)' in content:
-            return 'urgent'
-        elif '(QUESTION)' in content:
-            return 'question_pending'
-        elif '(BLOCKED)' in content:
-            return 'blocked'
-        return 'active'
-    
     def update_status(self, status, current_task=None):
-        """Update agent status in status file"""
+        """Update agent status in status file (or through the hub server)"""
         try:
-            with open(self.status_file, 'r') as f:
-                status_data = json.load(f)
-            
-            if self.agent_name in status_data['agents']:
-                agent_status = status_data['agents'][self.agent_name]
-                agent_status['status'] = status
-                agent_status['current_task'] = current_task
-                agent_status['last_activity'] = datetime.now().isoformat()
-                
-                if status == 'completed_task':
-                    agent_status['completed_tasks_today'] += 1
+            if self.client:
+                return self.client.request('status', agent=self.agent_name, status=status,
+                                           current_task=current_task)
             
-            status_data['last_updated'] = datetime.now().isoformat()
-            
-            with open(self.status_file, 'w') as f:
-                json.dump(status_data, f, indent=2)
-                
+            self.status_buffer.update(self.agent_name, status, current_task)
             return True
         except Exception as e:
             print(f"Error updating status: {e}")
             return False
     
-    def update_current_focus(self, task_data):
-        """Update agent's current focus file"""
+    def render_current_focus(self, tasks):
+        """Render current_focus.md for all of this agent's tasks"""
+        agent_title = self.agent_name.replace('_', ' ').title()
+        today = datetime.now().strftime('%Y-%m-%d')
+        
+        sections = []
+        for task_data in tasks:
+            sections.append(TASK_SECTION_TEMPLATE.format(
+                task_id=task_data.get('task_id', 'N/A'),
+                priority=task_data.get('priority', 'medium'),
+                started=today,
+                estimated_hours=task_data.get('estimated_hours', 'TBD'),
+                description=task_data.get('description', 'No description provided'),
+                deliverables=chr(10).join(f'- {item}' for item in task_data.get('deliverables', [])),
+                coding_standards=task_data.get('coding_standards', 'general_standards'),
+                dependencies=chr(10).join(f'- {dep}' for dep in task_data.get('dependencies', [])),
+                context=task_data.get('context', 'No additional context provided')
+            ))
+        
+        return FOCUS_TEMPLATE.format(
+            agent_title=agent_title,
+            today=today,
+            status='Working' if tasks else 'Waiting',
+            task_count=len(tasks),
+            task_sections='\n'.join(sections) if sections else '*No active tasks*\n'
+        )
+    
+    def update_current_focus(self, tasks):
+        """Write all of the agent's tasks to current_focus.md in one write, skipping unchanged content"""
         try:
-            focus_file = self.agent_dir / "current_focus.md"
+            if isinstance(tasks, dict):
+                tasks = [tasks]
             
-            content = f"""# {self.agent_name.replace('_', ' ').title()} - Current Focus
-**Agent**: {self.agent_name.replace('_', ' ').title()}  
-**Last Updated**: {datetime.now().strftime('%Y-%m-%d')}  
-**Status**: Working  
-
-## 🎯 Current Task
-**Task ID**: {task_data.get('task_id', 'N/A')}  
-**Priority**: {task_data.get('priority', 'medium')}  
-**Started**: {datetime.now().strftime('%Y-%m-%d')}  
-**Estimated Completion**: {task_data.get('estimated_hours', 'TBD')}  
-
-### Description
-{task_data.get('description', 'No description provided')}
-
-### Deliverables
-{chr(10).join(f'- {item}' for item in task_data.get('deliverables', []))}
-
-### Progress
-- 🔄 Task started
-- ⏳ In progress
-
-### Coding Standards Reference
-{task_data.get('coding_standards', 'general_standards')}
-
-## 📋 Dependencies
-{chr(10).join(f'- {dep}' for dep in task_data.get('dependencies', []))}
-
-## 🤝 Context
-{task_data.get('context', 'No additional context provided')}
-"""
+            content = self.render_current_focus(tasks)
+            content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+            
+            focus_file = self.agent_dir / "current_focus.md"
+            if content_hash == self.focus_hash and focus_file.exists():
+                return False
             
             with open(focus_file, 'w') as f:
                 f.write(content)
-                
+            
+            self.focus_hash = content_hash
             return True
         except Exception as e:
             print(f"Error updating current focus: {e}")
             return False
     
+    def complete_task(self, task_data, project_root=None):
+        """Run the task's quality gates and mark it complete only if they pass"""
+        report = QualityGateRunner(self.hub_path, project_root or self.project_root).run_for_task(task_data)
+        
+        if report:
+            print_report(report)
+            if not report['passed']:
+                reason = "nothing to check (wrong project_root?)" if report.get('skipped') else "quality gates failed"
+                print(f"Task {task_data['task_id']} not completed: {reason}")
+                return report
+        
+        self.current_task = None
+        self.update_status('completed_task')
+        return report
+    
     def check_for_my_tasks(self, parsed_data):
         """Check if any tasks are assigned to this agent"""
         my_tasks = []
         
         for task in parsed_data.get('tasks', []):
-            if task.get('assigned_to') == self.agent_name:
-                my_tasks.append(task)
+            if self.task_index.owner(task) == self.agent_name:
+                my_tasks.append(dict(task, assigned_to=self.agent_name))
         
         return my_tasks
     
-    def monitor(self, callback=None):
+    def _task_fingerprint(self, task):
+        """Stable hash of a task so edited assignments are dispatched again"""
+        return hashlib.sha256(json.dumps(task, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def filter_new_tasks(self, tasks):
+        """Drop tasks that were already dispatched with identical content"""
+        return [task for task in tasks
+                if self.dispatched_tasks.get(task['task_id']) != self._task_fingerprint(task)]
+    
+    def instructions_changed(self):
+        """Check for a new revision of instructions.md, locally or through the hub server"""
+        if self.client:
+            revision = self.client.request('revision')
+            if revision == self.last_revision:
+                return False
+            self.last_revision = revision
+            return True
+        
+        return self.detector.changed()
+    
+    def check_inbox(self, message_callback=None, callback=None):
+        """Read only this agent's new messages; returns True if any is urgent"""
+        urgent = False
+        reassigned = False
+        taken_over = []
+        for message in self.mailbox.receive():
+            print(f"Message from {message['sender']} ({message['kind']}): {message['body']}")
+            urgent = urgent or message.get('priority') in ('urgent', 'high')
+            if message['kind'] == 'task_assigned':
+                reassigned = True
+                taken_over.append(message['task'])
+            elif message['kind'] == 'task_reassigned':
+                # Only never-started tasks are stolen, but drop any trace of it here
+                reassigned = True
+                self.dispatched_tasks.pop(message['task_id'], None)
+                if self.current_task == message['task_id']:
+                    self.current_task = None
+            if message_callback:
+                message_callback(message)
+        
+        if reassigned:
+            # Work stealing moved a task in or out of our queue
+            parsed = self.parse_instructions()
+            my_tasks = self.check_for_my_tasks(parsed) if parsed else []
+            # Prefer the instructions.md version so a later re-parse does not dispatch it again
+            by_id = {task['task_id']: task for task in my_tasks}
+            taken_over = [by_id.get(task['task_id'], task) for task in taken_over]
+            if parsed:
+                self.update_current_focus(my_tasks + [task for task in taken_over if task['task_id'] not in by_id])
+            for task in taken_over:
+                self.dispatch(task, callback)
+            self.save_state()
+        
+        # Handled: only now may the cursor move past these messages
+        self.mailbox.commit()
+        return urgent
+    
+    def mark_started(self, task_id):
+        """Claim the task in the task store (or through the hub server); False if another agent owns it"""
+        try:
+            if self.client:
+                return self.client.request('start', agent=self.agent_name, task_id=task_id)
+            return self.task_store.start(task_id, self.agent_name)
+        except Exception as e:
+            print(f"Error marking {task_id} started: {e}")
+            return False
+    
+    def dispatch(self, task, callback=None):
+        """
+        Start a task and remember it so it is not dispatched again. A callback
+        that returns True has finished the task, which then goes through
+        complete_task (quality gates first).
+        """
+        if self.dispatched_tasks.get(task['task_id']) == self._task_fingerprint(task):
+            return False
+        
+        # Mark it started in task_assignments.json first; from then on it can no longer be stolen
+        if not self.mark_started(task['task_id']):
+            print(f"Task {task['task_id']} was reassigned to another agent; not starting it")
+            return False
+        
+        print(f"Processing task: {task['task_id']}")
+        self.current_task = task['task_id']
+        self.update_status('working', task['task_id'])
+        
+        finished = callback(task) is True if callback else False
+        
+        self.dispatched_tasks[task['task_id']] = self._task_fingerprint(task)
+        if finished:
+            self.complete_task(task)
+        return True
+    
+    def poll_once(self, callback=None, message_callback=None):
+        """One monitoring cycle; returns (changed, urgent) for the scheduler"""
+        changed = False
+        urgent = False
+        
+        # Check if instructions file was modified
+        if self.instructions_changed():
+            changed = True
+            print(f"Instructions updated at {datetime.now()}")
+            
+            parsed = self.parse_instructions()
+            if parsed:
+                # Check for tasks assigned to this agent
+                assigned_tasks = self.check_for_my_tasks(parsed)
+                my_tasks = self.filter_new_tasks(assigned_tasks)
+                
+                if my_tasks:
+                    print(f"Found {len(my_tasks)} task(s) assigned to {self.agent_name}")
+                    
+                    # One focus write covering every assigned task
+                    self.update_current_focus(assigned_tasks)
+                    
+                    for task in my_tasks:
+                        self.dispatch(task, callback)
+                
+                # Handle communication status
+                status = parsed.get('status')
+                if status == 'urgent':
+                    print("URGENT message detected!")
+                elif status == 'question_pending':
+                    print("Question pending response")
+                
+                urgent = any(d['type'] in ('URGENT', 'BLOCKED') for d in parsed['delimiters'])
+            
+            self.save_state()
+        
+        if self.check_inbox(message_callback, callback):
+            urgent = True
+        
+        self.status_buffer.flush_due()
+        return changed, urgent
+    
+    def monitor(self, callback=None, min_interval=5, max_interval=30, message_callback=None):
         """Main monitoring loop"""
         print(f"Starting monitor for {self.agent_name}")
         print(f"Watching: {self.instructions_file}")
         
+        scheduler = AdaptiveScheduler(min_interval, max_interval)
+        intervals = MonitorConfig(self.hub_path, "agent_monitor", min_interval=min_interval, max_interval=max_interval)
+        profiler = MemoryProfiler(f"agent_monitor_{self.agent_name}", self.hub_path)
+        cycle_profiler = CycleProfiler(f"agent_monitor_{self.agent_name}", self.hub_path)
+        
         while True:
             try:
-                # Check if instructions file was modified
-                if self.instructions_file.exists():
-                    modified = self.instructions_file.stat().st_mtime
-                    
-                    if modified > self.last_modified:
-                        self.last_modified = modified
-                        print(f"Instructions updated at {datetime.now()}")
-                        
-                        parsed = self.parse_instructions()
-                        if parsed:
-                            # Check for tasks assigned to this agent
-                            my_tasks = self.check_for_my_tasks(parsed)
-                            
-                            if my_tasks:
-                                print(f"Found {len(my_tasks)} task(s) assigned to {self.agent_name}")
-                                
-                                for task in my_tasks:
-                                    print(f"Processing task: {task['task_id']}")
-                                    self.update_status('working', task['task_id'])
-                                    self.update_current_focus(task)
-                                    
-                                    if callback:
-                                        callback(task)
-                            
-                            # Handle communication status
-                            status = parsed.get('status')
-                            if status == 'urgent':
-                                print("URGENT message detected!")
-                            elif status == 'question_pending':
-                                print("Question pending response")
+                profiler.maybe_report()
+                with cycle_profiler.cycle():
+                    changed, urgent = self.poll_once(callback, message_callback)
                 
-                time.sleep(30)  # Check every 30 seconds
+                intervals.apply(scheduler)
+                scheduler.record(changed=changed, urgent=urgent)
+                scheduler.wait()
                 
             except KeyboardInterrupt:
                 print(f"\nStopping monitor for {self.agent_name}")
+                self.status_buffer.flush()
+                self.save_state()
                 break
             except Exception as e:
                 print(f"Error in monitoring loop: {e}")
-                time.sleep(30)
+                scheduler.record()
+                scheduler.wait()
 
 def main():
     """Example usage"""
@@ -220,7 +383,8 @@ def main():
     def task_callback(task_data):
         print(f"Received task: {task_data['task_id']}")
         print(f"Description: {task_data['description']}")
-        # Here you would implement the actual task execution logic
+        # Here you would implement the actual task execution logic;
+        # return True once it is done to run the quality gates and complete it
     
     monitor.monitor(callback=task_callback)
 
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Instructions Compaction
+Moves resolved Q&A, completed tasks and consumed delimiters from instructions.md into dated archives
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+from hub_config import MonitorConfig
+from hub_lock import HubLock
+from instructions_parser import TASK_PATTERN, is_task
+
+BLOCK_END = re.compile(r'^(#{1,3} |---\s*$|\(COMMUNICATION_OVER\))', re.MULTILINE)
+TASK_ID_PATTERN = re.compile(r'\*\*Task ID\*\*:\s*(\S+)')
+ASSIGNED_MARKER = re.compile(r'^\(TASK_ASSIGNED\)[ \t]*\n?', re.MULTILINE)
+QUESTION_MARKER = re.compile(r'^\(QUESTION\)[ \t]*$', re.MULTILINE)
+RESPONSE_HEADING = re.compile(r'^### .*\bResponse - ')
+
+# "compaction" section of monitor_config.json; the progress tracker compacts when either limit is reached
+DEFAULTS = {
+    'enabled': True,
+    'min_bytes': 64 * 1024,
+    'min_completed': 5  # (TASK_COMPLETE) reports in the live file
+}
+
+
+def split_blocks(content):
+    """Split content into (kind, text) blocks; '### ' sections become 'section' blocks"""
+    blocks = []
+    position = 0
+
+    for heading in re.finditer(r'^### .*$', content, re.MULTILINE):
+        if heading.start() < position:
+            continue
+        if heading.start() > position:
+            blocks.append(('text', content[position:heading.start()]))
+
+        end_match = BLOCK_END.search(content, heading.end() + 1)
+        end = end_match.start() if end_match else len(content)
+        blocks.append(('section', content[heading.start():end]))
+        position = end
+
+    blocks.append(('text', content[position:]))
+    return blocks
+
+
+def section_tasks(text):
+    """task_ids of the assignment JSON blocks inside a section"""
+    task_ids = []
+    for match in TASK_PATTERN.finditer(text):
+        try:
+            task = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            continue
+        if is_task(task):
+            task_ids.append(task['task_id'])
+    return task_ids
+
+
+class InstructionsCompactor:
+    def __init__(self, hub_path="./agent_communication_hub"):
+        self.hub_path = Path(hub_path)
+        self.instructions_file = self.hub_path / "instructions.md"
+        self.archive_dir = self.hub_path / "archive"
+        self.index_file = self.archive_dir / "index.json"
+        self.config = MonitorConfig(hub_path, "compaction", **DEFAULTS)
+        self.checked = None  # (mtime_ns, size) of a revision with nothing to do
+
+    def maybe_compact(self):
+        """Compact if instructions.md is over the size or completed-block limit; unchanged files are skipped"""
+        if self.config.poll():
+            self.checked = None  # new limits may apply to the same revision
+        if not self.config.get('enabled'):
+            return 0
+        try:
+            stat = self.instructions_file.stat()
+        except FileNotFoundError:
+            return 0
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.checked:
+            return 0
+        if stat.st_size < self.config.get('min_bytes'):
+            with open(self.instructions_file, 'r') as f:
+                completed = f.read().count('(TASK_COMPLETE)')
+            if completed < self.config.get('min_completed'):
+                self.checked = signature
+                return 0
+
+        archived = self.compact()
+        if not archived:
+            self.checked = signature
+        return archived
+
+    def plan(self, content):
+        """Decide which blocks to archive; returns (kept blocks, archived entries)"""
+        blocks = split_blocks(content)
+        archive = set()
+        entries = {}
+
+        # Resolved Q&A: each response resolves the oldest open question before it
+        open_questions = []
+        for i, (kind, text) in enumerate(blocks):
+            if kind != 'section':
+                continue
+            heading = text.split('\n', 1)[0]
+            if QUESTION_MARKER.search(text):
+                open_questions.append(i)
+            elif RESPONSE_HEADING.match(heading) and open_questions:
+                question = open_questions.pop(0)
+                archive.update((question, i))
+                entries[question] = {'kind': 'question', 'heading': blocks[question][1].split('\n', 1)[0]}
+                entries[i] = {'kind': 'response', 'heading': heading}
+
+        # Completed tasks: the completion report plus the original assignment
+        completed = {}
+        for i, (kind, text) in enumerate(blocks):
+            if kind == 'section' and '(TASK_COMPLETE)' in text:
+                task_id = TASK_ID_PATTERN.search(text)
+                if task_id:
+                    completed.setdefault(task_id.group(1), []).append(i)
+
+        for i, (kind, text) in enumerate(blocks):
+            if kind != 'section':
+                continue
+            task_ids = section_tasks(text)
+            if task_ids and all(task_id in completed for task_id in task_ids):
+                archive.add(i)
+                entries[i] = {'kind': 'task', 'task_ids': task_ids}
+        for task_id, indexes in completed.items():
+            for i in indexes:
+                archive.add(i)
+                entries[i] = {'kind': 'completion', 'task_ids': [task_id]}
+
+        # Consumed delimiters: (TASK_ASSIGNED) whose whole batch of tasks was archived
+        kept = []
+        batch = []
+        for i, (kind, text) in enumerate(blocks):
+            if i in archive:
+                batch.extend(section_tasks(text) if entries[i]['kind'] == 'task' else [])
+                continue
+
+            live_tasks = section_tasks(text) if kind == 'section' else []
+            has_marker = ASSIGNED_MARKER.search(text) is not None
+            if has_marker and batch and not live_tasks:
+                text = ASSIGNED_MARKER.sub('', text)
+                batch = []
+            elif has_marker:
+                batch = []
+            elif live_tasks:
+                batch = []  # batch now contains live work; keep its delimiter
+            kept.append(text)
+
+        archived = [dict(entries[i], text=blocks[i][1]) for i in sorted(archive)]
+        return ''.join(kept), archived
+
+    def _append_archive(self, archived):
+        """
+        Append archived blocks to today's segment and record them in the index.
+        Returns what _undo_archive needs to take them out again.
+        """
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        segment = self.archive_dir / f"instructions-{datetime.now().strftime('%Y-%m-%d')}.md"
+
+        try:
+            with open(self.index_file, 'r') as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = []
+        undo = (segment, segment.stat().st_size if segment.exists() else 0, list(index))
+
+        archived_at = datetime.now().isoformat()
+        with open(segment, 'ab') as f:
+            for entry in archived:
+                data = (entry['text'].strip('\n') + '\n\n').encode('utf-8')
+                index.append({
+                    'kind': entry['kind'],
+                    'task_ids': entry.get('task_ids', []),
+                    'heading': entry.get('heading', entry['text'].split('\n', 1)[0]),
+                    'segment': segment.name,
+                    'offset': f.tell(),
+                    'length': len(data),
+                    'archived_at': archived_at
+                })
+                f.write(data)
+
+        self._write_index(index)
+        return undo
+
+    def _write_index(self, index):
+        temp_file = self.index_file.with_suffix('.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(temp_file, self.index_file)
+
+    def _undo_archive(self, undo):
+        segment, size, index = undo
+        if size:
+            with open(segment, 'ab') as f:
+                f.truncate(size)
+        else:
+            segment.unlink()
+        self._write_index(index)
+
+    def compact(self, dry_run=False):
+        """Compact instructions.md under the hub lock; returns the number of archived blocks"""
+        with HubLock(self.hub_path):
+            before = self.instructions_file.stat()
+            with open(self.instructions_file, 'r') as f:
+                content = f.read()
+
+            compacted, archived = self.plan(content)
+            if not archived:
+                return 0
+            if dry_run:
+                for entry in archived:
+                    print(f"Would archive {entry['kind']}: {entry['text'].split(chr(10), 1)[0]}")
+                return len(archived)
+
+            temp_file = self.instructions_file.with_suffix('.compact.tmp')
+            with open(temp_file, 'w') as f:
+                f.write(compacted)
+            undo = self._append_archive(archived)
+
+            # Checked last, right before the rename: a writer that bypasses the lock can then
+            # only slip into the gap between this stat and os.replace
+            after = self.instructions_file.stat()
+            if (after.st_mtime_ns, after.st_size) != (before.st_mtime_ns, before.st_size):
+                self._undo_archive(undo)
+                os.remove(temp_file)
+                print("instructions.md changed during compaction, will retry next run")
+                return 0
+            os.replace(temp_file, self.instructions_file)
+
+        print(f"Archived {len(archived)} block(s); instructions.md {len(content)} -> {len(compacted)} chars")
+        return len(archived)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive resolved communication from instructions.md")
+    parser.add_argument('--hub', default="./agent_communication_hub")
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    InstructionsCompactor(args.hub).compact(dry_run=args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Completion Log
+Append-only per-agent task completion records with lazily rendered, paginated Markdown
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from hub_lock import HubLock
+
+SEGMENT_RECORDS = 500  # records per JSONL segment before a new one is started
+PAGE_SIZE = 20
+
+COMPLETED_HEADER = "## ✅ Completed Tasks"
+BLOCK_START = "<!-- completions:start (generated from completions/*.jsonl; edits here are overwritten) -->"
+BLOCK_END = "<!-- completions:end -->"
+
+
+def make_record(agent_name, task_id, title, started=None, completed=None, duration_hours=None,
+                deliverables=(), quality_gates=None, notes=None):
+    """One completion; the duration is measured from `started` unless given explicitly"""
+    completed = time.time() if completed is None else completed
+    if duration_hours is None and started is not None:
+        duration_hours = round((completed - started) / 3600, 2)
+    return {
+        'ts': completed,
+        'completed': datetime.fromtimestamp(completed).isoformat(timespec='seconds'),
+        'agent': agent_name,
+        'task_id': task_id,
+        'title': title,
+        'duration_hours': duration_hours,
+        'deliverables': list(deliverables),
+        'quality_gates': quality_gates,
+        'notes': notes
+    }
+
+
+def render_record(record):
+    """Markdown for one completion, in the style of the hand-written entries"""
+    duration = record.get('duration_hours')
+    lines = [
+        f"#### Task: {record['title']}",
+        f"- **Task ID**: {record['task_id']}",
+        f"- **Completed**: {record['completed']}",
+        f"- **Duration**: {f'{duration:g} hours' if duration is not None else 'not recorded'}"
+    ]
+    if record.get('deliverables'):
+        lines.append("- **Deliverables**:")
+        lines.extend(f"  - {item}" for item in record['deliverables'])
+    if record.get('quality_gates'):
+        lines.append(f"- **Quality Gates**: {record['quality_gates']}")
+    if record.get('notes'):
+        lines.append(f"- **Notes**: {record['notes']}")
+    return "\n".join(lines) + "\n"
+
+
+class CompletionLog:
+    """
+    Completions for one agent, appended as JSON lines to
+    agents/<agent>/completions/segment-NNNNN.jsonl. Recording touches only the
+    last segment, so it costs the same however long the history is. Markdown is
+    rendered newest-first from the tail on demand: `publish()` refreshes the
+    generated block in completed_tasks.md with the newest page, and older pages
+    are rendered to completions/page-NNNN.md only when asked for.
+    """
+
+    def __init__(self, hub_path="./agent_communication_hub", agent_name="warp_agent",
+                 segment_records=SEGMENT_RECORDS):
+        self.hub_path = Path(hub_path)
+        self.agent_name = agent_name
+        self.agent_dir = self.hub_path / "agents" / agent_name
+        self.segment_dir = self.agent_dir / "completions"
+        self.markdown_file = self.agent_dir / "completed_tasks.md"
+        self.segment_records = segment_records
+
+    def segments(self):
+        return sorted(self.segment_dir.glob("segment-*.jsonl"))
+
+    def _segment_path(self, number):
+        return self.segment_dir / f"segment-{number:05d}.jsonl"
+
+    @staticmethod
+    def _count_lines(path):
+        with open(path, 'rb') as f:
+            return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(65536), b''))
+
+    def record(self, record):
+        """Append one completion record; O(1) in the size of the history"""
+        line = json.dumps(record) + "\n"
+        with HubLock(self.hub_path, name="completions"):
+            self.segment_dir.mkdir(parents=True, exist_ok=True)
+            segments = self.segments()
+            if not segments:
+                segment = self._segment_path(0)
+            elif self._count_lines(segments[-1]) >= self.segment_records:
+                segment = self._segment_path(int(segments[-1].stem.split('-')[1]) + 1)
+            else:
+                segment = segments[-1]
+
+            with open(segment, 'a') as f:
+                f.write(line)
+        return record
+
+    def count(self):
+        segments = self.segments()
+        if not segments:
+            return 0
+        return (len(segments) - 1) * self.segment_records + self._count_lines(segments[-1])
+
+    def iter_newest(self):
+        """Records newest first, reading segments from the end only as far as needed"""
+        for segment in reversed(self.segments()):
+            with open(segment, 'r') as f:
+                lines = f.read().splitlines()
+            for line in reversed(lines):
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping malformed completion record in {segment}")
+
+    def page(self, number=1, page_size=PAGE_SIZE):
+        start = (number - 1) * page_size
+        return list(islice(self.iter_newest(), start, start + page_size))
+
+    def render_page(self, number=1, page_size=PAGE_SIZE):
+        total = self.count()
+        pages = max(1, -(-total // page_size))
+        entries = "\n".join(render_record(record) for record in self.page(number, page_size))
+        footer = f"*Page {number} of {pages} ({total} recorded completion(s), newest first)"
+        if number < pages:
+            footer += f"; older: `python utilities/completion_log.py page {self.agent_name} {number + 1}`"
+        return f"{entries}\n{footer}*\n" if entries else f"{footer}*\n"
+
+    def publish(self, page_size=PAGE_SIZE):
+        """Refresh the generated newest-page block in completed_tasks.md (hand-written history is kept)"""
+        block = f"{BLOCK_START}\n{self.render_page(1, page_size)}{BLOCK_END}"
+
+        with HubLock(self.hub_path, name="completions"):
+            try:
+                with open(self.markdown_file, 'r') as f:
+                    content = f.read()
+            except FileNotFoundError:
+                content = f"# {self.agent_name.replace('_', ' ').title()} - Completed Tasks\n"
+
+            if BLOCK_START in content and BLOCK_END in content:
+                before, rest = content.split(BLOCK_START, 1)
+                content = before + block + rest.split(BLOCK_END, 1)[1]
+            elif COMPLETED_HEADER in content:
+                content = content.replace(COMPLETED_HEADER, f"{COMPLETED_HEADER}\n\n{block}", 1)
+            else:
+                # Never drop records because the header was renamed: add our own section
+                content = content.rstrip("\n") + f"\n\n{COMPLETED_HEADER}\n\n{block}\n"
+
+            temp_file = self.markdown_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                f.write(content)
+            os.replace(temp_file, self.markdown_file)
+        return self.markdown_file
+
+    def write_page(self, number, page_size=PAGE_SIZE):
+        """Render an older page to completions/page-NNNN.md"""
+        page_file = self.segment_dir / f"page-{number:04d}.md"
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        with open(page_file, 'w') as f:
+            f.write(f"# {self.agent_name.replace('_', ' ').title()} - Completed Tasks (page {number})\n\n")
+            f.write(self.render_page(number, page_size))
+        return page_file
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render an agent's recorded completions")
+    parser.add_argument('--hub', default="./agent_communication_hub")
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    page = subparsers.add_parser('page', help="print one page, newest first")
+    page.add_argument('agent')
+    page.add_argument('number', type=int, nargs='?', default=1)
+    page.add_argument('--write', action='store_true', help="also write completions/page-NNNN.md")
+
+    publish = subparsers.add_parser('publish', help="refresh the newest page in completed_tasks.md")
+    publish.add_argument('agent')
+    args = parser.parse_args()
+
+    log = CompletionLog(args.hub, args.agent)
+    if args.command == 'page':
+        print(log.render_page(args.number, args.page_size), end='')
+        if args.write:
+            print(f"Wrote {log.write_page(args.number, args.page_size)}")
+    else:
+        print(f"Updated {log.publish(args.page_size)}")
+
+if __name__ == "__main__":
+    main()
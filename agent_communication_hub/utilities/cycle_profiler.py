@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Cycle Profiler
+Opt-in sampling profiler for monitor loops that writes flame-graph collapsed stacks
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Set to N to profile one cycle in N (e.g. HUB_CYCLE_PROFILE=10); HUB_CYCLE_PROFILE=1 profiles every cycle
+ENV_VAR = "HUB_CYCLE_PROFILE"
+# Seconds between automatic dumps of the collapsed stacks (default 300)
+DUMP_ENV_VAR = "HUB_CYCLE_PROFILE_DUMP"
+# `kill -USR1 <pid>` dumps immediately
+DUMP_SIGNAL = getattr(signal, 'SIGUSR1', None)
+
+
+def frame_label(code):
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame):
+    """Root-first 'a;b;c' stack for a frame, as consumed by flamegraph.pl and speedscope"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler:
+    """Samples one thread's stack from a background thread every `interval` seconds"""
+
+    def __init__(self, thread_id, counts, lock, interval=0.005):
+        self.thread_id = thread_id
+        self.counts = counts
+        self.lock = lock
+        self.interval = interval
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="cycle-profiler", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = collapse_stack(frame)
+            if self.stopped.is_set():
+                break  # The cycle ended while we were sampling; don't count the profiler's own join
+            with self.lock:
+                self.counts[stack] = self.counts.get(stack, 0) + 1
+            self.samples += 1
+
+
+class CycleProfiler:
+    """
+    Wraps monitor cycles; one cycle in `every` is sampled. Stack counts are
+    aggregated across all sampled cycles and written as collapsed stacks to
+    .state/profile_<component>.folded every `dump_interval` seconds and on SIGUSR1.
+    Does nothing unless enabled.
+    """
+
+    def __init__(self, component, hub_path="./agent_communication_hub", every=None, dump_interval=None,
+                 sample_interval=0.005):
+        if every is None and os.environ.get(ENV_VAR):
+            every = int(os.environ[ENV_VAR])
+        if dump_interval is None:
+            dump_interval = float(os.environ.get(DUMP_ENV_VAR, 300))
+
+        self.component = component
+        self.enabled = bool(every)
+        self.every = every
+        self.dump_interval = dump_interval
+        self.sample_interval = sample_interval
+        self.output_file = Path(hub_path) / ".state" / f"profile_{component}.folded"
+
+        self.counts = {}  # collapsed stack -> samples, across all profiled cycles
+        self.lock = threading.RLock()  # dump() may also run from the signal handler
+        self.cycles = 0
+        self.profiled_cycles = 0
+        self.profiled_seconds = 0.0
+        self.last_dump = time.monotonic()
+
+        if self.enabled:
+            self.install_signal_handler()
+
+    def install_signal_handler(self):
+        if DUMP_SIGNAL is None:
+            return
+        try:
+            signal.signal(DUMP_SIGNAL, lambda signum, frame: self.dump())
+        except ValueError:
+            pass  # Not the main thread; interval dumps still apply
+
+    @contextmanager
+    def cycle(self):
+        """Profile the enclosed cycle if it is one of the sampled ones"""
+        if not self.enabled:
+            yield
+            return
+
+        self.cycles += 1
+        if self.cycles % self.every:
+            yield
+            self.maybe_dump()
+            return
+
+        sampler = StackSampler(threading.get_ident(), self.counts, self.lock, self.sample_interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            self.profiled_seconds += time.perf_counter() - started
+            self.profiled_cycles += 1
+        self.maybe_dump()
+
+    def maybe_dump(self):
+        if time.monotonic() - self.last_dump >= self.dump_interval:
+            self.dump()
+
+    def dump(self):
+        """Write the aggregated collapsed stacks (replacing the previous dump)"""
+        self.last_dump = time.monotonic()
+        with self.lock:
+            lines = [f"{stack} {count}\n" for stack, count in sorted(self.counts.items())]
+
+        try:
+            self.output_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.output_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                f.writelines(lines)
+            os.replace(temp_file, self.output_file)
+        except Exception as e:
+            print(f"Error writing cycle profile: {e}")
+            return None
+
+        print(f"[{self.component}] profiled {self.profiled_cycles}/{self.cycles} cycles "
+              f"({self.profiled_seconds:.2f}s, {sum(self.counts.values())} samples) -> {self.output_file}")
+        return self.output_file
+
+
+def main():
+    """Print the hottest stacks (and leaf functions) of a dump"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize a collapsed-stack profile from a monitor")
+    parser.add_argument('folded', help="e.g. agent_communication_hub/.state/profile_alert_system.folded")
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    leaves = {}
+    total = 0
+    with open(args.folded, 'r') as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            leaf = stack.rsplit(';', 1)[-1]
+            leaves[leaf] = leaves.get(leaf, 0) + int(count)
+            total += int(count)
+
+    print(f"{total} samples")
+    if not total:
+        return
+    for leaf, count in sorted(leaves.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{count / total:7.1%}  {leaf}")
+
+if __name__ == "__main__":
+    main()
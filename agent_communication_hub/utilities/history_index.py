@@ -0,0 +1,551 @@
+#!/usr/bin/env python3
+"""
+History Index
+Inverted index and structured tables over progress_log.md, completed_tasks.md and status events
+"""
+
+import hashlib
+import json
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from change_detector import FileChangeDetector, is_racy, stat_signature
+from completion_log import BLOCK_END, BLOCK_START
+from state_snapshot import StateSnapshot
+
+INDEX_VERSION = 4
+STALE_SWEEP_MIN = 1000  # removed documents tolerated in the postings before a sweep
+TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+# progress_tracker.py inserts its updates right below this line; everything above is hand-written
+PROGRESS_MARKER = "## Progress Updates"
+PROGRESS_HEADING_RE = re.compile(r"^## Progress Update - (.+?)\s*$")
+DATE_HEADING_RE = re.compile(r"^###\s+(\d{4}-\d{2}-\d{2})\s*$")
+TASK_HEADING_RE = re.compile(r"^#{3,4} Task(?: \d+)?:\s*(.+?)\s*(?:✅)?\s*$")
+FIELD_RE = re.compile(r"^\s*-?\s*\*\*(Task ID|Completed|Duration|Priority)\*\*:\s*(.+?)\s*$")
+AGENT_STATUS_RE = re.compile(r"^- \*\*(.+?)\*\*: \S+ (\w+) \(Score: ([\d.]+)/100\)")
+DURATION_RE = re.compile(r"([\d.]+)\s*(hours?|h|minutes?|mins?|m)\b", re.IGNORECASE)
+
+
+def tokenize(text):
+    """Lowercase word tokens; snake_case names are indexed whole and by their parts"""
+    tokens = set()
+    for token in TOKEN_RE.findall(text.lower()):
+        tokens.add(token)
+        if '_' in token:
+            tokens.update(part for part in token.split('_') if part)
+    return tokens
+
+
+def parse_timestamp(text):
+    """Epoch seconds for the ISO-ish timestamps used in the hub's Markdown, or None"""
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text.strip().replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_duration(text):
+    """'~0.25 hours', '1 hour', '90 minutes' -> hours"""
+    match = DURATION_RE.search(text or '')
+    if not match:
+        return None
+    value = float(match.group(1))
+    return value / 60 if match.group(2).lower().startswith('m') else value
+
+
+def agent_key(display_name):
+    """'Warp Agent' -> 'warp_agent', the inverse of the display names in progress_log.md"""
+    return display_name.strip().lower().replace(' ', '_')
+
+
+def read_progress_head(path):
+    """The hand-written part of progress_log.md, read only up to the tracker's section"""
+    lines = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.rstrip() == PROGRESS_MARKER:
+                break
+            lines.append(line)
+    return ''.join(lines)
+
+
+def parse_completed_tasks(text, agent_name):
+    """Completion entries from an agent's completed_tasks.md (both heading styles in use)"""
+    entries = []
+    entry = None
+    current_date = None
+
+    in_block = False
+    for line in text.splitlines():
+        # The generated block mirrors completions/*.jsonl, which is indexed directly
+        if line.startswith(BLOCK_START):
+            in_block, entry = True, None
+        if in_block:
+            in_block = not line.startswith(BLOCK_END)
+            continue
+        
+        date_match = DATE_HEADING_RE.match(line)
+        task_match = TASK_HEADING_RE.match(line)
+        if task_match:
+            entry = {'kind': 'completion', 'agent': agent_name, 'title': task_match.group(1),
+                     'date': current_date, 'lines': [line]}
+            entries.append(entry)
+            continue
+        if date_match:
+            current_date = date_match.group(1)
+            entry = None
+            continue
+        if line.startswith('## ') or line.strip() == '---':
+            entry = None
+            continue
+        if entry is not None:
+            entry['lines'].append(line)
+            field = FIELD_RE.match(line)
+            if field:
+                entry[field.group(1).lower().replace(' ', '_')] = field.group(2)
+
+    docs = []
+    for entry in entries:
+        completed = entry.get('completed') or entry['date']
+        docs.append({
+            'kind': 'completion',
+            'agent': agent_name,
+            'agents': {agent_name},
+            'title': entry['title'],
+            'task_id': entry.get('task_id'),
+            'timestamp': parse_timestamp(completed),
+            'duration_hours': parse_duration(entry.get('duration')),
+            'text': '\n'.join(entry['lines']).strip()
+        })
+    return docs
+
+
+def record_doc(record):
+    """Document for a structured record from agents/<agent>/completions/*.jsonl"""
+    text = "\n".join([record['title'], record.get('task_id') or '', *record.get('deliverables', []),
+                      record.get('quality_gates') or '', record.get('notes') or ''])
+    return {
+        'kind': 'completion',
+        'agent': record['agent'],
+        'agents': {record['agent']},
+        'title': record['title'],
+        'task_id': record.get('task_id'),
+        'timestamp': record['ts'],
+        'duration_hours': record.get('duration_hours'),
+        'text': text
+    }
+
+
+def parse_progress_log(text):
+    """One document per progress update (or per day of the hand-written daily summary)"""
+    sections = []
+    section = None
+
+    for line in text.splitlines():
+        heading = PROGRESS_HEADING_RE.match(line) or DATE_HEADING_RE.match(line)
+        if heading:
+            section = {'title': line.lstrip('# ').strip(), 'stamp': heading.group(1), 'lines': [line]}
+            sections.append(section)
+            continue
+        if line.startswith('## ') and not line.startswith('## Progress Update'):
+            section = None
+            continue
+        if section is not None:
+            section['lines'].append(line)
+
+    docs = []
+    for section in sections:
+        statuses = []
+        agents = set()
+        for line in section['lines']:
+            match = AGENT_STATUS_RE.match(line)
+            if match:
+                agent_name = agent_key(match.group(1))
+                agents.add(agent_name)
+                statuses.append((agent_name, match.group(2), float(match.group(3))))
+            elif line.startswith('**') and line.rstrip().endswith('**') and len(line.strip()) > 4:
+                agents.add(agent_key(line.strip().strip('*')))  # daily summary agent headings
+
+        docs.append({
+            'kind': 'progress',
+            'agent': None,
+            'agents': agents,
+            'title': section['title'],
+            'timestamp': parse_timestamp(section['stamp']),
+            'statuses': statuses,
+            'text': '\n'.join(section['lines']).strip()
+        })
+    return docs
+
+
+class HistoryIndex:
+    """
+    Parses the hub's history once and keeps it up to date incrementally.
+    Append-only sources (completion segments, progress_updates.jsonl written by
+    the tracker, status_events.jsonl) are read from their saved offsets, so only
+    new entries are indexed. Of progress_log.md only the hand-written head is
+    read, and re-parsed when it changed; the tracker's updates below it come from
+    progress_updates.jsonl (updates logged before that file existed are taken from
+    the Markdown once). A completed_tasks.md is re-parsed when its content changes.
+
+    Documents live in an inverted index (token -> doc ids); completions, status
+    samples and last-seen transitions are kept as tables. Documents do not keep
+    their text, so removed ones are dropped from the postings lazily, in a sweep.
+    The index is checkpointed in .state/history_index.snapshot.
+    """
+
+    def __init__(self, hub_path="./agent_communication_hub"):
+        self.hub_path = Path(hub_path)
+        self.progress_file = self.hub_path / "progress_log.md"
+        self.updates_file = self.hub_path / "progress_updates.jsonl"
+        self.events_file = self.hub_path / "status_events.jsonl"
+        self.snapshot = StateSnapshot(hub_path, "history_index")
+
+        state = self.snapshot.load() or {}
+        if state.get('version') != INDEX_VERSION:
+            state = {}
+        self.docs = state.get('docs', {})  # doc id -> document
+        self.postings = state.get('postings', {})  # token -> set of doc ids
+        self.sources = state.get('sources', {})  # relative path -> (change detector state, [doc ids])
+        self.segments = state.get('segments', {})  # relative path -> (inode, offset, [doc ids])
+        self.updates = state.get('updates', (None, 0, []))  # progress_updates.jsonl: (inode, offset, [doc ids])
+        # progress_log.md: signature, checked_ns, head hash, head doc ids, legacy update doc ids
+        self.progress = state.get('progress')
+        self.next_id = state.get('next_id', 0)
+        self.stale = state.get('stale', 0)  # removed doc ids still in the postings
+        self.events_offset = state.get('events_offset', 0)
+        self.events_inode = state.get('events_inode')
+        self.last_seen = state.get('last_seen', {})  # (agent, status) -> (epoch seconds, task)
+        self.transition_counts = state.get('transition_counts', {})  # (agent, status) -> count
+        self.completion_changes = 0  # completion sources changed by the last refresh
+
+    def save(self):
+        return self.snapshot.save({
+            'version': INDEX_VERSION,
+            'docs': self.docs,
+            'postings': self.postings,
+            'sources': self.sources,
+            'segments': self.segments,
+            'updates': self.updates,
+            'progress': self.progress,
+            'next_id': self.next_id,
+            'stale': self.stale,
+            'events_offset': self.events_offset,
+            'events_inode': self.events_inode,
+            'last_seen': self.last_seen,
+            'transition_counts': self.transition_counts
+        })
+
+    def markdown_sources(self):
+        """Every agents/*/completed_tasks.md (progress_log.md is handled by _refresh_progress)"""
+        sources = {}
+        for completed_file in sorted(self.hub_path.glob("agents/*/completed_tasks.md")):
+            sources[str(completed_file.relative_to(self.hub_path))] = (completed_file, completed_file.parent.name)
+        return sources
+
+    def _add(self, source, doc):
+        doc_id = self.next_id
+        self.next_id += 1
+        text = doc.pop('text')
+        doc['source'] = source
+        self.docs[doc_id] = doc
+        for token in tokenize(text) | doc['agents']:
+            self.postings.setdefault(token, set()).add(doc_id)
+        return doc_id
+
+    def _remove_source(self, source):
+        _, doc_ids = self.sources.pop(source, (None, []))
+        self._remove_docs(doc_ids)
+
+    def _remove_docs(self, doc_ids):
+        for doc_id in doc_ids:
+            self.docs.pop(doc_id, None)
+        self.stale += len(doc_ids)
+        if self.stale > max(STALE_SWEEP_MIN, len(self.docs)):
+            self._sweep()
+
+    def _sweep(self):
+        """Drop removed doc ids from the postings (amortized over the removals)"""
+        for token in list(self.postings):
+            live = {doc_id for doc_id in self.postings[token] if doc_id in self.docs}
+            if live:
+                self.postings[token] = live
+            else:
+                del self.postings[token]
+        self.stale = 0
+
+    def _read_appended(self, source, path, entry, make_docs):
+        """
+        Index the complete JSON lines appended to `path` after the offset in
+        `entry` (inode, offset, [doc ids]); returns the new entry, or None if
+        nothing was appended.
+        """
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        inode, offset, doc_ids = entry
+        replaced = entry[0] is not None and (stat.st_ino != inode or stat.st_size < offset)
+        if stat.st_ino != inode or stat.st_size < offset:
+            self._remove_docs(doc_ids)
+            inode, offset, doc_ids = stat.st_ino, 0, []
+        if stat.st_size == offset:
+            return (inode, offset, doc_ids) if replaced else None
+
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                doc_ids.extend(self._add(source, doc) for doc in make_docs(json.loads(line)))
+            except (json.JSONDecodeError, KeyError):
+                print(f"Skipping malformed record in {path}")
+        return (inode, offset + end, doc_ids)
+
+    def _refresh_segments(self):
+        """Index completion records appended since the last refresh"""
+        changed = 0
+        paths = {str(path.relative_to(self.hub_path)): path
+                 for path in self.hub_path.glob("agents/*/completions/segment-*.jsonl")}
+
+        for source in [s for s in self.segments if s not in paths]:
+            self._remove_docs(self.segments.pop(source)[2])
+            changed += 1
+
+        for source, path in sorted(paths.items()):
+            entry = self._read_appended(source, path, self.segments.get(source, (None, 0, [])),
+                                        lambda record: [record_doc(record)])
+            if entry is not None:
+                self.segments[source] = entry
+                changed += 1
+        return changed
+
+    def _refresh_progress(self):
+        """Index new tracker updates and, if it changed, the hand-written head of progress_log.md"""
+        changed = 0
+        entry = self._read_appended("progress_updates.jsonl", self.updates_file, self.updates,
+                                    lambda record: parse_progress_log(record['text']))
+        if entry is not None:
+            self.updates = entry
+            changed += 1
+
+        try:
+            now_ns = time.time_ns()
+            stat = self.progress_file.stat()
+        except FileNotFoundError:
+            if self.progress is not None:
+                self._remove_docs(self.progress[3] + self.progress[4])
+                self.progress = None
+                changed += 1
+            return changed
+
+        signature = stat_signature(stat)
+        if self.progress is not None:
+            known_signature, checked_ns, head_hash, head_ids, legacy_ids = self.progress
+            if signature == known_signature and not is_racy(max(stat.st_mtime_ns, stat.st_ctime_ns), checked_ns):
+                return changed
+        else:
+            head_hash, head_ids, legacy_ids = None, [], None
+
+        if legacy_ids is None:
+            # First scan: updates logged before progress_updates.jsonl existed live only in the Markdown
+            with open(self.progress_file, 'r', encoding='utf-8') as f:
+                _, marker, body = f.read().partition(PROGRESS_MARKER)
+            mirrored = {self.docs[doc_id]['title'] for doc_id in self.updates[2] if doc_id in self.docs}
+            legacy_ids = [self._add("progress_log.md", doc) for doc in parse_progress_log(marker + body)
+                          if doc['title'] not in mirrored]
+
+        head = read_progress_head(self.progress_file)
+        new_hash = hashlib.blake2b(head.encode('utf-8'), digest_size=16).hexdigest()
+        if new_hash != head_hash:
+            self._remove_docs(head_ids)
+            head_ids = [self._add("progress_log.md", doc) for doc in parse_progress_log(head)]
+            changed += 1
+
+        self.progress = (signature, now_ns, new_hash, head_ids, legacy_ids)
+        return changed
+
+    def _refresh_events(self):
+        try:
+            stat = self.events_file.stat()
+        except FileNotFoundError:
+            return 0
+
+        if stat.st_ino != self.events_inode or stat.st_size < self.events_offset:
+            self.events_inode = stat.st_ino
+            self.events_offset = 0
+            self.last_seen, self.transition_counts = {}, {}
+        if stat.st_size == self.events_offset:
+            return 0
+
+        with open(self.events_file, 'rb') as f:
+            f.seek(self.events_offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+
+        applied = 0
+        for line in data[:end].splitlines():
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if 'status' not in event:
+                continue  # carried-hours seeds
+            key = (event['agent'], event['status'])
+            if event['ts'] >= self.last_seen.get(key, (0, None))[0]:
+                self.last_seen[key] = (event['ts'], event.get('current_task'))
+            self.transition_counts[key] = self.transition_counts.get(key, 0) + 1
+            applied += 1
+
+        self.events_offset += end
+        return applied
+
+    def refresh(self):
+        """
+        Bring the index up to date; returns the number of sources/events that changed.
+        completion_changes counts only completion sources (completed_tasks.md, segments).
+        """
+        changed = 0
+        sources = self.markdown_sources()
+
+        for source in [s for s in self.sources if s not in sources]:
+            self._remove_source(source)
+            changed += 1
+
+        for source, (path, agent_name) in sources.items():
+            known = self.sources.get(source)
+            # Signature first, content hash when it moved or a same-tick rewrite could hide behind it
+            detector = FileChangeDetector(path, state=known[0] if known else None)
+            try:
+                if not detector.changed() and known:
+                    self.sources[source] = (detector.state(), known[1])
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except OSError as e:
+                print(f"Error reading {path}: {e}")
+                continue
+
+            docs = parse_completed_tasks(text, agent_name)
+            self._remove_source(source)
+            self.sources[source] = (detector.state(), [self._add(source, doc) for doc in docs])
+            changed += 1
+
+        changed += self._refresh_segments()
+        self.completion_changes = changed
+        changed += self._refresh_progress() + self._refresh_events()
+        if changed:
+            self.save()
+        return changed
+
+    def search(self, query, agent=None, kind=None, since=None, limit=20):
+        """Documents containing every query term, newest first"""
+        tokens = tokenize(query)
+        if agent:
+            tokens.add(agent)
+        if not tokens:
+            doc_ids = set(self.docs)
+        else:
+            postings = sorted((self.postings.get(token, set()) for token in tokens), key=len)
+            doc_ids = set(postings[0]).intersection(*postings[1:])
+
+        docs = [self.docs[doc_id] for doc_id in doc_ids if doc_id in self.docs]
+        docs = [doc for doc in docs
+                if (kind is None or doc['kind'] == kind)
+                and (since is None or (doc['timestamp'] or 0) >= since)]
+        docs.sort(key=lambda doc: doc['timestamp'] or 0, reverse=True)
+        return docs[:limit]
+
+    def completions(self, agent=None, since=None):
+        docs = [doc for doc in self.docs.values() if doc['kind'] == 'completion'
+                and (agent is None or doc['agent'] == agent)
+                and (since is None or (doc['timestamp'] or 0) >= since)]
+        return sorted(docs, key=lambda doc: doc['timestamp'] or 0, reverse=True)
+
+    def mean_duration(self, agent=None, since=None):
+        """(mean hours, number of completions with a recorded duration)"""
+        durations = [doc['duration_hours'] for doc in self.completions(agent, since)
+                     if doc['duration_hours'] is not None]
+        return (sum(durations) / len(durations) if durations else None), len(durations)
+
+    def last_status(self, agent, status):
+        """Most recent time the agent was seen in `status`: (epoch seconds, task, where) or None"""
+        candidates = []
+        if (agent, status) in self.last_seen:
+            ts, task = self.last_seen[(agent, status)]
+            candidates.append((ts, task, "status_events.jsonl"))
+        for doc in self.docs.values():
+            if doc['kind'] == 'progress' and doc['timestamp'] is not None:
+                if any(name == agent and seen == status for name, seen, _ in doc['statuses']):
+                    candidates.append((doc['timestamp'], None, doc['source']))
+        return max(candidates, key=lambda candidate: candidate[0]) if candidates else None
+
+
+def format_time(ts):
+    return datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S') if ts else "unknown time"
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the hub's progress and completion history")
+    parser.add_argument('--hub', default="./agent_communication_hub")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    search = subparsers.add_parser('search', help="full-text search")
+    search.add_argument('query', nargs='?', default='')
+    search.add_argument('--agent')
+    search.add_argument('--kind', choices=['completion', 'progress'])
+    search.add_argument('--days', type=float)
+    search.add_argument('--limit', type=int, default=20)
+
+    last = subparsers.add_parser('last', help="when an agent was last in a status")
+    last.add_argument('agent')
+    last.add_argument('status')
+
+    durations = subparsers.add_parser('durations', help="task durations")
+    durations.add_argument('--agent')
+    durations.add_argument('--days', type=float, default=7)
+
+    subparsers.add_parser('rebuild', help="discard the index and re-ingest everything")
+    args = parser.parse_args()
+
+    if args.command == 'rebuild':
+        StateSnapshot(args.hub, "history_index").clear()
+
+    started = time.perf_counter()
+    index = HistoryIndex(args.hub)
+    changed = index.refresh()
+
+    if args.command == 'search':
+        since = time.time() - args.days * 86400 if args.days else None
+        for doc in index.search(args.query, args.agent, args.kind, since, args.limit):
+            print(f"{format_time(doc['timestamp'])}  [{doc['kind']}] {doc['title']} ({doc['source']})")
+    elif args.command == 'last':
+        found = index.last_status(args.agent, args.status)
+        if found:
+            ts, task, where = found
+            print(f"{args.agent} was last {args.status} at {format_time(ts)}"
+                  f"{f' on {task}' if task else ''} ({where})")
+        else:
+            print(f"No record of {args.agent} being {args.status}")
+    elif args.command == 'durations':
+        since = time.time() - args.days * 86400
+        for doc in index.completions(args.agent, since):
+            hours = f"{doc['duration_hours']:.2f}h" if doc['duration_hours'] is not None else "?"
+            print(f"{format_time(doc['timestamp'])}  {doc['agent']}: {doc['title']} ({hours})")
+        mean, count = index.mean_duration(args.agent, since)
+        print(f"Mean duration: {mean:.2f} hours over {count} task(s)" if count else "No durations recorded")
+    elif args.command == 'rebuild':
+        print(f"Indexed {len(index.docs)} documents and {len(index.postings)} terms")
+
+    print(f"({changed} source(s) updated, {(time.perf_counter() - started) * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Hub Client
+Connection-pooled client for the hub server, used by monitors on hosts without the hub directory
+"""
+
+import itertools
+import json
+import queue
+import socket
+import threading
+
+from agent_mailbox import Mailbox
+from hub_server import DEFAULT_HOST, DEFAULT_PORT
+
+
+class HubClientError(Exception):
+    """The hub server rejected a request"""
+
+
+class HubClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, pool_size=4, timeout=5):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.timeout = timeout
+        self.pool = queue.LifoQueue(maxsize=pool_size)
+        self.ids = itertools.count(1)
+        self.id_lock = threading.Lock()
+
+    def connect(self):
+        if self.unix_path:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.unix_path)
+        else:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            # Requests are single small lines; don't let Nagle hold them back
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock, sock.makefile('rwb')
+
+    def _send(self, stream, request):
+        stream.write(json.dumps(request).encode('utf-8') + b"\n")
+        stream.flush()
+
+    def request(self, op, **params):
+        """Send one request over a pooled connection and return its result"""
+        try:
+            connection = self.pool.get_nowait()
+        except queue.Empty:
+            connection = self.connect()
+
+        with self.id_lock:
+            request_id = next(self.ids)
+
+        sock, stream = connection
+        try:
+            self._send(stream, dict(params, id=request_id, op=op))
+            line = stream.readline()
+            if not line:
+                raise ConnectionError("hub server closed the connection")
+            response = json.loads(line)
+        except Exception:
+            # Broken connection: drop it rather than return it to the pool
+            stream.close()
+            sock.close()
+            raise
+
+        try:
+            self.pool.put_nowait(connection)
+        except queue.Full:
+            stream.close()
+            sock.close()
+
+        if not response.get('ok'):
+            raise HubClientError(response.get('error'))
+        return response['result']
+
+    def mailbox(self, agent_name, reader=None):
+        """Mailbox for an agent whose inbox lives on the server's host"""
+        return RemoteMailbox(self, agent_name, reader)
+
+    def subscribe(self, agent_name):
+        """Yield task lists for an agent: the current one, then one per new revision"""
+        sock, stream = self.connect()
+        sock.settimeout(None)
+        try:
+            self._send(stream, {'id': 0, 'op': 'subscribe', 'agent': agent_name})
+            for line in stream:
+                message = json.loads(line)
+                if 'event' in message:
+                    yield message
+                elif not message.get('ok'):
+                    raise HubClientError(message.get('error'))
+                else:
+                    yield dict(message['result'], event='tasks', agent=agent_name)
+        finally:
+            stream.close()
+            sock.close()
+
+    def close(self):
+        while True:
+            try:
+                sock, stream = self.pool.get_nowait()
+            except queue.Empty:
+                break
+            stream.close()
+            sock.close()
+
+
+class RemoteMailbox(Mailbox):
+    """Mailbox over the hub server; the cursor is kept on the server, committed like a local one"""
+
+    def __init__(self, client, agent_name="warp_agent", reader=None):
+        self.client = client
+        self.agent_name = agent_name
+        self.reader = reader
+        self.pending = None  # position returned with the last batch
+
+    def send(self, to, kind, body, **fields):
+        return self.client.request('send', agent=self.agent_name, message=dict(fields, to=to, kind=kind, body=body))
+
+    def receive(self):
+        result = self.client.request('inbox', agent=self.agent_name, reader=self.reader)
+        self.pending = result['position']
+        return result['messages']
+
+    def peek(self):
+        return self.client.request('inbox', agent=self.agent_name, reader=self.reader, peek=True)['messages']
+
+    def commit(self):
+        if self.pending is None:
+            return
+        self.client.request('commit', agent=self.agent_name, reader=self.reader, position=self.pending)
+        self.pending = None
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Query a hub server")
+    parser.add_argument('op', choices=['ping', 'revision', 'tasks', 'bench'])
+    parser.add_argument('--agent', default="warp_agent")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix')
+    parser.add_argument('--count', type=int, default=1000)
+    args = parser.parse_args()
+
+    client = HubClient(args.host, args.port, args.unix)
+    if args.op == 'bench':
+        timings = []
+        for _ in range(args.count):
+            start = time.perf_counter()
+            client.request('tasks', agent=args.agent)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(f"{args.count} round trips: p50 {timings[len(timings) // 2]:.3f} ms, "
+              f"p99 {timings[int(len(timings) * 0.99)]:.3f} ms")
+    elif args.op == 'tasks':
+        print(json.dumps(client.request('tasks', agent=args.agent), indent=2))
+    else:
+        print(client.request(args.op))
+    client.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Hot-Reloadable Hub Configuration
+Watches JSON config files, validates them against a schema and swaps them in atomically
+"""
+
+import copy
+import json
+from pathlib import Path
+
+from change_detector import FileChangeDetector
+
+NUMBER = (int, float)
+
+# Monitor polling bounds (and work stealing and compaction settings) in monitor_config.json; every section and key is optional
+MONITOR_SCHEMA = {
+    'alert_system': {'min_interval': NUMBER, 'max_interval': NUMBER},
+    'progress_tracker': {'min_interval': NUMBER, 'max_interval': NUMBER},
+    'agent_monitor': {'min_interval': NUMBER, 'max_interval': NUMBER},
+    'simple_monitor': {'min_interval': NUMBER, 'working_interval': NUMBER, 'waiting_interval': NUMBER},
+    'work_stealing': {'enabled': bool, 'min_idle_minutes': NUMBER, 'min_victim_queue': NUMBER,
+                      'max_steals_per_cycle': NUMBER, 'availability': list, 'skills': dict, 'exclude': list},
+    'compaction': {'enabled': bool, 'min_bytes': NUMBER, 'min_completed': NUMBER}
+}
+
+
+def merge_defaults(defaults, config):
+    """Deep merge: keys missing at any level are filled in from the defaults"""
+    merged = copy.deepcopy(defaults)
+    for key, value in config.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_defaults(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def validate(config, schema, path=""):
+    """
+    Check a config against a schema of nested dicts whose leaves are types (or
+    tuples of types). Unknown top-level sections are allowed, but unknown keys
+    inside a section are errors: sections are passed on as keyword arguments.
+    Returns a list of errors.
+    """
+    errors = []
+    if not isinstance(config, dict):
+        return [f"{path or 'config'}: expected an object"]
+
+    if path:
+        errors.extend(f"{path}.{key}: unknown key" for key in config if key not in schema)
+
+    for key, expected in schema.items():
+        if key not in config:
+            continue
+        value = config[key]
+        where = f"{path}.{key}" if path else key
+        if isinstance(expected, dict):
+            errors.extend(validate(value, expected, where))
+            continue
+
+        types = expected if isinstance(expected, tuple) else (expected,)
+        # bool is an int subclass; true/false is never a valid number here
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            errors.append(f"{where}: expected {' or '.join(t.__name__ for t in types)}, "
+                          f"got {type(value).__name__}")
+        elif isinstance(value, NUMBER) and not isinstance(value, bool) and value < 0:
+            errors.append(f"{where}: must not be negative")
+
+    return errors
+
+
+def check_intervals(section, path):
+    """min_interval must not exceed any of the section's longer intervals"""
+    minimum = section.get('min_interval')
+    if minimum is None:
+        return []
+    return [f"{path}.{key}: must be at least min_interval ({minimum})"
+            for key, value in section.items()
+            if key.endswith('_interval') and key != 'min_interval' and isinstance(value, NUMBER) and value < minimum]
+
+
+def check_monitor_intervals(config):
+    return [error for section, values in config.items() if isinstance(values, dict)
+            for error in check_intervals(values, section)]
+
+
+class ConfigWatcher:
+    """
+    Holds the current version of a JSON config file. `poll()` costs one stat when
+    nothing changed; an edited file is parsed, merged with the defaults and
+    validated, and only replaces the current config if it is valid. Invalid edits
+    are reported and the last good config stays in force.
+    """
+
+    def __init__(self, path, defaults=None, schema=None, checks=(), create=False):
+        self.path = Path(path)
+        self.defaults = defaults or {}
+        self.schema = schema or {}
+        self.checks = checks  # callables: config -> list of errors
+        self.version = 0
+        self.errors = []
+
+        if create and not self.path.exists():
+            try:
+                with open(self.path, 'w') as f:
+                    json.dump(self.defaults, f, indent=2)
+            except OSError as e:
+                print(f"Error creating {self.path}: {e}")
+
+        self.config = copy.deepcopy(self.defaults)
+        self.detector = FileChangeDetector(self.path)
+        self.poll()
+
+    def load(self):
+        """Parse and validate the file; returns (config, errors)"""
+        try:
+            with open(self.path, 'r') as f:
+                loaded = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            return None, [f"{self.path}: {e}"]
+
+        errors = validate(loaded, self.schema)
+        if errors:
+            return None, errors
+
+        config = merge_defaults(self.defaults, loaded)
+        for check in self.checks:
+            errors.extend(check(config))
+        return (None, errors) if errors else (config, [])
+
+    def poll(self):
+        """Reload if the file changed; returns True when a new config was swapped in"""
+        if not self.detector.changed():
+            return False
+
+        config, self.errors = self.load()
+        if config is None:
+            for error in self.errors:
+                print(f"Invalid config, keeping the previous version: {error}")
+            return False
+
+        # A single reference swap: readers see either the old or the new config, never a mix
+        self.config = config
+        self.version += 1
+        return True
+
+
+class MonitorConfig:
+    """One monitor's polling bounds from monitor_config.json, falling back to its arguments"""
+
+    def __init__(self, hub_path, name, **defaults):
+        self.name = name
+        self.watcher = ConfigWatcher(
+            Path(hub_path) / "monitor_config.json",
+            schema=MONITOR_SCHEMA,
+            checks=[check_monitor_intervals]
+        )
+        self.defaults = defaults
+
+    def poll(self):
+        return self.watcher.poll()
+
+    def get(self, key):
+        return self.watcher.config.get(self.name, {}).get(key, self.defaults[key])
+
+    def apply(self, scheduler, max_key='max_interval'):
+        """Reload if needed and push the current bounds into an AdaptiveScheduler"""
+        changed = self.poll()
+        # A configured minimum may be combined with a default maximum below it
+        min_interval = self.get('min_interval')
+        max_interval = max(min_interval, self.get(max_key))
+        if changed:
+            print(f"Reloaded {self.name} intervals: {min_interval}-{max_interval} seconds")
+        scheduler.set_bounds(min_interval, max_interval)
+        return changed
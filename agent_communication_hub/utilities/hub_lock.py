@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Hub Lock Utility
+Advisory inter-process lock for read-modify-write cycles on shared hub files
+"""
+
+import fcntl
+import time
+from pathlib import Path
+
+
+class HubLockTimeout(Exception):
+    pass
+
+
+class HubLock:
+    def __init__(self, hub_path="./agent_communication_hub", name="hub", timeout=30, poll_interval=0.05):
+        self.lock_file = Path(hub_path) / ".state" / f"{name}.lock"
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.handle = None
+
+    def acquire(self):
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        self.handle = open(self.lock_file, 'a')
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            try:
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    self.handle.close()
+                    self.handle = None
+                    raise HubLockTimeout(f"Timed out waiting for {self.lock_file}")
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        if self.handle:
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+            self.handle.close()
+            self.handle = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Hub Server
+Serves the hub directory to agents over localhost TCP or a Unix socket
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from agent_mailbox import Mailbox
+from hub_lock import HubLock
+from instructions_parser import InstructionsArtifact, insert_before_communication_over
+from status_buffer import StatusWriteBuffer
+from task_index import TaskIndex
+from task_store import TaskStore
+
+# Wire format: one JSON object per line.
+#   request:  {"id": 1, "op": "tasks", "agent": "warp_agent"}
+#   response: {"id": 1, "ok": true, "result": ...} or {"id": 1, "ok": false, "error": "..."}
+#   push:     {"event": "tasks", "agent": "...", "revision": "...", "tasks": [...]} (subscribers only)
+# A revision covers instructions.md and the owners in task_assignments.json, so a task
+# moved by work stealing reaches its new owner's subscription.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class HubServer:
+    def __init__(self, hub_path="./agent_communication_hub", host=DEFAULT_HOST, port=DEFAULT_PORT,
+                 unix_path=None, watch_interval=0.25):
+        self.hub_path = Path(hub_path)
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.watch_interval = watch_interval
+        self.instructions_file = self.hub_path / "instructions.md"
+        self.status_buffer = StatusWriteBuffer.for_hub(hub_path)
+
+        self.instructions = InstructionsArtifact(hub_path)
+        self.task_index = TaskIndex(hub_path)
+        self.task_store = TaskStore(hub_path)
+        self.expanded_cache = (None, None, None)  # (content_hash, index signature, parsed)
+        self.parse_lock = threading.Lock()  # requests parse from worker threads concurrently
+        self.mailboxes = {}  # (agent, reader) -> Mailbox
+        self.mailbox_lock = threading.Lock()
+
+        self.subscribers = {}  # writer -> (agent name, last revision sent)
+        self.server = None
+        self.watcher = None
+
+    def parse(self):
+        """Parsed instructions with template references expanded, cached per revision"""
+        with self.parse_lock:
+            artifact = self.instructions.load()
+            self.task_index.refresh()
+
+            content_hash, signature, parsed = self.expanded_cache
+            if content_hash != artifact['content_hash'] or signature != self.task_index.signature:
+                revision = f"{artifact['content_hash']}:{self.task_index.signature}"
+                parsed = dict(artifact, tasks=self.task_index.expand_all(artifact['tasks']), revision=revision)
+                self.expanded_cache = (artifact['content_hash'], self.task_index.signature, parsed)
+            return parsed
+
+    def tasks_for(self, parsed, agent_name):
+        return [dict(task, assigned_to=agent_name) for task in parsed['tasks']
+                if self.task_index.owner(task) == agent_name]
+
+    def mailbox(self, agent_name, reader=None):
+        with self.mailbox_lock:
+            key = (agent_name, reader)
+            if key not in self.mailboxes:
+                self.mailboxes[key] = Mailbox(self.hub_path, agent_name, reader)
+            return self.mailboxes[key]
+
+    def read_inbox(self, agent_name, reader=None, peek=False):
+        """New messages and the position to commit once the remote reader has handled them"""
+        mailbox = self.mailbox(agent_name, reader)
+        if peek:
+            return {'messages': mailbox.peek(), 'position': None}
+        with self.mailbox_lock:
+            messages = mailbox.receive()
+            return {'messages': messages, 'position': mailbox.pending}
+
+    def commit_inbox(self, agent_name, position, reader=None):
+        mailbox = self.mailbox(agent_name, reader)
+        with self.mailbox_lock:
+            mailbox.commit(position)
+        return True
+
+    def send_message(self, agent_name, message):
+        return self.mailbox(agent_name).send(**message)
+
+    def post_section(self, section):
+        with HubLock(self.hub_path):
+            insert_before_communication_over(self.instructions_file, section)
+        return True
+
+    async def handle_request(self, request, writer):
+        op = request.get('op')
+
+        if op == 'ping':
+            return time.time()
+        if op == 'parse':
+            return await asyncio.to_thread(self.parse)
+        if op == 'revision':
+            parsed = await asyncio.to_thread(self.parse)
+            return parsed['revision']
+        if op == 'tasks':
+            parsed = await asyncio.to_thread(self.parse)
+            return self.tasks_for(parsed, request['agent'])
+        if op == 'status':
+            # Coalesced with every other agent's updates; blocking I/O only on a flush
+            await asyncio.to_thread(self.status_buffer.update, request['agent'],
+                                    request['status'], request.get('current_task'))
+            return True
+        if op == 'start':
+            return await asyncio.to_thread(self.task_store.start, request['task_id'], request['agent'])
+        if op == 'post':
+            return await asyncio.to_thread(self.post_section, request['section'])
+        if op == 'inbox':
+            return await asyncio.to_thread(self.read_inbox, request['agent'], request.get('reader'),
+                                           request.get('peek', False))
+        if op == 'commit':
+            return await asyncio.to_thread(self.commit_inbox, request['agent'], request['position'],
+                                           request.get('reader'))
+        if op == 'send':
+            return await asyncio.to_thread(self.send_message, request['agent'], request['message'])
+        if op == 'subscribe':
+            parsed = await asyncio.to_thread(self.parse)
+            self.subscribers[writer] = (request['agent'], parsed['revision'])
+            return {'revision': parsed['revision'], 'tasks': self.tasks_for(parsed, request['agent'])}
+
+        raise ValueError(f"unknown op: {op}")
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                request = {}
+                try:
+                    request = json.loads(line)
+                    response = {'id': request.get('id'), 'ok': True,
+                                'result': await self.handle_request(request, writer)}
+                except Exception as e:
+                    response = {'id': request.get('id'), 'ok': False, 'error': str(e)}
+
+                writer.write(json.dumps(response).encode('utf-8') + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.subscribers.pop(writer, None)
+            writer.close()
+
+    async def watch(self):
+        """Push task lists to subscribers whenever instructions.md or a task owner changes"""
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            if self.status_buffer.first_pending is not None:
+                await asyncio.to_thread(self.status_buffer.flush_due)
+            if not self.subscribers:
+                continue
+            try:
+                parsed = await asyncio.to_thread(self.parse)
+            except Exception as e:
+                print(f"Error parsing instructions: {e}")
+                continue
+            revision = parsed['revision']
+
+            for writer, (agent_name, sent) in list(self.subscribers.items()):
+                if sent == revision:
+                    continue
+                self.subscribers[writer] = (agent_name, revision)
+                event = {'event': 'tasks', 'agent': agent_name, 'revision': revision,
+                         'tasks': self.tasks_for(parsed, agent_name)}
+                try:
+                    writer.write(json.dumps(event).encode('utf-8') + b"\n")
+                    await writer.drain()
+                except ConnectionError:
+                    self.subscribers.pop(writer, None)
+
+    async def start(self):
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            self.server = await asyncio.start_unix_server(self.handle_connection, path=self.unix_path)
+            print(f"Hub server for {self.hub_path} listening on {self.unix_path}")
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+            print(f"Hub server for {self.hub_path} listening on {self.host}:{self.port}")
+        self.watcher = asyncio.create_task(self.watch())
+        return self.server
+
+    async def stop(self):
+        if self.watcher:
+            self.watcher.cancel()
+        self.status_buffer.flush()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the communication hub to remote agents")
+    parser.add_argument('--hub', default="./agent_communication_hub")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', help="Unix socket path (instead of TCP)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(HubServer(args.hub, args.host, args.port, args.unix).serve_forever())
+    except KeyboardInterrupt:
+        print("\nStopping hub server")
+
+if __name__ == "__main__":
+    main()
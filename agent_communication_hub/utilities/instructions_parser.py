@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Instructions Parsing Core
+Parses instructions.md once per revision and shares the result as a cached artifact
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from change_detector import is_racy
+
+ARTIFACT_VERSION = 2
+TASK_PATTERN = re.compile(r'```json\s*(\{[\s\S]*?\})\s*```')
+DELIMITER_PATTERN = re.compile(r'\((TASK_ASSIGNED|COMMUNICATION_OVER|URGENT|QUESTION|BLOCKED)\)')
+LAST_UPDATE_PATTERN = re.compile(r'\*\*Last Updated\*\*:\s*([^\n]+)')
+
+
+def is_task(data):
+    """
+    An assignment block: non-empty task_id and assigned_to (truthy, not just present).
+    task_parser.js (extractTasks) applies the same rule.
+    """
+    return bool(data.get('task_id')) and bool(data.get('assigned_to'))
+
+
+def extract_tasks(content):
+    """Extract JSON task objects from markdown"""
+    tasks = []
+
+    for match in TASK_PATTERN.finditer(content):
+        try:
+            task_data = json.loads(match.group(1))
+            if is_task(task_data):
+                tasks.append(task_data)
+        except json.JSONDecodeError as e:
+            print(f"Invalid JSON in task assignment: {e}")
+
+    return tasks
+
+
+def extract_delimiters(content):
+    """Extract communication delimiters with their character positions"""
+    return [{'type': match.group(1), 'position': match.start()}
+            for match in DELIMITER_PATTERN.finditer(content)]
+
+
+def get_last_update(content):
+    """Get last update timestamp"""
+    update_match = LAST_UPDATE_PATTERN.search(content)
+    return update_match.group(1).strip() if update_match else None
+
+
+def get_communication_status(content):
+    """Determine communication status"""
+    if '(COMMUNICATION_OVER)' in content:
+        return 'complete'
+    elif '(TASK_ASSIGNED)' in content:
+        return 'task_assigned'
+    elif '(URGENT)' in content:
+        return 'urgent'
+    elif '(QUESTION)' in content:
+        return 'question_pending'
+    elif '(BLOCKED)' in content:
+        return 'blocked'
+    return 'active'
+
+
+def parse_content(content):
+    """Parse instructions content into tasks, delimiters, last update and status"""
+    return {
+        'tasks': extract_tasks(content),
+        'delimiters': extract_delimiters(content),
+        'last_update': get_last_update(content),
+        'status': get_communication_status(content)
+    }
+
+
+def insert_before_communication_over(instructions_file, section):
+    """Insert a section before the final (COMMUNICATION_OVER); callers hold the hub lock"""
+    with open(instructions_file, 'r') as f:
+        content = f.read()
+
+    head, marker, tail = content.rpartition("(COMMUNICATION_OVER)")
+    if not marker:
+        head, tail = content, ""
+
+    with open(instructions_file, 'w') as f:
+        f.write(head + section + "(COMMUNICATION_OVER)" + tail)
+
+
+class InstructionsArtifact:
+    """
+    Shared parse result for instructions.md, stored at .state/instructions_parse.json.
+    The artifact is keyed by the SHA-256 of the file bytes; the recorded stat signature
+    (mtime_ns, size, inode, ctime_ns) lets readers (Python or utilities/task_parser.js)
+    reuse it without reading the file, unless it was verified inside the racy window.
+    """
+
+    def __init__(self, hub_path="./agent_communication_hub"):
+        self.hub_path = Path(hub_path)
+        self.instructions_file = self.hub_path / "instructions.md"
+        self.artifact_file = self.hub_path / ".state" / "instructions_parse.json"
+        self.cached = None
+
+    def _read_artifact(self):
+        try:
+            with open(self.artifact_file, 'r') as f:
+                artifact = json.load(f)
+            if artifact.get('version') == ARTIFACT_VERSION:
+                return artifact
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        return None
+
+    def _write_artifact(self, artifact):
+        try:
+            self.artifact_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.artifact_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump(artifact, f)
+            os.replace(temp_file, self.artifact_file)
+        except Exception as e:
+            print(f"Error writing parse artifact: {e}")
+
+    def load(self):
+        """Return the parse artifact for the current revision, parsing only if it changed"""
+        stat = self.instructions_file.stat()
+
+        def matches(candidate):
+            # A signature recorded too close to the file's mtime may hide a same-tick rewrite
+            return (candidate is not None and candidate['mtime_ns'] == str(stat.st_mtime_ns) and
+                    candidate['size'] == stat.st_size and candidate.get('inode') == stat.st_ino and
+                    candidate.get('ctime_ns') == str(stat.st_ctime_ns) and
+                    not is_racy(max(stat.st_mtime_ns, stat.st_ctime_ns), int(candidate.get('verified_ns', 0))))
+
+        if matches(self.cached):
+            return self.cached
+
+        artifact = self._read_artifact()
+        if matches(artifact):
+            self.cached = artifact
+            return artifact
+
+        verified_ns = time.time_ns()
+        with open(self.instructions_file, 'rb') as f:
+            raw = f.read()
+        content_hash = hashlib.sha256(raw).hexdigest()
+
+        revision = {'mtime_ns': str(stat.st_mtime_ns), 'size': stat.st_size, 'inode': stat.st_ino,
+                    'ctime_ns': str(stat.st_ctime_ns), 'verified_ns': str(verified_ns)}
+        if artifact and artifact['content_hash'] == content_hash:
+            artifact.update(revision)
+        else:
+            artifact = {
+                'version': ARTIFACT_VERSION,
+                'content_hash': content_hash,
+                **revision,
+                'parsed_at': datetime.now().isoformat(),
+                **parse_content(raw.decode('utf-8'))
+            }
+
+        self._write_artifact(artifact)
+        self.cached = artifact
+        return artifact
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Memory Profiler
+Opt-in tracemalloc reporting of top allocators and RSS for long-running monitors
+"""
+
+import os
+import resource
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Set to a reporting interval in seconds (e.g. HUB_MEMORY_PROFILE=600) to enable
+ENV_VAR = "HUB_MEMORY_PROFILE"
+
+
+def current_rss_bytes():
+    """Resident set size of this process; falls back to the peak on non-Linux systems"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (FileNotFoundError, ValueError, OSError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+class MemoryProfiler:
+    def __init__(self, component, hub_path="./agent_communication_hub", interval=None, top=10, frames=5):
+        if interval is None and os.environ.get(ENV_VAR):
+            interval = float(os.environ[ENV_VAR])
+
+        self.component = component
+        self.enabled = bool(interval)
+        self.interval = interval
+        self.top = top
+        self.frames = frames
+        self.report_file = Path(hub_path) / ".state" / f"memory_{component}.log"
+
+        self.last_report = None
+        self.previous = None
+
+    def start(self):
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.last_report = time.monotonic()
+
+    def maybe_report(self):
+        """Report if the interval has elapsed; cheap no-op when profiling is off"""
+        if not self.enabled:
+            return None
+        if self.last_report is None:
+            self.start()
+            return None
+        if time.monotonic() - self.last_report < self.interval:
+            return None
+
+        self.last_report = time.monotonic()
+        return self.report()
+
+    def report(self):
+        """Log RSS, traced memory and the top allocation sites (with growth since last report)"""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        traced, peak = tracemalloc.get_traced_memory()
+
+        if self.previous is not None:
+            stats = snapshot.compare_to(self.previous, 'lineno')[:self.top]
+            lines = [f"  {stat.size / 1024:.1f} KiB ({stat.size_diff / 1024:+.1f} KiB) "
+                     f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}" for stat in stats]
+        else:
+            stats = snapshot.statistics('lineno')[:self.top]
+            lines = [f"  {stat.size / 1024:.1f} KiB {stat.traceback[0].filename}:{stat.traceback[0].lineno}"
+                     for stat in stats]
+        self.previous = snapshot
+
+        report = (f"{datetime.now().isoformat()} [{self.component}] "
+                  f"rss={current_rss_bytes() / 1048576:.1f}MiB traced={traced / 1048576:.1f}MiB "
+                  f"peak={peak / 1048576:.1f}MiB\n" + "\n".join(lines) + "\n")
+
+        try:
+            self.report_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.report_file, 'a') as f:
+                f.write(report)
+        except Exception as e:
+            print(f"Error writing memory report: {e}")
+
+        print(report, end='')
+        return report
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Adaptive Poll Scheduler
+Fixed-rate polling ticks with exponential backoff, jitter and urgent fast-path
+"""
+
+import random
+import time
+
+
+class AdaptiveScheduler:
+    """
+    Polls quickly after changes and backs off exponentially while nothing changes.
+    Ticks are scheduled against absolute deadlines, so the time spent inside a
+    cycle does not accumulate as drift.
+    """
+
+    def __init__(self, min_interval=5, max_interval=60, backoff=2.0, jitter=0.1,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.clock = clock
+        self.sleep = sleep
+
+        self.interval = min_interval
+        self.next_tick = None
+
+    def set_bounds(self, min_interval, max_interval):
+        """Change the interval range, clamping the current interval into it"""
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = max(min_interval, min(self.interval, max_interval))
+
+    def record(self, changed=False, urgent=False):
+        """Feed the outcome of a cycle back into the interval"""
+        if urgent:
+            # Poll again at the minimum interval, starting now rather than at the old deadline
+            self.interval = self.min_interval
+            self.next_tick = self.clock()
+        elif changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+
+    def next_delay(self):
+        """Seconds until the next tick; missed ticks are skipped rather than bunched"""
+        now = self.clock()
+        if self.next_tick is None:
+            self.next_tick = now
+
+        spread = self.interval * self.jitter
+        self.next_tick += self.interval + random.uniform(-spread, spread)
+        if self.next_tick < now:
+            self.next_tick = now
+
+        return self.next_tick - now
+
+    def wait(self):
+        """Sleep until the next tick"""
+        delay = self.next_delay()
+        if delay > 0:
+            self.sleep(delay)
+        return delay
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Quality Gate Runner
+Runs the required checks from standards_enforcement/quality_gates.json in parallel with result caching
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# coding_standards value used in task assignments -> stack key in quality_gates.json
+STACK_BY_STANDARDS = {
+    'php_laravel_standards': 'php_laravel',
+    'react_typescript_standards': 'javascript_react',
+    'react_native_standards': 'react_native'
+}
+
+
+def expand_braces(pattern):
+    """Expand one level of {a,b} alternatives, e.g. '*.{ts,tsx}' -> ['*.ts', '*.tsx']"""
+    match = re.search(r'\{([^{}]*)\}', pattern)
+    if not match:
+        return [pattern]
+
+    expanded = []
+    for option in match.group(1).split(','):
+        expanded.extend(expand_braces(pattern[:match.start()] + option + pattern[match.end():]))
+    return expanded
+
+
+def run_check(command, cwd, timeout):
+    """Run one gate command; executed in a worker process"""
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(command, shell=True, cwd=cwd, capture_output=True,
+                                text=True, timeout=timeout)
+        returncode = result.returncode
+        output = (result.stdout + result.stderr)[-2000:]
+    except subprocess.TimeoutExpired:
+        returncode = -1
+        output = f"Timed out after {timeout} seconds"
+
+    return {
+        'returncode': returncode,
+        'passed': returncode == 0,
+        'duration': time.perf_counter() - start,
+        'output': output
+    }
+
+
+class QualityGateRunner:
+    def __init__(self, hub_path="./agent_communication_hub", project_root=".", max_workers=None, timeout=900):
+        self.hub_path = Path(hub_path)
+        self.project_root = Path(project_root)
+        self.gates_file = self.hub_path / "standards_enforcement" / "quality_gates.json"
+        self.cache_file = self.hub_path / ".state" / "quality_gate_cache.json"
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        self.gates = self.load_gates()
+        self.cache = self.load_cache()
+
+    def load_gates(self):
+        """Load gate definitions"""
+        try:
+            with open(self.gates_file, 'r') as f:
+                return json.load(f)['quality_gates']
+        except Exception as e:
+            print(f"Error loading quality gates: {e}")
+            return {}
+
+    def load_cache(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'results': {}, 'file_hashes': {}}
+
+    def save_cache(self):
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.cache_file.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump(self.cache, f)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            print(f"Error saving quality gate cache: {e}")
+
+    def _file_hash(self, path):
+        """Content hash of a file, reused while its mtime and size are unchanged"""
+        stat = path.stat()
+        key = str(path)
+        cached = self.cache['file_hashes'].get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+
+        self.cache['file_hashes'][key] = [stat.st_mtime_ns, stat.st_size, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def input_hash(self, stack):
+        """Hash of every file matched by the stack's file_patterns; None when nothing matches"""
+        files = set()
+        for pattern in self.gates[stack].get('file_patterns', []):
+            for expanded in expand_braces(pattern):
+                files.update(p for p in self.project_root.glob(expanded) if p.is_file())
+        if not files:
+            return None
+
+        digest = hashlib.sha256()
+        for path in sorted(files):
+            digest.update(str(path.relative_to(self.project_root)).encode('utf-8'))
+            digest.update(self._file_hash(path).encode('utf-8'))
+        return digest.hexdigest()
+
+    def run(self, stack, check_names=None, force=False):
+        """
+        Run a stack's required checks concurrently; gates that passed on unchanged
+        inputs come from the cache. When no file under the project root matches the
+        stack's file_patterns (usually a wrong project_root) nothing runs and the
+        report is `skipped`, which does not count as a pass.
+        """
+        if stack not in self.gates:
+            print(f"Unknown quality gate stack: {stack}")
+            return None
+
+        checks = [c for c in self.gates[stack]['required_checks']
+                  if check_names is None or c['name'] in check_names]
+        inputs = self.input_hash(stack)
+        start = time.perf_counter()
+        if inputs is None:
+            return {
+                'stack': stack,
+                'passed': False,
+                'skipped': True,
+                'project_root': str(self.project_root.resolve()),
+                'gates': [],
+                'total_duration': time.perf_counter() - start,
+                'timestamp': datetime.now().isoformat()
+            }
+
+        results = {}
+        pending = {}
+        for check in checks:
+            key = hashlib.sha256(f"{stack}\0{check['name']}\0{check['command']}\0{inputs}".encode('utf-8')).hexdigest()
+            if key in self.cache['results'] and not force:
+                results[check['name']] = dict(self.cache['results'][key], cached=True)
+            else:
+                pending[check['name']] = (key, check)
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {name: pool.submit(run_check, check['command'], str(self.project_root), self.timeout)
+                           for name, (key, check) in pending.items()}
+                for name, future in futures.items():
+                    result = future.result()
+                    result['ran_at'] = datetime.now().isoformat()
+                    # Failures and timeouts may be flaky or environmental; only a pass is final for these inputs
+                    if result['passed']:
+                        self.cache['results'][pending[name][0]] = result
+                    results[name] = dict(result, cached=False)
+            self.save_cache()
+
+        gates = [dict(results[c['name']], name=c['name'], required=c.get('required', True)) for c in checks]
+        return {
+            'stack': stack,
+            'passed': all(g['passed'] for g in gates if g['required']),
+            'gates': gates,
+            'total_duration': time.perf_counter() - start,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def run_for_task(self, task_data):
+        """Run the gates that apply to a task, based on its coding_standards"""
+        stack = task_data.get('quality_stack') or STACK_BY_STANDARDS.get(task_data.get('coding_standards'))
+        if not stack:
+            return None
+        return self.run(stack)
+
+
+def print_report(report):
+    if report.get('skipped'):
+        print(f"Quality gates for {report['stack']}: ⚠️ SKIPPED (no files match the stack's file_patterns "
+              f"under {report['project_root']})")
+        return
+    status = '✅ PASSED' if report['passed'] else '❌ FAILED'
+    print(f"Quality gates for {report['stack']}: {status} ({report['total_duration']:.1f}s)")
+    for gate in report['gates']:
+        mark = '✅' if gate['passed'] else '❌'
+        source = 'cached' if gate['cached'] else f"{gate['duration']:.1f}s"
+        print(f"  {mark} {gate['name']} ({source})")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run quality gates for a stack")
+    parser.add_argument('stack', help="Stack key from quality_gates.json, e.g. php_laravel")
+    parser.add_argument('--hub', default="./agent_communication_hub")
+    parser.add_argument('--project-root', default=".")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="Ignore cached results")
+    args = parser.parse_args()
+
+    runner = QualityGateRunner(args.hub, args.project_root, args.workers)
+    report = runner.run(args.stack, force=args.force)
+    if report:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Compact Record Types
+Slotted records for the long-lived collections kept by the monitors
+"""
+
+from dataclasses import dataclass, asdict
+
+
+@dataclass(slots=True)
+class AlertRecord:
+    """Dedup-window entry: just what is needed to suppress a repeat alert"""
+    key: str
+    type: str
+    severity: str
+    agent: str
+    timestamp: float  # epoch seconds
+
+    @classmethod
+    def from_alert(cls, alert, key, timestamp):
+        return cls(key, alert['type'], alert['severity'], alert.get('agent', 'system'), timestamp)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['key'], data['type'], data['severity'], data['agent'], data['timestamp'])
+
+
+@dataclass(slots=True)
+class TaskRecord:
+    """Index entry for a task in task_assignments.json"""
+    task_id: str
+    state: str
+    assigned_to: str
+    template: str
+    task: dict
+
+
+@dataclass(slots=True)
+class AgentMetrics:
+    """Per-agent productivity metrics used in progress reports"""
+    tasks_completed_today: int
+    total_hours_logged: float
+    current_status: str
+    availability: str
+    time_since_last_activity: float  # minutes
+    productivity_score: float
+    utilization: float = 0.0  # share of today's tracked time spent working
+
+    def to_dict(self):
+        return asdict(self)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+State Snapshot Utility
+Checkpoints monitor state to a JSON file so restarts resume where they left off
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+# .state/ is shared by every process on the hub, so snapshots are plain data:
+# loading one must never run code (which rules out pickle)
+SNAPSHOT_MAGIC = b"FLHUB-JSON\n"
+SNAPSHOT_VERSION = 2
+TAGS = ('__tuple__', '__set__', '__items__')
+
+
+def encode(value):
+    """JSON-ready copy of `value`; tuples, sets and dicts with non-string keys are tagged so they round-trip"""
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value):
+            return {key: encode(item) for key, item in value.items()}
+        return {'__items__': [[encode(key), encode(item)] for key, item in value.items()]}
+    if isinstance(value, tuple):
+        return {'__tuple__': [encode(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {'__set__': [encode(item) for item in value]}
+    if isinstance(value, list):
+        return [encode(item) for item in value]
+    return value
+
+
+def decode(obj):
+    """json object_hook reversing encode(); nested values are already decoded"""
+    if len(obj) == 1:
+        (tag, items), = obj.items()
+        if tag == '__tuple__':
+            return tuple(items)
+        if tag == '__set__':
+            return set(items)
+        if tag == '__items__':
+            return {key: item for key, item in items}
+    return obj
+
+
+class StateSnapshot:
+    def __init__(self, hub_path="./agent_communication_hub", component="monitor"):
+        self.hub_path = Path(hub_path)
+        self.state_dir = self.hub_path / ".state"
+        self.snapshot_file = self.state_dir / f"{component}.snapshot"
+        self.component = component
+
+    def save(self, state):
+        """
+        Write state (plain data: dicts, lists, tuples, sets, str, numbers, bool, None)
+        atomically (temp file + rename) so a crash never leaves a torn snapshot
+        """
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            payload = json.dumps({
+                'version': SNAPSHOT_VERSION,
+                'component': self.component,
+                'saved_at': datetime.now().isoformat(),
+                'state': encode(state)
+            }, separators=(',', ':')).encode('utf-8')
+
+            temp_file = self.snapshot_file.with_suffix('.tmp')
+            with open(temp_file, 'wb') as f:
+                f.write(SNAPSHOT_MAGIC + payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.snapshot_file)
+
+            return True
+        except Exception as e:
+            print(f"Error saving state snapshot: {e}")
+            return False
+
+    def load(self):
+        """Load the last saved state, or None if there is no usable snapshot"""
+        try:
+            if not self.snapshot_file.exists():
+                return None
+
+            with open(self.snapshot_file, 'rb') as f:
+                data = f.read()
+
+            if not data.startswith(SNAPSHOT_MAGIC):
+                print(f"Ignoring snapshot with unknown format: {self.snapshot_file}")
+                return None
+
+            snapshot = json.loads(data[len(SNAPSHOT_MAGIC):], object_hook=decode)
+            if snapshot.get('version') != SNAPSHOT_VERSION:
+                print(f"Ignoring snapshot with version {snapshot.get('version')}")
+                return None
+
+            return snapshot['state']
+        except Exception as e:
+            print(f"Error loading state snapshot: {e}")
+            return None
+
+    def clear(self):
+        """Remove the snapshot so the next start is a cold start"""
+        try:
+            self.snapshot_file.unlink()
+        except FileNotFoundError:
+            pass
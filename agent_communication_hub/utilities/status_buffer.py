@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Status Write-Behind Buffer
+Coalesces agent_status.json updates and flushes them in one compact write
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from hub_lock import HubLock
+from status_events import StatusAggregator, append_events, make_event, make_seed_event
+
+# Transitions someone is waiting on; these skip the coalescing window
+IMMEDIATE_STATUSES = ('blocked',)
+
+
+def apply_status(status_data, agent_name, status, current_task, last_activity):
+    """Apply one agent's (coalesced) status change to the loaded status document"""
+    if agent_name in status_data['agents']:
+        agent_status = status_data['agents'][agent_name]
+        agent_status['status'] = status
+        agent_status['current_task'] = current_task
+        agent_status['last_activity'] = last_activity
+
+
+def apply_derived(status_data, aggregator, events_file, now=None):
+    """Replace the time-accounting fields with values derived from the status events"""
+    # Agents seen for the first time keep the hours they had logged by hand
+    seeds = [make_seed_event(agent_name, agent_status.get('total_hours_logged', 0))
+             for agent_name, agent_status in status_data['agents'].items() if not aggregator.knows(agent_name)]
+    if seeds:
+        append_events(events_file, seeds)
+        aggregator.refresh()
+    
+    for agent_name, agent_status in status_data['agents'].items():
+        agent_status.update(aggregator.derived(agent_name, now))
+
+
+class StatusWriteBuffer:
+    """
+    In-process write-behind buffer for agent_status.json. Updates are held for up
+    to `window` seconds and written together; the latest status per agent wins.
+    Every update is also recorded as a transition in status_events.jsonl, from
+    which hours, daily completions and utilization are derived at flush time.
+    A timer armed by the first pending update flushes when the window is up, so
+    writes do not wait for the owner's next poll (pass timer=False when the clock
+    is not wall time and the owner drives flush_due itself). One buffer is shared
+    per hub and process.
+    """
+
+    _buffers = {}
+    _buffers_lock = threading.Lock()
+
+    @classmethod
+    def for_hub(cls, hub_path="./agent_communication_hub", window=2.0, clock=time.monotonic, timer=True):
+        key = str(Path(hub_path).resolve())
+        with cls._buffers_lock:
+            if key not in cls._buffers:
+                cls._buffers[key] = cls(hub_path, window, clock, timer)
+            return cls._buffers[key]
+
+    def __init__(self, hub_path="./agent_communication_hub", window=2.0, clock=time.monotonic, timer=True):
+        self.hub_path = Path(hub_path)
+        self.status_file = self.hub_path / "agent_status.json"
+        self.events_file = self.hub_path / "status_events.jsonl"
+        self.window = window
+        self.clock = clock
+        self.use_timer = timer
+        self.aggregator = StatusAggregator(hub_path)
+
+        self.pending = {}  # agent -> [status, current_task, last_activity]
+        self.events = []  # every transition, in order, not coalesced
+        self.first_pending = None
+        self.timer = None
+        self.lock = threading.Lock()
+        self.updates = 0
+        self.writes = 0
+        atexit.register(self.flush)
+
+    def update(self, agent_name, status, current_task=None):
+        """Queue a status change; flushes now for critical transitions or when the window is up"""
+        with self.lock:
+            event = make_event(agent_name, status, current_task)
+            self.events.append(event)
+            self.pending[agent_name] = [status, current_task, event['timestamp']]
+            self.updates += 1
+            if self.first_pending is None:
+                self.first_pending = self.clock()
+                self._arm_timer()
+
+        if status in IMMEDIATE_STATUSES:
+            return self.flush()
+        return self.flush_due()
+
+    def _arm_timer(self):
+        """Schedule a flush for the end of the window (called with the lock held)"""
+        if self.use_timer and self.timer is None:
+            self.timer = threading.Timer(self.window, self._timer_flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _timer_flush(self):
+        with self.lock:
+            self.timer = None
+        self.flush()
+
+    def flush_due(self):
+        """Flush if the oldest pending update has waited a full window"""
+        if self.first_pending is not None and self.clock() - self.first_pending >= self.window:
+            return self.flush()
+        return False
+
+    def flush(self):
+        """Record pending events and write every pending update in a single read-modify-write"""
+        with self.lock:
+            if not self.pending:
+                return False
+            pending, self.pending = self.pending, {}
+            events, self.events = self.events, []
+            self.first_pending = None
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+            try:
+                with HubLock(self.hub_path, name="status"):
+                    append_events(self.events_file, events)
+                    events = []
+                    self.aggregator.refresh()
+
+                    with open(self.status_file, 'r') as f:
+                        status_data = json.load(f)
+
+                    for agent_name, (status, current_task, last_activity) in pending.items():
+                        apply_status(status_data, agent_name, status, current_task, last_activity)
+                    apply_derived(status_data, self.aggregator, self.events_file)
+                    status_data['last_updated'] = datetime.now().isoformat()
+
+                    temp_file = self.status_file.with_suffix('.tmp')
+                    with open(temp_file, 'w') as f:
+                        json.dump(status_data, f, separators=(',', ':'))
+                    os.replace(temp_file, self.status_file)
+            except Exception as e:
+                # Keep the updates (unless newer ones superseded them) for the next flush
+                for agent_name, entry in pending.items():
+                    self.pending.setdefault(agent_name, entry)
+                self.events[:0] = events
+                self.first_pending = self.clock()
+                self._arm_timer()
+                print(f"Error flushing status updates: {e}")
+                return False
+
+            self.writes += 1
+            return True
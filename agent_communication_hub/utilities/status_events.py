@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Status Event Log
+Append-only agent status transitions with daily rollups for time accounting
+"""
+
+import json
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from state_snapshot import StateSnapshot
+
+# Time in these statuses counts as logged work; 'offline' is not tracked time at all
+WORKING_STATUSES = ('working',)
+UNTRACKED_STATUSES = ('offline',)
+
+
+def make_event(agent_name, status, current_task=None, ts=None):
+    ts = time.time() if ts is None else ts
+    return {
+        'ts': ts,
+        'timestamp': datetime.fromtimestamp(ts).isoformat(),
+        'agent': agent_name,
+        'status': status,
+        'current_task': current_task
+    }
+
+
+def make_seed_event(agent_name, hours):
+    """Hours an agent had logged by hand before event sourcing; counted once, on top of derived time"""
+    ts = time.time()
+    return {'ts': ts, 'timestamp': datetime.fromtimestamp(ts).isoformat(),
+            'agent': agent_name, 'carried_hours': hours}
+
+
+def append_events(events_file, events):
+    """Append events as JSON lines in a single write; callers hold the status lock"""
+    if not events:
+        return
+    with open(events_file, 'a') as f:
+        f.write(''.join(json.dumps(event) + "\n" for event in events))
+
+
+def split_by_day(start, end):
+    """Yield (YYYY-MM-DD, seconds) for the local days an interval spans"""
+    while start < end:
+        day = date.fromtimestamp(start)
+        midnight = datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+        chunk_end = min(end, midnight)
+        yield day.isoformat(), chunk_end - start
+        start = chunk_end
+
+
+class StatusAggregator:
+    """
+    Folds status_events.jsonl into per-day, per-agent rollups (seconds per status,
+    completed tasks, transitions) and running totals. Only events past the saved
+    offset are read, so refreshing is proportional to what happened since last time.
+    """
+
+    def __init__(self, hub_path="./agent_communication_hub"):
+        self.events_file = Path(hub_path) / "status_events.jsonl"
+        self.snapshot = StateSnapshot(hub_path, "status_aggregator")
+
+        state = self.snapshot.load() or {}
+        self.offset = state.get('offset', 0)
+        self.inode = state.get('inode')
+        self.current = state.get('current', {})  # agent -> {status, task, since}
+        self.rollups = state.get('rollups', {})  # day -> agent -> rollup
+        self.working_seconds = state.get('working_seconds', {})  # agent -> closed working seconds
+        self.carried_hours = state.get('carried_hours', {})  # hours logged before event sourcing
+
+    def save(self):
+        return self.snapshot.save({
+            'offset': self.offset,
+            'inode': self.inode,
+            'current': self.current,
+            'rollups': self.rollups,
+            'working_seconds': self.working_seconds,
+            'carried_hours': self.carried_hours
+        })
+
+    def knows(self, agent_name):
+        """Whether the agent has been seeded, i.e. its derived values are authoritative"""
+        return agent_name in self.carried_hours
+
+    def _rollup(self, day, agent_name):
+        return self.rollups.setdefault(day, {}).setdefault(
+            agent_name, {'seconds': {}, 'completed': 0, 'transitions': 0})
+
+    def _close_interval(self, agent_name, end):
+        state = self.current.get(agent_name)
+        if not state or end <= state['since']:
+            return
+        for day, seconds in split_by_day(state['since'], end):
+            rollup = self._rollup(day, agent_name)
+            rollup['seconds'][state['status']] = rollup['seconds'].get(state['status'], 0) + seconds
+            if state['status'] in WORKING_STATUSES:
+                self.working_seconds[agent_name] = self.working_seconds.get(agent_name, 0) + seconds
+
+    def apply(self, event):
+        agent_name = event['agent']
+        if 'carried_hours' in event:
+            self.carried_hours[agent_name] = event['carried_hours']
+            return
+
+        self._close_interval(agent_name, event['ts'])
+
+        rollup = self._rollup(date.fromtimestamp(event['ts']).isoformat(), agent_name)
+        rollup['transitions'] += 1
+        if event['status'] == 'completed_task':
+            rollup['completed'] += 1
+
+        previous = self.current.get(agent_name)
+        # Events from different processes can land slightly out of order; never go backwards
+        since = max(event['ts'], previous['since']) if previous else event['ts']
+        self.current[agent_name] = {'status': event['status'], 'task': event.get('current_task'), 'since': since}
+
+    def refresh(self):
+        """Apply events appended since the last refresh; returns how many were applied"""
+        try:
+            stat = self.events_file.stat()
+        except FileNotFoundError:
+            return 0
+
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            if self.inode is not None:
+                print(f"{self.events_file} was replaced, rebuilding rollups")
+                self.current, self.rollups, self.working_seconds, self.carried_hours = {}, {}, {}, {}
+            self.inode = stat.st_ino
+            self.offset = 0
+        if stat.st_size == self.offset:
+            return 0
+
+        with open(self.events_file, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        end = data.rfind(b"\n") + 1
+        applied = 0
+        for line in data[:end].splitlines():
+            try:
+                self.apply(json.loads(line))
+                applied += 1
+            except (json.JSONDecodeError, KeyError):
+                print(f"Skipping malformed status event in {self.events_file}")
+
+        self.offset += end
+        if applied:
+            self.save()
+        return applied
+
+    def _open_seconds(self, agent_name, now, day=None):
+        """Seconds in the agent's current (not yet closed) interval, optionally within one day"""
+        state = self.current.get(agent_name)
+        if not state or now <= state['since']:
+            return state, 0
+        if day is None:
+            return state, now - state['since']
+        return state, sum(seconds for chunk_day, seconds in split_by_day(state['since'], now) if chunk_day == day)
+
+    def derived(self, agent_name, now=None):
+        """total_hours_logged, completed_tasks_today and utilization (today) for one agent"""
+        now = time.time() if now is None else now
+        today = date.fromtimestamp(now).isoformat()
+
+        working = self.working_seconds.get(agent_name, 0)
+        state, open_seconds = self._open_seconds(agent_name, now)
+        if state and state['status'] in WORKING_STATUSES:
+            working += open_seconds
+
+        rollup = self.rollups.get(today, {}).get(agent_name, {'seconds': {}, 'completed': 0})
+        seconds = dict(rollup['seconds'])
+        state, open_today = self._open_seconds(agent_name, now, today)
+        if state:
+            seconds[state['status']] = seconds.get(state['status'], 0) + open_today
+
+        tracked = sum(value for status, value in seconds.items() if status not in UNTRACKED_STATUSES)
+        working_today = sum(seconds.get(status, 0) for status in WORKING_STATUSES)
+
+        return {
+            'total_hours_logged': round(self.carried_hours.get(agent_name, 0) + working / 3600, 2),
+            'completed_tasks_today': rollup['completed'],
+            'utilization': round(working_today / tracked, 3) if tracked else 0.0
+        }
+
+    def daily(self, days=7, now=None):
+        """Precomputed rollups for the last `days` days: {day: {agent: {hours, completed, utilization}}}"""
+        now = time.time() if now is None else now
+        today = date.fromtimestamp(now)
+        result = {}
+        for offset in range(days - 1, -1, -1):
+            day = (today - timedelta(days=offset)).isoformat()
+            agents = {}
+            for agent_name, rollup in self.rollups.get(day, {}).items():
+                tracked = sum(value for status, value in rollup['seconds'].items()
+                              if status not in UNTRACKED_STATUSES)
+                working = sum(rollup['seconds'].get(status, 0) for status in WORKING_STATUSES)
+                agents[agent_name] = {
+                    'hours': round(working / 3600, 2),
+                    'completed': rollup['completed'],
+                    'transitions': rollup['transitions'],
+                    'utilization': round(working / tracked, 3) if tracked else 0.0
+                }
+            if agents:
+                result[day] = agents
+        return result
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Daily status rollups from the status event log")
+    parser.add_argument('--hub', default="./agent_communication_hub")
+    parser.add_argument('--days', type=int, default=7)
+    args = parser.parse_args()
+
+    aggregator = StatusAggregator(args.hub)
+    aggregator.refresh()
+    for day, agents in aggregator.daily(args.days).items():
+        print(day)
+        for agent_name, rollup in sorted(agents.items()):
+            print(f"  {agent_name}: {rollup['hours']}h worked, {rollup['completed']} completed, "
+                  f"{rollup['utilization']:.0%} utilization")
+
+if __name__ == "__main__":
+    main()
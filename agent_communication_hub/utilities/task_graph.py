@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Task Dependency Analytics
+Critical path, slack and projected completion over the task dependency DAG
+"""
+
+import heapq
+import json
+import re
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+DEFAULT_ESTIMATE_HOURS = 1.0
+EPSILON = 1e-9
+NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_estimate(value):
+    """'2-4' -> 3.0, '3' or 3 -> 3.0; None when the task has no usable estimate"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    # Lists, dicts and other unhashable values are read by their text, like everything else
+    return _parse_estimate_text(str(value or ''))
+
+
+@lru_cache(maxsize=1024)  # Estimates repeat heavily across tasks ("2-4", "4-6", ...)
+def _parse_estimate_text(text):
+    numbers = [float(n) for n in NUMBER_RE.findall(text)]
+    return sum(numbers[:2]) / len(numbers[:2]) if numbers else None
+
+
+def actual_hours(task, actuals):
+    """Measured duration of a completed task: recorded on the task, or from the completion log"""
+    if task.get('actual_hours') is not None:
+        return float(task['actual_hours'])
+    return actuals.get(task.get('task_id'))
+
+
+class TaskGraph:
+    """
+    Dependency DAG over active and completed tasks. For each task the forward
+    pass gives its earliest finish (longest chain of remaining work up to and
+    including it) and the backward pass its tail (longest chain from it to the
+    end); slack is makespan - earliest finish - tail + own work. Completed tasks
+    have no remaining work.
+
+    The topology (index, successors, topological order) is rebuilt only when the
+    set of tasks or their dependencies changes. When only remaining work changes,
+    e.g. a task completes, just the affected nodes are re-evaluated: changes are
+    pushed to successors (forward) and predecessors (backward) in topological
+    order. Passes use raw estimates; the estimate accuracy measured on completed
+    tasks is applied as one factor when reporting.
+    """
+
+    def __init__(self):
+        self.shape = None
+        self.ids = []
+        self.index = {}
+        self.deps = []
+        self.succs = []
+        self.order = []
+        self.position = []
+        self.cycles = []
+        self.missing = 0
+
+        self.remaining = []
+        self.finish = []
+        self.tail = []
+        self.makespan = 0.0
+        self.tasks = {}
+        self.completed = set()
+        self.accuracy = 1.0
+        self.full_updates = 0
+        self.partial_updates = 0
+        self.nodes_touched = 0
+
+    # Structure
+
+    def _build(self, shape):
+        self.shape = shape
+        self.ids = sorted(shape)  # Independent of which section a task currently sits in
+        self.index = {task_id: i for i, task_id in enumerate(self.ids)}
+        self.missing = 0
+        self.deps = []
+        for task_id in self.ids:
+            known = [self.index[dep] for dep in shape[task_id] if dep in self.index]
+            self.missing += len(shape[task_id]) - len(known)
+            self.deps.append(known)
+
+        self.succs = [[] for _ in self.ids]
+        for i, deps in enumerate(self.deps):
+            for dep in deps:
+                self.succs[dep].append(i)
+
+        # Kahn's algorithm; whatever is left over sits on (or behind) a cycle
+        indegree = [len(deps) for deps in self.deps]
+        ready = [i for i, degree in enumerate(indegree) if degree == 0]
+        order = []
+        while ready:
+            i = ready.pop()
+            order.append(i)
+            for succ in self.succs[i]:
+                indegree[succ] -= 1
+                if indegree[succ] == 0:
+                    ready.append(succ)
+
+        in_order = set(order)
+        self.cycles = [self.ids[i] for i in range(len(self.ids)) if i not in in_order]
+        if self.cycles:
+            # Leave cyclic tasks out of the passes entirely
+            excluded = set(range(len(self.ids))) - in_order
+            self.deps = [[d for d in deps if d not in excluded] for deps in self.deps]
+            self.succs = [[s for s in succs if s not in excluded] for succs in self.succs]
+
+        self.order = order
+        self.position = [len(self.ids)] * len(self.ids)
+        for pos, i in enumerate(order):
+            self.position[i] = pos
+
+    # Passes
+
+    def _full_passes(self):
+        n = len(self.ids)
+        remaining, deps, succs = self.remaining, self.deps, self.succs
+        finish, tail = [0.0] * n, [0.0] * n
+        for i in self.order:
+            finish[i] = remaining[i] + (max([finish[d] for d in deps[i]]) if deps[i] else 0.0)
+        for i in reversed(self.order):
+            tail[i] = remaining[i] + (max([tail[s] for s in succs[i]]) if succs[i] else 0.0)
+        self.finish, self.tail = finish, tail
+        self.full_updates += 1
+        self.nodes_touched += 2 * n
+
+    def _push(self, seeds, forward):
+        """Re-evaluate only nodes reachable from `seeds`, in (reverse) topological order"""
+        values, inputs, outputs = (self.finish, self.deps, self.succs) if forward else \
+            (self.tail, self.succs, self.deps)
+        remaining, position = self.remaining, self.position
+        sign = 1 if forward else -1
+        heap = [(sign * position[i], i) for i in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        while heap:
+            _, i = heapq.heappop(heap)
+            queued.discard(i)
+            self.nodes_touched += 1
+            value = remaining[i] + (max([values[j] for j in inputs[i]]) if inputs[i] else 0.0)
+            if abs(value - values[i]) > EPSILON:
+                values[i] = value
+                for j in outputs[i]:
+                    if j not in queued:
+                        queued.add(j)
+                        heapq.heappush(heap, (sign * position[j], j))
+
+    def update(self, task_data, actuals=None):
+        """Fold the current task_assignments.json data in; returns True if anything was recomputed"""
+        actuals = actuals or {}
+        tasks = dict(task_data.get('active_tasks', {}))
+        completed = task_data.get('completed_tasks', {})
+        tasks.update(completed)
+        self.tasks, self.completed = tasks, set(completed)
+
+        # Estimate accuracy: actual / estimated hours over completed tasks that have both
+        estimated = measured = 0.0
+        for task_id, task in completed.items():
+            estimate = parse_estimate(task.get('estimated_hours'))
+            actual = actual_hours(dict(task, task_id=task_id), actuals)
+            if estimate and actual is not None:
+                estimated += estimate
+                measured += actual
+        self.accuracy = measured / estimated if estimated else 1.0
+
+        shape = {task_id: tuple(task.get('dependencies') or ()) for task_id, task in tasks.items()}
+        rebuild = shape != self.shape
+        if rebuild:
+            self._build(shape)
+
+        remaining = [0.0 if task_id in completed
+                     else parse_estimate(tasks[task_id].get('estimated_hours')) or DEFAULT_ESTIMATE_HOURS
+                     for task_id in self.ids]
+
+        if rebuild:
+            self.remaining = remaining
+            self._full_passes()
+        else:
+            changed = [i for i in self.order if remaining[i] != self.remaining[i]]
+            if not changed:
+                return False
+            self.remaining = remaining
+            self._push(changed, forward=True)
+            self._push(changed, forward=False)
+            self.partial_updates += 1
+
+        self.makespan = max((self.tail[i] for i in self.order), default=0.0)
+        return True
+
+    # Results
+
+    def _slack(self, i):
+        return self.makespan - self.finish[i] - self.tail[i] + self.remaining[i]
+
+    def slack(self, task_id):
+        return self._slack(self.index[task_id]) * self.accuracy
+
+    def critical_path(self):
+        """Remaining tasks on the longest chain, first to last"""
+        pending = [i for i in self.order if self.remaining[i] > 0]
+        # Start at the first zero-slack task and keep following the successor with the longest tail
+        i = min((j for j in pending if self._slack(j) <= EPSILON), key=lambda j: self.position[j], default=None)
+        if i is None:
+            return []
+        path = [i]
+        while self.succs[i]:
+            i = max(self.succs[i], key=lambda s: (self.tail[s], -self.position[s]))
+            if self._slack(i) > EPSILON:
+                break
+            if self.remaining[i] > 0:
+                path.append(i)
+        return [self.ids[j] for j in path]
+
+    def summary(self, near_critical=10, max_path=50):
+        """Report section: critical path, tightest tasks and projected remaining time"""
+        pending = [i for i in self.order if self.remaining[i] > 0]
+        tight = sorted(pending, key=lambda i: (self._slack(i), self.position[i]))[:near_critical]
+        path = self.critical_path()
+
+        return {
+            'remaining_tasks': len(pending),
+            'remaining_hours': round(self.makespan * self.accuracy, 2),
+            'estimate_accuracy': round(self.accuracy, 3),
+            'critical_path': path[:max_path],
+            'critical_path_length': len(path),
+            'near_critical': [{
+                'task_id': self.ids[i],
+                'assigned_to': self.tasks[self.ids[i]].get('assigned_to'),
+                'slack_hours': round(self._slack(i) * self.accuracy, 2),
+                'earliest_start_hours': round((self.finish[i] - self.remaining[i]) * self.accuracy, 2)
+            } for i in tight],
+            'cycles': self.cycles[:max_path],
+            'missing_dependencies': self.missing
+        }
+
+
+def projected_completion(summary, now=None):
+    """Wall-clock projection: the critical path's remaining hours from now (agent capacity not modelled)"""
+    now = time.time() if now is None else now
+    return datetime.fromtimestamp(now + summary['remaining_hours'] * 3600).isoformat(timespec='minutes')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Critical path and slack for the hub's tasks")
+    parser.add_argument('--hub', default="./agent_communication_hub")
+    parser.add_argument('--benchmark', type=int, metavar='TASKS',
+                        help="time a full build, completions near the root (worst case) and of leaf tasks")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        import random
+        tasks = {f"t{i}": {'estimated_hours': f"{random.randint(1, 4)}-{random.randint(4, 8)}",
+                           'dependencies': [f"t{random.randrange(i)}" for _ in range(min(i, 3))]}
+                 for i in range(args.benchmark)}
+        graph = TaskGraph()
+        started = time.perf_counter()
+        graph.update({'active_tasks': tasks, 'completed_tasks': {}})
+        print(f"full build: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        completed = {}
+        # The first tasks are upstream of nearly everything, the last ones of nothing
+        for task_id in list(tasks)[:3] + list(tasks)[-3:]:
+            completed[task_id] = tasks.pop(task_id)
+            graph.nodes_touched = 0
+            started = time.perf_counter()
+            graph.update({'active_tasks': tasks, 'completed_tasks': completed})
+            print(f"complete {task_id}: {(time.perf_counter() - started) * 1000:.1f} ms, "
+                  f"{graph.nodes_touched} node evaluations")
+        return
+
+    with open(Path(args.hub) / "task_assignments.json", 'r') as f:
+        task_data = json.load(f)
+    graph = TaskGraph()
+    graph.update(task_data)
+    summary = graph.summary()
+    print(f"{summary['remaining_tasks']} remaining task(s), {summary['remaining_hours']}h on the critical path "
+          f"(estimates x{summary['estimate_accuracy']}); projected completion {projected_completion(summary)}")
+    if summary['critical_path']:
+        print("Critical path: " + " -> ".join(summary['critical_path']))
+    for task in summary['near_critical']:
+        print(f"  {task['task_id']} ({task['assigned_to']}): slack {task['slack_hours']}h")
+    if summary['cycles']:
+        print(f"Dependency cycles (excluded): {', '.join(summary['cycles'])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Task Index Utility
+Compiles task_templates once and indexes active/completed tasks by id, agent and template
+"""
+
+import json
+from pathlib import Path
+from types import MappingProxyType
+
+from records import TaskRecord
+
+TEMPLATE_FIELDS = ('coding_standards', 'required_files', 'quality_gates')
+
+
+class TaskIndex:
+    def __init__(self, hub_path="./agent_communication_hub"):
+        self.hub_path = Path(hub_path)
+        self.tasks_file = self.hub_path / "task_assignments.json"
+
+        self.signature = None
+        self.templates = {}
+        self.by_id = {}
+        self.by_agent = {}
+        self.by_template = {}
+
+    def refresh(self):
+        """Recompile templates and indexes if task_assignments.json changed"""
+        try:
+            stat = self.tasks_file.stat()
+        except FileNotFoundError:
+            return False
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.signature:
+            return False
+
+        try:
+            with open(self.tasks_file, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading task assignments: {e}")
+            return False
+
+        self.templates = {
+            name: MappingProxyType({field: template[field] for field in TEMPLATE_FIELDS if field in template})
+            for name, template in data.get('task_templates', {}).items()
+        }
+
+        # Build the new maps aside and swap them in, so concurrent readers never see a half-filled index
+        by_id, by_agent, by_template = {}, {}, {}
+        for state in ('active_tasks', 'completed_tasks'):
+            for task_id, task in data.get(state, {}).items():
+                task = self._apply_template(dict(task, task_id=task_id))
+                by_id[task_id] = TaskRecord(task_id, state, task.get('assigned_to'), task.get('template'), task)
+                by_agent.setdefault(task.get('assigned_to'), set()).add(task_id)
+                if task.get('template'):
+                    by_template.setdefault(task['template'], set()).add(task_id)
+
+        self.by_id, self.by_agent, self.by_template = by_id, by_agent, by_template
+        self.signature = signature
+        return True
+
+    def expand(self, task):
+        """Fill a lightweight task reference in from its template; explicit fields win"""
+        self.refresh()
+        return self._apply_template(task)
+
+    def _apply_template(self, task):
+        template_name = task.get('template')
+        if not template_name:
+            return task
+
+        template = self.templates.get(template_name)
+        if template is None:
+            print(f"Unknown task template '{template_name}' in task {task.get('task_id')}")
+            return task
+
+        return {**template, **task}
+
+    def owner(self, task):
+        """task_assignments.json has the final say on who owns a task; work stealing reassigns it there"""
+        record = self.by_id.get(task.get('task_id'))
+        return record.assigned_to if record and record.assigned_to else task.get('assigned_to')
+
+    def expand_all(self, tasks):
+        self.refresh()
+        return [self._apply_template(task) for task in tasks]
+
+    def get(self, task_id):
+        """Return (state, task) for a task id, or None"""
+        self.refresh()
+        record = self.by_id.get(task_id)
+        return (record.state, record.task) if record else None
+
+    def tasks_for_agent(self, agent_name, state=None):
+        self.refresh()
+        return [self.by_id[task_id].task for task_id in sorted(self.by_agent.get(agent_name, ()))
+                if state is None or self.by_id[task_id].state == state]
+
+    def tasks_for_template(self, template_name, state=None):
+        self.refresh()
+        return [self.by_id[task_id].task for task_id in sorted(self.by_template.get(template_name, ()))
+                if state is None or self.by_id[task_id].state == state]
@@ -5,27 +5,37 @@
 
 const fs = require('fs');
 const path = require('path');
+const crypto = require('crypto');
+
+// Must match ARTIFACT_VERSION in instructions_parser.py
+const ARTIFACT_VERSION = 2;
+// Coarsest mtime granularity expected (see utilities/change_detector.py)
+const RACY_WINDOW_NS = 2000000000n;
 
 class TaskParser {
   constructor(hubPath = './agent_communication_hub') {
     this.hubPath = hubPath;
     this.instructionsFile = path.join(hubPath, 'instructions.md');
     this.statusFile = path.join(hubPath, 'agent_status.json');
+    this.eventsFile = path.join(hubPath, 'status_events.jsonl');
     this.tasksFile = path.join(hubPath, 'task_assignments.json');
+    this.artifactFile = path.join(hubPath, '.state', 'instructions_parse.json');
   }
 
   /**
-   * Parse instructions.md for new tasks and delimiters
+   * Parse instructions.md for new tasks and delimiters.
+   * Reuses the shared parse artifact written by instructions_parser.py when it
+   * matches the current revision, and writes it in the same format otherwise.
    */
   parseInstructions() {
     try {
-      const content = fs.readFileSync(this.instructionsFile, 'utf8');
-      
+      const artifact = this.loadArtifact();
+
       return {
-        tasks: this.extractTasks(content),
-        delimiters: this.extractDelimiters(content),
-        lastUpdate: this.getLastUpdate(content),
-        communicationStatus: this.getCommunicationStatus(content)
+        tasks: this.applyOwners(artifact.tasks),
+        delimiters: artifact.delimiters.map((d) => ({ ...d, timestamp: artifact.parsed_at })),
+        lastUpdate: artifact.last_update,
+        communicationStatus: artifact.status
       };
     } catch (error) {
       console.error('Error parsing instructions:', error);
@@ -34,7 +44,85 @@ class TaskParser {
   }
 
   /**
-   * Extract JSON task objects from markdown content
+   * Owners in task_assignments.json win over instructions.md: work stealing
+   * (monitoring/work_stealer.py) reassigns tasks there. This parser cannot take
+   * the hub lock to mark tasks started, so agents driven by it belong in
+   * work_stealing.exclude in monitor_config.json.
+   */
+  applyOwners(tasks) {
+    let assignments;
+    try {
+      assignments = JSON.parse(fs.readFileSync(this.tasksFile, 'utf8'));
+    } catch (error) {
+      return tasks;
+    }
+
+    const stored = { ...assignments.active_tasks, ...assignments.completed_tasks };
+    return tasks.map((task) => {
+      const owner = stored[task.task_id] && stored[task.task_id].assigned_to;
+      return owner ? { ...task, assigned_to: owner } : task;
+    });
+  }
+
+  /**
+   * Load the shared parse artifact, parsing only when the content changed
+   */
+  loadArtifact() {
+    const stats = fs.statSync(this.instructionsFile, { bigint: true });
+    const mtimeNs = stats.mtimeNs.toString();
+    const size = Number(stats.size);
+    const inode = Number(stats.ino);
+    const ctimeNs = stats.ctimeNs.toString();
+
+    let artifact = null;
+    try {
+      artifact = JSON.parse(fs.readFileSync(this.artifactFile, 'utf8'));
+      if (artifact.version !== ARTIFACT_VERSION) {
+        artifact = null;
+      }
+    } catch (error) {
+      artifact = null;
+    }
+
+    // Same rules as instructions_parser.py: signature must match and be outside the racy window
+    const changedNs = stats.mtimeNs > stats.ctimeNs ? stats.mtimeNs : stats.ctimeNs;
+    if (artifact && artifact.mtime_ns === mtimeNs && artifact.size === size && artifact.inode === inode &&
+        artifact.ctime_ns === ctimeNs && changedNs < BigInt(artifact.verified_ns || 0) - RACY_WINDOW_NS) {
+      return artifact;
+    }
+
+    const verifiedNs = BigInt(Date.now()) * 1000000n;
+    const raw = fs.readFileSync(this.instructionsFile);
+    const contentHash = crypto.createHash('sha256').update(raw).digest('hex');
+    const revision = { mtime_ns: mtimeNs, size, inode, ctime_ns: ctimeNs, verified_ns: verifiedNs.toString() };
+
+    if (artifact && artifact.content_hash === contentHash) {
+      Object.assign(artifact, revision);
+    } else {
+      const content = raw.toString('utf8');
+      artifact = {
+        version: ARTIFACT_VERSION,
+        content_hash: contentHash,
+        ...revision,
+        parsed_at: new Date().toISOString(),
+        tasks: this.extractTasks(content),
+        delimiters: this.extractDelimiters(content).map(({ type, position }) => ({ type, position })),
+        last_update: this.getLastUpdate(content),
+        status: this.getCommunicationStatus(content)
+      };
+    }
+
+    fs.mkdirSync(path.dirname(this.artifactFile), { recursive: true });
+    const tempFile = `${this.artifactFile}.${process.pid}.tmp`;
+    fs.writeFileSync(tempFile, JSON.stringify(artifact));
+    fs.renameSync(tempFile, this.artifactFile);
+    return artifact;
+  }
+
+  /**
+   * Extract JSON task objects from markdown content.
+   * Same rule as is_task in instructions_parser.py: an object with a non-empty
+   * task_id and assigned_to.
    */
   extractTasks(content) {
     const tasks = [];
@@ -56,17 +144,22 @@ class TaskParser {
   }
 
   /**
-   * Extract communication delimiters
+   * Extract communication delimiters.
+   * Positions are counted in code points so they agree with the Python parser.
    */
   extractDelimiters(content) {
     const delimiters = [];
     const delimiterRegex = /\((TASK_ASSIGNED|COMMUNICATION_OVER|URGENT|QUESTION|BLOCKED)\)/g;
     let match;
+    let lastIndex = 0;
+    let codePoints = 0;
 
     while ((match = delimiterRegex.exec(content)) !== null) {
+      codePoints += Array.from(content.slice(lastIndex, match.index)).length;
+      lastIndex = match.index;
       delimiters.push({
         type: match[1],
-        position: match.index,
+        position: codePoints,
         timestamp: new Date().toISOString()
       });
     }
@@ -101,25 +194,38 @@ class TaskParser {
   }
 
   /**
-   * Update agent status
+   * Update agent status.
+   * Node has no flock, so this cannot take .state/status.lock like StatusWriteBuffer
+   * (utilities/status_buffer.py) does; the writes are atomic but a concurrent Python
+   * flush can still overwrite this one. Do not drive the same hub from both.
    */
   updateAgentStatus(agentName, status, currentTask = null) {
     try {
+      // Completed-task counts and hours are derived from this log (utilities/status_events.py);
+      // one O_APPEND write so the line never interleaves with another writer's
+      const now = Date.now();
+      fs.appendFileSync(this.eventsFile, JSON.stringify({
+        ts: now / 1000,
+        timestamp: new Date(now).toISOString(),
+        agent: agentName,
+        status,
+        current_task: currentTask
+      }) + '\n');
+
       const statusData = JSON.parse(fs.readFileSync(this.statusFile, 'utf8'));
-      
+
       if (statusData.agents[agentName]) {
         statusData.agents[agentName].status = status;
         statusData.agents[agentName].current_task = currentTask;
-        statusData.agents[agentName].last_activity = new Date().toISOString();
-        
-        if (status === 'completed_task') {
-          statusData.agents[agentName].completed_tasks_today += 1;
-        }
+        statusData.agents[agentName].last_activity = new Date(now).toISOString();
       }
 
-      statusData.last_updated = new Date().toISOString();
-      
-      fs.writeFileSync(this.statusFile, JSON.stringify(statusData, null, 2));
+      statusData.last_updated = new Date(now).toISOString();
+
+      // Same as the Python buffer: compact JSON, temp file plus rename
+      const tempFile = `${this.statusFile}.${process.pid}.tmp`;
+      fs.writeFileSync(tempFile, JSON.stringify(statusData));
+      fs.renameSync(tempFile, this.statusFile);
       return true;
     } catch (error) {
       console.error('Error updating agent status:', error);
@@ -159,15 +265,15 @@ class TaskParser {
    * Monitor for changes (to be called periodically)
    */
   monitorInstructions(callback) {
-    let lastModified = 0;
+    let lastContentHash = null;
     
     const checkForChanges = () => {
       try {
-        const stats = fs.statSync(this.instructionsFile);
-        const modified = stats.mtime.getTime();
+        // The artifact is keyed by content hash, so same-tick rewrites and restored mtimes are caught
+        const contentHash = this.loadArtifact().content_hash;
         
-        if (modified > lastModified) {
-          lastModified = modified;
+        if (contentHash !== lastContentHash) {
+          lastContentHash = contentHash;
           const parsed = this.parseInstructions();
           if (parsed && callback) {
             callback(parsed);
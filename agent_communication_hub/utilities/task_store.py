@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Task Store
+Versioned compare-and-swap updates to task_assignments.json
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from hub_lock import HubLock
+
+IN_PROGRESS = 'in_progress'
+
+
+class TaskStore:
+    """
+    Read-modify-write access to task_assignments.json. Every write bumps the
+    task's `version` (and the file's); `compare_and_swap` applies a change only
+    if the task still has the fields the caller read, so two writers that saw
+    the same version never both win. Writes go through a temp file and
+    os.replace, so lock-free readers always see a whole file.
+    """
+
+    def __init__(self, hub_path="./agent_communication_hub"):
+        self.hub_path = Path(hub_path)
+        self.tasks_file = self.hub_path / "task_assignments.json"
+
+    def load(self):
+        try:
+            with open(self.tasks_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading task assignments: {e}")
+            return None
+
+    def _write(self, data):
+        temp_file = self.tasks_file.with_suffix('.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp_file, self.tasks_file)
+
+    @staticmethod
+    def is_started(task):
+        return bool(task.get('started_at')) or task.get('status') == IN_PROGRESS
+
+    @staticmethod
+    def snapshot(task):
+        """The fields a later compare_and_swap is checked against"""
+        return {'version': task.get('version', 0), 'assigned_to': task.get('assigned_to')}
+
+    def compare_and_swap(self, task_id, expected, changes, guard=None, history=None):
+        """
+        Apply `changes` to an active task if its fields still equal `expected`
+        (and `guard(task)`, evaluated under the lock, agrees). Returns the
+        updated task, or None if the task moved on since it was read.
+        """
+        with HubLock(self.hub_path, name="tasks"):
+            data = self.load()
+            task = data.get('active_tasks', {}).get(task_id) if data else None
+            if task is None or self.snapshot(task) != expected:
+                return None
+            if guard is not None and not guard(task):
+                return None
+
+            task.update(changes)
+            task['version'] = expected['version'] + 1
+            data['version'] = data.get('version', 0) + 1
+            if history:
+                data.setdefault('assignment_history', []).append(
+                    dict(history, task_id=task_id, timestamp=datetime.now().isoformat()))
+
+            try:
+                self._write(data)
+            except Exception as e:
+                print(f"Error writing task assignments: {e}")
+                return None
+            return dict(task, task_id=task_id)
+
+    def start(self, task_id, agent_name, attempts=3):
+        """
+        Mark an active task as started by its owner (a compare-and-swap, so it
+        cannot interleave with a steal). Returns False when the store gives the
+        task to another agent; tasks it does not track are the caller's to start.
+        """
+        for _ in range(attempts):
+            data = self.load()
+            task = data.get('active_tasks', {}).get(task_id) if data else None
+            if task is None:
+                return True
+            if task.get('assigned_to') and task['assigned_to'] != agent_name:
+                return False
+            if self.is_started(task):
+                return True
+
+            changes = {'started_at': datetime.now().isoformat(), 'status': IN_PROGRESS}
+            if self.compare_and_swap(task_id, self.snapshot(task), changes,
+                                     guard=lambda current: not self.is_started(current)):
+                return True
+        return False